@@ -1,9 +1,20 @@
 // Copyright (c) 2020-2023 The MathWorks, Inc.
 
 import React from 'react';
-import { render, fireEvent } from '../../test/utils/react-test';
+import { createStore, applyMiddleware } from 'redux';
+import thunkMiddleware from 'redux-thunk';
+import { useInterval } from 'react-use';
+import { render, fireEvent, act } from '../../test/utils/react-test';
+import reducer from '../../reducers';
+import { selectFetchStatusPeriod } from '../../selectors';
 import App from './index';
 
+// Record the delay with which the server status is polled, while still polling.
+jest.mock('react-use', () => {
+  const reactUse = jest.requireActual('react-use');
+  return { ...reactUse, useInterval: jest.fn(reactUse.useInterval) };
+});
+
 describe('App Component', () => {
   let initialState;
   beforeEach(() => {
@@ -227,6 +238,83 @@ describe('App Component', () => {
     expect(helpElement.textContent).toMatch('Help');
   });
 
+  describe('server status events', () => {
+    let eventSources;
+
+    // Stands in for the EventSource of the browser, whose events are emitted by the tests.
+    class MockEventSource {
+      constructor(url) {
+        this.url = url;
+        this.listeners = {};
+        this.close = jest.fn();
+        eventSources.push(this);
+      }
+
+      addEventListener(type, listener) {
+        this.listeners[type] = listener;
+      }
+
+      emit(type, event = {}) {
+        act(() => {
+          this.listeners[type](event);
+        });
+      }
+    }
+
+    const lastPollingDelay = () => useInterval.mock.calls[useInterval.mock.calls.length - 1][1];
+
+    beforeEach(() => {
+      eventSources = [];
+      window.EventSource = MockEventSource;
+    });
+
+    afterEach(() => {
+      delete window.EventSource;
+    });
+
+    it('should update the store with the server status received from the status events', () => {
+      const store = createStore(reducer, initialState, applyMiddleware(thunkMiddleware));
+      render(<App />, { store: store });
+
+      expect(eventSources).toHaveLength(1);
+      expect(eventSources[0].url).toBe('./get_status_events');
+
+      eventSources[0].emit('status', {
+        data: JSON.stringify({
+          matlab: { status: 'starting', version: 'R2020b' },
+          licensing: initialState.serverStatus.licensingInfo,
+          wsEnv: 'mw',
+        }),
+      });
+
+      expect(store.getState().serverStatus.matlabStatus).toBe('starting');
+    });
+
+    it('should poll for the server status only while not subscribed to the status events', () => {
+      const fetchStatusPeriod = selectFetchStatusPeriod(initialState);
+      render(<App />, { initialState: initialState });
+
+      // Polls until the subscription is open
+      expect(lastPollingDelay()).toBe(fetchStatusPeriod);
+
+      eventSources[0].emit('open');
+      expect(lastPollingDelay()).toBeNull();
+
+      // Falls back to polling while the browser reconnects
+      eventSources[0].emit('error');
+      expect(lastPollingDelay()).toBe(fetchStatusPeriod);
+    });
+
+    it('should close the subscription to the status events when unmounted', () => {
+      const { unmount } = render(<App />, { initialState: initialState });
+      expect(eventSources[0].close).not.toHaveBeenCalled();
+
+      unmount();
+
+      expect(eventSources[0].close).toHaveBeenCalledTimes(1);
+    });
+  });
+
   it('should set the window location from state', () => {
     const url = 'http://localhost.com:5555/matlab/index.html'  
     
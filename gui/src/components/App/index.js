@@ -1,4 +1,4 @@
-// Copyright (c) 2020-2022 The MathWorks, Inc.
+// Copyright (c) 2020-2023 The MathWorks, Inc.
 
 import React, { useState, useCallback, useEffect, useMemo } from 'react';
 import { useSelector, useDispatch } from 'react-redux';
@@ -33,6 +33,7 @@ import {
 import {
     setOverlayVisibility,
     fetchServerStatus,
+    receiveServerStatus,
     fetchEnvConfig,
     updateAuthStatus,
 } from '../../actionCreators';
@@ -129,10 +130,28 @@ function App() {
 
     }, [dispatch, hasFetchedServerStatus]);
 
-    // Periodic fetch server status
+    // Subscribe to the server status pushed by the server whenever it changes
+    const [isSubscribedToServerStatus, setIsSubscribedToServerStatus] = useState(false);
+    useEffect(() => {
+        if (typeof window.EventSource === 'undefined') {
+            return;
+        }
+
+        const statusEvents = new window.EventSource('./get_status_events');
+        statusEvents.addEventListener('open', () => setIsSubscribedToServerStatus(true));
+        statusEvents.addEventListener('status', (event) => {
+            dispatch(receiveServerStatus(JSON.parse(event.data)));
+        });
+        // The browser reconnects on its own, poll for the status until it does.
+        statusEvents.addEventListener('error', () => setIsSubscribedToServerStatus(false));
+
+        return () => statusEvents.close();
+    }, [dispatch]);
+
+    // Periodic fetch server status, when the server status cannot be subscribed to
     useInterval(() => {
         dispatch(fetchServerStatus());
-    },  fetchStatusPeriod);
+    },  isSubscribedToServerStatus ? null : fetchStatusPeriod);
 
     // Load URL
     useEffect(() => {      
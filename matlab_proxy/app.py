@@ -1,25 +1,44 @@
 # Copyright (c) 2020-2023 The MathWorks, Inc.
 
 import asyncio
+import gzip
+import hashlib
 import json
 import mimetypes
+import os
 import pkgutil
+import re
+import ssl
 import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from types import MappingProxyType
+from wsgiref.handlers import format_date_time
 
 import aiohttp
-from aiohttp import web
+from aiohttp import hdrs, web
 from aiohttp_session import setup as aiohttp_session_setup
 from aiohttp_session.cookie_storage import EncryptedCookieStorage
 from cryptography import fernet
 
+try:
+    # Brotli is optional, static files are served with gzip when it is not installed.
+    import brotli
+except ImportError:
+    brotli = None
+
 import matlab_proxy
-from matlab_proxy import settings, util
+from matlab_proxy import constants, settings, util
 from matlab_proxy.app_state import AppState
 from matlab_proxy.default_configuration import config
 from matlab_proxy.util import list_servers, mwi
 from matlab_proxy.util.mwi import environment_variables as mwi_env
 from matlab_proxy.util.mwi import token_auth
+from matlab_proxy.util.admission_control import AdmissionController
+from matlab_proxy.util.websocket_relay import WebSocketRelay
 from matlab_proxy.util.mwi.exceptions import (
+    AdmissionQueueFullError,
     AppError,
     InvalidTokenError,
     LicensingError,
@@ -32,6 +51,47 @@ mimetypes.add_type("font/ttf", ".ttf")
 mimetypes.add_type("application/json", ".map")
 mimetypes.add_type("image/png", ".ico")
 
+# Content types of static files which benefit from being served compressed.
+# All text/* content types are compressed as well.
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+
+# Source maps are only fetched by browser developer tools, they are not worth compressing at startup
+# and keeping compressed in memory.
+UNCOMPRESSED_STATIC_FILE_EXTENSIONS = (".map",)
+
+# Static files are compressed once when the server starts. Higher levels barely shrink them further,
+# but take much longer on large files.
+STATIC_FILES_GZIP_LEVEL = 6
+STATIC_FILES_BROTLI_QUALITY = 5
+
+# The files built into gui/static/js, gui/static/css and gui/static/media have a hash of their content
+# in their names, so browsers can cache them indefinitely.
+IMMUTABLE_STATIC_FILES_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STATIC_FILES_CACHE_CONTROL = {
+    "/static/css": IMMUTABLE_STATIC_FILES_CACHE_CONTROL,
+    "/static/js": IMMUTABLE_STATIC_FILES_CACHE_CONTROL,
+    "/static/media": IMMUTABLE_STATIC_FILES_CACHE_CONTROL,
+}
+# Files without a hash in their names, such as index.html and manifest.json, must be revalidated on every use.
+REVALIDATED_STATIC_FILES_CACHE_CONTROL = "no-cache"
+
+# Headers which only apply to a single connection and must not be forwarded by the proxy.
+HOP_BY_HOP_HEADERS = (
+    hdrs.CONNECTION,
+    hdrs.KEEP_ALIVE,
+    hdrs.PROXY_AUTHENTICATE,
+    hdrs.PROXY_AUTHORIZATION,
+    hdrs.TE,
+    hdrs.TRAILER,
+    hdrs.TRANSFER_ENCODING,
+    hdrs.UPGRADE,
+)
+
 # TODO It is bad practice to have global state in aiohttp applications, instead this
 # mount point should be read in the application start up function, then if it is not
 # an empty string, registering a subapp with the given prefix. In addition, if it is
@@ -97,6 +157,30 @@ def marshal_error(error):
         return {"message": error.__str__, "logs": "", "type": error.__class__.__name__}
 
 
+async def get_status_payload(app, loadUrl=None):
+    """Returns the generic status of the server, MATLAB and MATLAB Licensing
+
+    Args:
+        app (aiohttp.web.Application): Web Server
+        loadUrl (String, optional): Represents the root URL. Defaults to None.
+
+    Returns:
+        Dict: Containing the generic state of the server, MATLAB and MATLAB Licensing.
+    """
+    state = app["state"]
+
+    return {
+        "matlab": {
+            "status": await state.get_matlab_state(),
+            "version": state.settings.get("matlab_version", "Unknown"),
+        },
+        "licensing": marshal_licensing_info(state.licensing),
+        "loadUrl": loadUrl,
+        "error": marshal_error(state.error),
+        "wsEnv": state.settings.get("ws_env", ""),
+    }
+
+
 async def create_status_response(app, loadUrl=None):
     """Send a generic status response about the state of server,MATLAB and MATLAB Licensing
 
@@ -107,20 +191,7 @@ async def create_status_response(app, loadUrl=None):
     Returns:
         JSONResponse: A JSONResponse object containing the generic state of the server, MATLAB and MATLAB Licensing.
     """
-    state = app["state"]
-
-    return web.json_response(
-        {
-            "matlab": {
-                "status": await state.get_matlab_state(),
-                "version": state.settings.get("matlab_version", "Unknown"),
-            },
-            "licensing": marshal_licensing_info(state.licensing),
-            "loadUrl": loadUrl,
-            "error": marshal_error(state.error),
-            "wsEnv": state.settings.get("ws_env", ""),
-        }
-    )
+    return web.json_response(await get_status_payload(app, loadUrl))
 
 
 async def get_env_config(req):
@@ -149,13 +220,209 @@ async def get_env_config(req):
 async def get_status(req):
     """API Endpoint to get the generic status of the server, MATLAB and MATLAB Licensing.
 
+    The response carries the version of the status in its ETag. When the ETag sent in If-None-Match
+    is current, a response with status 304 is returned instead. If the query parameter 'wait' is
+    also set, the request is held for up to that many seconds until the status changes.
+
     Args:
         req (HTTPRequest): HTTPRequest Object.
 
+    Raises:
+        web.HTTPBadRequest: If the value of 'wait' is not a non-negative number.
+
     Returns:
         JSONResponse: JSONResponse object containing information about the server, MATLAB and MATLAB Licensing.
     """
-    return await create_status_response(req.app)
+    state = req.app["state"]
+
+    try:
+        wait = float(req.query.get("wait", 0))
+    except ValueError:
+        wait = -1
+    if not 0 <= wait < float("inf"):
+        raise web.HTTPBadRequest(text="wait must be a non-negative number of seconds")
+
+    status_version = state.status_version
+    if is_etag_matched(req.headers.get(hdrs.IF_NONE_MATCH), make_status_etag(state)):
+        if not wait or not await state.wait_for_status_change(
+            status_version, min(wait, constants.MAX_STATUS_WAIT_IN_SECONDS)
+        ):
+            return web.Response(
+                status=304,
+                headers={
+                    hdrs.ETAG: make_status_etag(state),
+                    hdrs.CACHE_CONTROL: "no-cache",
+                },
+            )
+
+    # Read the version before building the response so that a change which happens
+    # while it is being built is reported by the next request.
+    status_version, etag = state.status_version, make_status_etag(state)
+    status = await get_status_payload(req.app)
+    status["statusVersion"] = status_version
+
+    return web.json_response(
+        status, headers={hdrs.ETAG: etag, hdrs.CACHE_CONTROL: "no-cache"}
+    )
+
+
+def make_status_etag(state):
+    """Returns the ETag of the current version of the status of the server, MATLAB and MATLAB Licensing.
+
+    Args:
+        state (AppState): State of the server.
+
+    Returns:
+        String: ETag of the status.
+    """
+    return f'"{state.status_id}-{state.status_version}"'
+
+
+async def get_startup_timeline(req):
+    """API Endpoint to get the time taken by each phase of the latest and the previous starts of MATLAB.
+
+    Args:
+        req (HTTPRequest): HTTPRequest Object.
+
+    Returns:
+        JSONResponse: Containing the latest timeline as "current" and all the timelines, oldest first, as "history".
+    """
+    return web.json_response(req.app["state"].get_startup_timelines())
+
+
+async def get_metrics(req):
+    """API Endpoint to get the metrics of the server in the Prometheus text exposition format.
+
+    Args:
+        req (HTTPRequest): HTTPRequest Object.
+
+    Returns:
+        HTTPResponse: Containing the metrics of the proxy, MATLAB and the licensing requests.
+    """
+    state = req.app["state"]
+    admission_controller = req.app["admission_controller"]
+
+    matlab_state_durations = mwi.metrics.Gauge(
+        "matlab_proxy_matlab_state_seconds",
+        "Total time spent by MATLAB in each state.",
+        labelnames=("state",),
+    )
+    for matlab_state, duration in state.get_matlab_state_durations().items():
+        matlab_state_durations.set(duration, matlab_state)
+
+    matlab_restarts = mwi.metrics.Counter(
+        "matlab_proxy_matlab_restarts_total", "Number of times MATLAB was restarted."
+    )
+    matlab_restarts.inc(amount=state.matlab_restarts)
+
+    body = mwi.metrics.render(
+        list(req.app["metrics"].values())
+        + [
+            matlab_state_durations,
+            matlab_restarts,
+            state.embedded_connector_ping_latency,
+            state.licensing_client.request_duration,
+            state.licensing_client.request_retries,
+            admission_controller.queue_depth,
+            admission_controller.in_flight_requests,
+            admission_controller.wait_duration,
+            admission_controller.rejected_requests,
+        ]
+    )
+    return web.Response(
+        body=body, headers={hdrs.CONTENT_TYPE: mwi.metrics.CONTENT_TYPE}
+    )
+
+
+def make_metrics():
+    """Creates the metrics recorded while proxying requests to MATLAB.
+
+    Returns:
+        Dict: The metrics, keyed by their name in the app.
+    """
+    return {
+        "http_request_duration": mwi.metrics.Histogram(
+            "matlab_proxy_http_request_duration_seconds",
+            "Latency of the HTTP requests proxied to MATLAB, by class of status.",
+            labelnames=("status_class",),
+        ),
+        "http_received_bytes": mwi.metrics.Counter(
+            "matlab_proxy_http_received_bytes_total",
+            "Size of the bodies of the HTTP requests proxied to MATLAB.",
+        ),
+        "http_sent_bytes": mwi.metrics.Counter(
+            "matlab_proxy_http_sent_bytes_total",
+            "Size of the bodies of the HTTP responses streamed from MATLAB.",
+        ),
+        "websocket_relays": mwi.metrics.Gauge(
+            "matlab_proxy_websocket_relays",
+            "Number of WebSocket connections currently relayed to MATLAB.",
+        ),
+        "websocket_frames": mwi.metrics.Counter(
+            "matlab_proxy_websocket_frames_total",
+            "Number of WebSocket frames relayed, by direction.",
+            labelnames=("direction",),
+        ),
+        "websocket_reaped_relays": mwi.metrics.Counter(
+            "matlab_proxy_websocket_reaped_relays_total",
+            "Number of WebSocket relays closed by the heartbeat or the idle timeout, by reason.",
+            labelnames=("reason",),
+        ),
+        "websocket_bytes": mwi.metrics.Counter(
+            "matlab_proxy_websocket_bytes_total",
+            "Size of the payloads of the WebSocket frames relayed, by direction.",
+            labelnames=("direction",),
+        ),
+    }
+
+
+async def get_status_events(req):
+    """API Endpoint to subscribe to the generic status of the server, MATLAB and MATLAB Licensing.
+
+    Streams the status as Server-Sent Events. An event is only sent when the status changes,
+    and a comment is sent periodically in between to keep the connection alive.
+
+    Args:
+        req (HTTPRequest): HTTPRequest Object.
+
+    Returns:
+        StreamResponse: A StreamResponse object of type text/event-stream.
+    """
+    state = req.app["state"]
+
+    res = web.StreamResponse(
+        headers={
+            hdrs.CONTENT_TYPE: "text/event-stream",
+            hdrs.CACHE_CONTROL: "no-cache",
+            # Disable buffering of the response in reverse proxies such as nginx
+            "X-Accel-Buffering": "no",
+        }
+    )
+    await res.prepare(req)
+
+    last_status = None
+    try:
+        while True:
+            # Read the version before building the status so that a change which happens
+            # while it is being built is not missed.
+            status_version = state.status_version
+            status = await get_status_payload(req.app)
+
+            if status != last_status:
+                await res.write(
+                    f"event: status\ndata: {json.dumps(status)}\n\n".encode()
+                )
+                last_status = status
+
+            if not await state.wait_for_status_change(
+                status_version, constants.STATUS_EVENTS_KEEPALIVE_INTERVAL_IN_SECONDS
+            ):
+                await res.write(b": keep-alive\n\n")
+
+    except ConnectionResetError:
+        logger.debug("Client closed the connection to the status events stream")
+
+    return res
 
 
 async def authenticate_request(req):
@@ -220,6 +487,7 @@ async def stop_matlab(req):
     state = req.app["state"]
 
     await state.stop_matlab()
+    await state.stop_standby_matlab()
 
     return await create_status_response(req.app)
 
@@ -242,6 +510,9 @@ async def set_licensing_info(req):
     data = await req.json()
     lic_type = data.get("type")
 
+    # The standby MATLAB was started with the previous licensing
+    await state.stop_standby_matlab()
+
     try:
         if lic_type == "nlm":
             await state.set_licensing_nlm(data.get("connectionString"))
@@ -282,6 +553,7 @@ async def update_entitlement(req):
     if lic_type == "mhlm" and not state.is_licensed():
         entitlement_id = data.get("entitlement_id")
         logger.debug(f"Received type: {lic_type}, entitlement_id: {entitlement_id}")
+        await state.stop_standby_matlab()
         await state.update_user_selected_entitlement_info(entitlement_id)
         await __start_matlab_if_licensed(state)
 
@@ -306,6 +578,7 @@ async def licensing_info_delete(req):
 
     # Removing license information implies terminating MATLAB
     await state.stop_matlab()
+    await state.stop_standby_matlab()
 
     # Unset licensing information
     state.unset_licensing()
@@ -362,6 +635,10 @@ async def root_redirect(request):
 async def static_get(req):
     """Returns HTTP Response objects for the static files
 
+    The content of the static files is served from the in-memory cache built by make_static_route_table().
+    The encoding of the response is negotiated with the Accept-Encoding header of the request, and a response
+    with status 304 is returned when the browser already holds the current version of the file.
+
     Args:
         req (HTTPRequest): HTTPRequest object
 
@@ -369,11 +646,163 @@ async def static_get(req):
         HTTPResponse: HTTPResponse object containing the static file.
     """
     details = req.app["static_route_table"][req.path]
-    return web.Response(
-        headers=details["headers"],
-        status=200,
-        body=pkgutil.get_data(details["mod"], details["name"]),
+    variants = details["variants"]
+
+    encoding = negotiate_content_encoding(
+        req.headers.get(hdrs.ACCEPT_ENCODING, ""), variants.keys()
     )
+    body, etag = variants[encoding]
+
+    headers = dict(details["headers"])
+    headers[hdrs.ETAG] = etag
+    if len(variants) > 1:
+        headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+    if encoding != "identity":
+        headers[hdrs.CONTENT_ENCODING] = encoding
+
+    if is_not_modified(req, etag, details["last_modified"]):
+        return web.Response(headers=headers, status=304)
+
+    return web.Response(headers=headers, status=200, body=body)
+
+
+def negotiate_content_encoding(accept_encoding, available_encodings):
+    """Picks the encoding of a static file to send, based on the Accept-Encoding header of the request.
+
+    Args:
+        accept_encoding (String): Value of the Accept-Encoding header of the request.
+        available_encodings (Iterable): Encodings in which the static file is available.
+
+    Returns:
+        String: One of "br", "gzip" or "identity".
+    """
+    accepted = {}
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    # Encodings are listed from the most to the least preferred one by the server.
+    for encoding in ("br", "gzip"):
+        if encoding in available_encodings:
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+
+    return "identity"
+
+
+def is_etag_matched(if_none_match, etag):
+    """Checks whether the value of the If-None-Match header of a request matches etag.
+
+    Args:
+        if_none_match (String | None): Value of the If-None-Match header of the request.
+        etag (String): Current ETag of the resource.
+
+    Returns:
+        Boolean: True if the browser already holds the current version of the resource.
+    """
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # Weak comparison is used for If-None-Match, see RFC 9110 section 13.1.2
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+
+    return False
+
+
+def is_not_modified(req, etag, last_modified):
+    """Checks whether the browser already holds the current version of a static file.
+
+    If-Modified-Since is only evaluated when the request does not carry an If-None-Match header.
+
+    Args:
+        req (HTTPRequest): HTTPRequest object
+        etag (String): Current ETag of the static file.
+        last_modified (datetime.datetime): Time at which the static file was last modified.
+
+    Returns:
+        Boolean: True if a response with status 304 can be sent.
+    """
+    if_none_match = req.headers.get(hdrs.IF_NONE_MATCH)
+    if if_none_match is not None:
+        return is_etag_matched(if_none_match, etag)
+
+    if_modified_since = req.if_modified_since
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def get_static_file_last_modified(mod, name):
+    """Returns the time at which a static file was last modified, truncated to seconds as in HTTP dates.
+
+    Args:
+        mod (String): Name of the module containing the static file.
+        name (String): Name of the static file.
+
+    Returns:
+        datetime.datetime: Time at which the static file was last modified.
+    """
+    from pkg_resources import resource_filename
+
+    try:
+        timestamp = os.path.getmtime(resource_filename(mod, name))
+    except (OSError, NotImplementedError):
+        # The package is not installed as files on disk, use the time at which the server started instead.
+        timestamp = time.time()
+
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+
+
+def make_static_content_variants(name, content_type, body):
+    """Prepares the encoded variants of a static file and their strong ETags.
+
+    Args:
+        name (String): Name of the static file.
+        content_type (String): Content type of the static file.
+        body (Bytes): Content of the static file.
+
+    Returns:
+        Dict: Mapping of encoding name to a tuple of the encoded content and its ETag.
+    """
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    variants = {"identity": (body, f'"{digest}"')}
+
+    if name.endswith(UNCOMPRESSED_STATIC_FILE_EXTENSIONS) or (
+        content_type not in COMPRESSIBLE_CONTENT_TYPES
+        and not (content_type or "").startswith("text/")
+    ):
+        return variants
+
+    encoders = {
+        "gzip": lambda data: gzip.compress(
+            data, compresslevel=STATIC_FILES_GZIP_LEVEL, mtime=0
+        )
+    }
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(
+            data, quality=STATIC_FILES_BROTLI_QUALITY
+        )
+
+    for encoding, encode in encoders.items():
+        encoded_body = encode(body)
+        # Only keep encoded variants which are actually smaller
+        if len(encoded_body) < len(body):
+            variants[encoding] = (encoded_body, f'"{digest}-{encoding}"')
+
+    logger.debug(
+        f"Cached static file {name} with encodings: {', '.join(variants.keys())}"
+    )
+    return variants
 
 
 def make_static_route_table(app):
@@ -381,11 +810,13 @@ def make_static_route_table(app):
     Key for the Dict is the complete path to a file
     Value for the Dict is the header and other information.
 
+    The content of every file is read once and kept in memory along with its compressed variants.
+
     Args:
         app (aiohttp server): The aiohttp server.
 
     Returns:
-        Dict: Containing information about the static files and header information.
+        MappingProxyType: Read-only mapping containing information about the static files and header information.
     """
     from pkg_resources import resource_isdir, resource_listdir
 
@@ -413,16 +844,28 @@ def make_static_route_table(app):
                     else:
                         content_type = mimetypes.guess_type(name)[0]
 
-                    headers = {"content-type": content_type}
+                    last_modified = get_static_file_last_modified(mod, name)
+
+                    headers = {
+                        "content-type": content_type,
+                        "cache-control": STATIC_FILES_CACHE_CONTROL.get(
+                            parent, REVALIDATED_STATIC_FILES_CACHE_CONTROL
+                        ),
+                        "last-modified": format_date_time(last_modified.timestamp()),
+                    }
                     headers.update(app["settings"]["mwi_custom_http_headers"])
 
                     table[f"{base_url}{parent}/{name}"] = {
                         "mod": mod,
                         "name": name,
                         "headers": headers,
+                        "last_modified": last_modified,
+                        "variants": make_static_content_variants(
+                            name, content_type, pkgutil.get_data(mod, name)
+                        ),
                     }
 
-    return table
+    return MappingProxyType(table)
 
 
 async def matlab_view(req):
@@ -459,79 +902,202 @@ async def matlab_view(req):
         and reqH.get(UPGRADE, "").lower() == "websocket"
         and req.method == "GET"
     ):
-        ws_server = web.WebSocketResponse()
+        # Pings and pongs are relayed between the browser and MATLAB instead of being answered by the proxy.
+        # Compression is negotiated separately with the browser and with the Embedded Connector, as it only
+        # pays off on the network between the browser and the proxy.
+        # Messages are limited to the same size on both legs, so that any message received can be relayed.
+        max_msg_size = req.app["settings"]["mwi_websocket_max_message_size"]
+        # Both sides are pinged, so that the relay is reaped when either one has vanished.
+        heartbeat = req.app["settings"]["mwi_websocket_heartbeat_interval"] or None
+        ws_server = web.WebSocketResponse(
+            autoping=False,
+            compress=req.app["settings"]["mwi_enable_browser_websocket_compression"],
+            max_msg_size=max_msg_size,
+            heartbeat=heartbeat,
+        )
         await ws_server.prepare(req)
 
-        async with aiohttp.ClientSession(
-            cookies=req.cookies, connector=aiohttp.TCPConnector(verify_ssl=False)
-        ) as client_session:
-            async with client_session.ws_connect(
-                matlab_base_url + req.path_qs,
-            ) as ws_client:
-
-                async def wsforward(ws_from, ws_to):
-                    async for msg in ws_from:
-                        mt = msg.type
-                        md = msg.data
-
-                        # When a websocket is closed by the MATLAB JSD, it sends out a few http requests to the Embedded Connector about the events
-                        # that had occured (figureWindowClosed etc.)
-                        # The Embedded Connector responds by sending a message of type 'Error' with close code as Abnormal closure.
-                        # When this happens, matlab-proxy can safely exit out of the loop
-                        # and close the websocket connection it has with the Embedded Connector (ws_client)
-                        if (
-                            mt == aiohttp.WSMsgType.ERROR
-                            and ws_from.close_code
-                            == aiohttp.WSCloseCode.ABNORMAL_CLOSURE
-                        ):
-                            break
-
-                        if mt == aiohttp.WSMsgType.TEXT:
-                            await ws_to.send_str(md)
-                        elif mt == aiohttp.WSMsgType.BINARY:
-                            await ws_to.send_bytes(md)
-                        elif mt == aiohttp.WSMsgType.PING:
-                            await ws_to.ping()
-                        elif mt == aiohttp.WSMsgType.PONG:
-                            await ws_to.pong()
-                        elif ws_to.closed:
-                            await ws_to.close(code=ws_to.close_code, message=msg.extra)
-                        else:
-                            raise ValueError(f"Unexpected message type: {msg}")
-
-                await asyncio.wait(
-                    [wsforward(ws_server, ws_client), wsforward(ws_client, ws_server)],
-                    return_when=asyncio.FIRST_COMPLETED,
-                )
+        # The session is shared between all browser clients, so the cookies of the browser are forwarded as a header.
+        headers = {hdrs.COOKIE: reqH[hdrs.COOKIE]} if hdrs.COOKIE in reqH else None
+        async with req.app["websocket_session"].ws_connect(
+            matlab_base_url + req.path_qs,
+            headers=headers,
+            autoping=False,
+            max_msg_size=max_msg_size,
+            heartbeat=heartbeat,
+            compress=zlib.MAX_WBITS
+            if req.app["settings"]["mwi_enable_connector_websocket_compression"]
+            else 0,
+        ) as ws_client:
+            logger.debug(
+                f"Relaying WebSocket {req.path} with compression to the browser: {bool(ws_server.compress)}, to MATLAB: {bool(ws_client.compress)}"
+            )
+            metrics = req.app["metrics"]
+            relay = WebSocketRelay(
+                ws_server,
+                ws_client,
+                frames_counter=metrics["websocket_frames"],
+                bytes_counter=metrics["websocket_bytes"],
+                idle_timeout=req.app["settings"]["mwi_websocket_idle_timeout"],
+            )
+
+            metrics["websocket_relays"].inc()
+            try:
+                await relay.run()
+            finally:
+                metrics["websocket_relays"].dec()
+                if relay.reap_reason is not None:
+                    metrics["websocket_reaped_relays"].inc(relay.reap_reason)
 
-                return ws_server
+        return ws_server
 
     # Standard HTTP Request
     else:
-        # Proxy, injecting request header
-        async with aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(verify_ssl=False),
-        ) as client_session:
-            try:
+        # Proxy, injecting request header.
+        # Requests are sent over the app-lifetime pool of keep-alive connections.
+        client_session = req.app["upstream_session"]
+        started_at = time.monotonic()
+        status = None
+        response = None
+        try:
+            # Reject request bodies larger than the configured limit before contacting MATLAB.
+            max_upload_size = req.app["settings"]["mwi_proxy_max_upload_size"]
+            if (
+                max_upload_size
+                and req.content_length is not None
+                and req.content_length > max_upload_size
+            ):
+                raise web.HTTPRequestEntityTooLarge(
+                    max_size=max_upload_size, actual_size=req.content_length
+                )
+
+            # Only requests which need rewriting are buffered. All other request bodies, including
+            # those without a known length, are streamed to MATLAB as they arrive.
+            if req.body_exists and is_rewrite_required(req):
                 req_body = await transform_body(req)
                 # Set content length in case of modification
-                reqH["Content-Length"] = str(len(req_body))
-                reqH["x-forwarded-proto"] = "http"
+                reqH[hdrs.CONTENT_LENGTH] = str(len(req_body))
+            elif req.body_exists:
+                req_body = stream_body(req, max_upload_size)
+            else:
+                req_body = None
+
+            # The connection to MATLAB is pooled and is not tied to the connection with the browser
+            for header in HOP_BY_HOP_HEADERS:
+                reqH.popall(header, None)
+            reqH["x-forwarded-proto"] = "http"
+
+            # Requests wait for their turn before being sent to MATLAB, and until their response was streamed.
+            async with req.app["admission_controller"].admit(), client_session.request(
+                req.method,
+                f"{matlab_base_url}{req.rel_url}",
+                headers={**reqH, **{"mwapikey": mwapikey}},
+                allow_redirects=False,
+                data=req_body,
+            ) as res:
+                status = res.status
+                headers = res.headers.copy()
+                # The proxy manages its own connection with the browser
+                for header in HOP_BY_HOP_HEADERS:
+                    headers.popall(header, None)
+                headers.update(req.app["settings"]["mwi_custom_http_headers"])
+
+                if req.method == "HEAD" or res.status in (204, 304):
+                    return web.Response(headers=headers, status=res.status)
+
+                # Stream the response body back to the browser as it arrives from MATLAB.
+                response = web.StreamResponse(headers=headers, status=res.status)
+                await response.prepare(req)
+                async for chunk in res.content.iter_chunked(
+                    constants.PROXY_STREAM_CHUNK_SIZE_IN_BYTES
+                ):
+                    await response.write(chunk)
+
+                # Recorded before the end of the response, which the browser may act on immediately.
+                if (
+                    res.status == 200
+                    and req.path
+                    == f'{req.app["settings"]["base_url"]}/{constants.MATLAB_JSD_PAGE_NAME}'
+                ):
+                    state.record_jsd_page_served()
+
+                await response.write_eof()
+                return response
+        except web.HTTPRequestEntityTooLarge as err:
+            status = err.status
+            raise
+        except AdmissionQueueFullError as err:
+            logger.debug(f"Rejected request for {req.rel_url}: {err}")
+            status = web.HTTPServiceUnavailable.status_code
+            raise web.HTTPServiceUnavailable(
+                headers={hdrs.RETRY_AFTER: str(constants.PROXY_RETRY_AFTER_IN_SECONDS)}
+            )
+        except Exception as err:
+            # Once the response has started, the error can no longer be reported to the browser.
+            # Re-raising closes the connection so that the browser sees an incomplete response.
+            if response is not None and response.prepared:
+                logger.debug(f"Failed to stream response for {req.rel_url}: {err}")
+                raise
+            status = web.HTTPNotFound.status_code
+            raise web.HTTPNotFound()
+        finally:
+            record_proxied_request(req, status, response, started_at)
+
+
+def record_proxied_request(req, status, response, started_at):
+    """Records the status, latency and size of a HTTP request proxied to MATLAB in the metrics of the app.
 
-                async with client_session.request(
-                    req.method,
-                    f"{matlab_base_url}{req.rel_url}",
-                    headers={**reqH, **{"mwapikey": mwapikey}},
-                    allow_redirects=False,
-                    data=req_body,
-                ) as res:
-                    headers = res.headers.copy()
-                    body = await res.read()
-                    headers.update(req.app["settings"]["mwi_custom_http_headers"])
+    Args:
+        req (HTTPRequest): HTTPRequest Object.
+        status (int): Status of the response, None if the request was cancelled before MATLAB responded.
+        response (StreamResponse): The response streamed to the browser, None if the response has no body.
+        started_at (float): Time (as returned by time.monotonic()) at which the request was received.
+    """
+    metrics = req.app["metrics"]
+    status_class = f"{status // 100}xx" if status is not None else "none"
+    metrics["http_request_duration"].observe(
+        time.monotonic() - started_at, status_class
+    )
+    metrics["http_received_bytes"].inc(amount=req.content.total_bytes)
+    if response is not None and response.prepared:
+        metrics["http_sent_bytes"].inc(amount=response.body_length)
 
-                    return web.Response(headers=headers, status=res.status, body=body)
-            except Exception:
-                raise web.HTTPNotFound()
+
+def is_rewrite_required(req):
+    """Checks whether the body of a HTTP request must be rewritten before being proxied to MATLAB.
+
+    Args:
+        req (HTTPRequest): HTTPRequest Object.
+
+    Returns:
+        Boolean: True if the body of the request needs to be rewritten.
+    """
+    return req.method == "POST" and req.rel_url.path.endswith(
+        "messageservice/json/secure"
+    )
+
+
+async def stream_body(req, max_size):
+    """Yields the body of a HTTP request as it arrives, so that it is forwarded to MATLAB without being buffered.
+
+    Args:
+        req (HTTPRequest): HTTPRequest Object.
+        max_size (int): Maximum size of the body in bytes. 0 implies no limit.
+
+    Raises:
+        web.HTTPRequestEntityTooLarge: When the body is larger than max_size.
+
+    Yields:
+        Bytes: The chunks of the body.
+    """
+    received = 0
+    async for chunk in req.content.iter_chunked(
+        constants.PROXY_STREAM_CHUNK_SIZE_IN_BYTES
+    ):
+        received += len(chunk)
+        if max_size and received > max_size:
+            raise web.HTTPRequestEntityTooLarge(max_size=max_size, actual_size=received)
+        yield chunk
 
 
 async def transform_body(req):
@@ -540,29 +1106,212 @@ async def transform_body(req):
     Args:
         req (HTTPRequest): HTTPRequest Object.
 
+    Raises:
+        web.HTTPRequestEntityTooLarge: When the body is larger than PROXY_MAX_REWRITTEN_BODY_SIZE_IN_BYTES.
+
     Returns:
-        String: String containing JSON object representing the body of a HTTPResponse.
+        Bytes: Bytes containing the JSON object representing the body of the HTTP request.
     """
-
-    body = await req.read()
+    # The body is buffered to be rewritten, so it is bounded by its own limit rather than by the max upload size.
+    max_size = constants.PROXY_MAX_REWRITTEN_BODY_SIZE_IN_BYTES
+    body = bytearray()
+    async for chunk in req.content.iter_chunked(
+        constants.PROXY_STREAM_CHUNK_SIZE_IN_BYTES
+    ):
+        body.extend(chunk)
+        if len(body) > max_size:
+            raise web.HTTPRequestEntityTooLarge(
+                max_size=max_size, actual_size=len(body)
+            )
+    body = bytes(body)
 
     # Only attempt to rewrite requests known to need rewriting
-    if req.method == "POST" and req.rel_url.path.endswith("messageservice/json/secure"):
-        data = json.loads(body)
-        # Change messages.ClientType.properties.TYPE if necessary
+    if is_rewrite_required(req):
+        body = rewrite_client_type(body)
+
+    return body
+
+
+# Matches the whitespace allowed between the tokens of a JSON document.
+JSON_WHITESPACE_PATTERN = re.compile(r"[ \t\n\r]*")
+
+
+def find_json_member(text, pos, key, decoder):
+    """Finds the value of a member of the JSON object which starts at pos, without descending into other members.
+
+    Args:
+        text (String): The JSON document.
+        pos (int): Position of the object in text.
+        key (String): Key of the member.
+        decoder (json.JSONDecoder): Decoder used to skip the values of the other members.
+
+    Raises:
+        ValueError: If text is not a valid JSON document.
+
+    Returns:
+        int: Position of the value of the member, or None if text does not contain an object with this member at pos.
+    """
+    pos = JSON_WHITESPACE_PATTERN.match(text, pos).end()
+    if text[pos : pos + 1] != "{":
+        return None
+
+    pos = JSON_WHITESPACE_PATTERN.match(text, pos + 1).end()
+    while text[pos : pos + 1] == '"':
+        name, pos = decoder.raw_decode(text, pos)
+        pos = JSON_WHITESPACE_PATTERN.match(text, pos).end()
+        if text[pos : pos + 1] != ":":
+            raise ValueError(f"Expecting ':' delimiter at position {pos}")
+
+        pos = JSON_WHITESPACE_PATTERN.match(text, pos + 1).end()
+        if name == key:
+            return pos
+
+        _, pos = decoder.raw_decode(text, pos)
+        pos = JSON_WHITESPACE_PATTERN.match(text, pos).end()
+        if text[pos : pos + 1] != ",":
+            break
+        pos = JSON_WHITESPACE_PATTERN.match(text, pos + 1).end()
+
+    return None
+
+
+# Below this size, a messageservice request body which needs rewriting is parsed and re-serialized
+# as a whole, which is faster than locating messages.ClientType member by member.
+PARTIAL_REWRITE_MIN_BODY_SIZE_IN_BYTES = 1024
+
+
+def rewrite_jsd_client_types(client_types):
+    """Changes properties.TYPE from "jsd" to "jsd_rmt_tmw" in the ClientType messages of a messageservice request.
+
+    Args:
+        client_types (List): The decoded messages.ClientType of the request.
+
+    Returns:
+        Boolean: True if any of the messages was changed.
+    """
+    if not isinstance(client_types, list):
+        return False
+
+    replace = False
+    for client_type in client_types:
+        properties = (
+            client_type.get("properties") if isinstance(client_type, dict) else None
+        )
+        if isinstance(properties, dict) and properties.get("TYPE") == "jsd":
+            properties["TYPE"] = "jsd_rmt_tmw"
+            replace = True
+
+    return replace
+
+
+def rewrite_client_type(body):
+    """Changes messages.ClientType.properties.TYPE from "jsd" to "jsd_rmt_tmw" in a messageservice request body.
+
+    Most messages do not carry a ClientType, so the body is first scanned for the markers without
+    being parsed. When a rewrite is necessary, small bodies are parsed and re-serialized as a whole.
+    In larger bodies, only the top-level messages.ClientType is decoded and re-serialized, and is
+    patched back into the body. Either way, any ClientType nested deeper in the messages is left untouched.
+
+    Args:
+        body (Bytes): Body of the messageservice request.
+
+    Returns:
+        Bytes: The rewritten body, or the same body if no rewrite was necessary.
+    """
+    # Fast path: nothing to rewrite unless both markers are present.
+    if b'"ClientType"' not in body or b'"jsd"' not in body:
+        return body
+
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        return body
+
+    if len(body) < PARTIAL_REWRITE_MIN_BODY_SIZE_IN_BYTES:
         try:
-            replace = False
-            for client_type in data["messages"]["ClientType"]:
-                if client_type["properties"]["TYPE"] == "jsd":
-                    client_type["properties"]["TYPE"] = "jsd_rmt_tmw"
-                    replace = True
+            data = json.loads(text)
+        except ValueError:
+            return body
 
-            if replace is True:
-                body = json.dumps(data)
-        except KeyError:
-            pass
+        messages = data.get("messages") if isinstance(data, dict) else None
+        if not isinstance(messages, dict) or not rewrite_jsd_client_types(
+            messages.get("ClientType")
+        ):
+            return body
 
-    return body
+        return json.dumps(data).encode("utf-8")
+
+    decoder = json.JSONDecoder()
+    try:
+        messages_start = find_json_member(text, 0, "messages", decoder)
+        if messages_start is None:
+            return body
+
+        start = find_json_member(text, messages_start, "ClientType", decoder)
+        if start is None:
+            return body
+
+        client_types, end = decoder.raw_decode(text, start)
+    except ValueError:
+        return body
+
+    if not rewrite_jsd_client_types(client_types):
+        return body
+
+    return (text[:start] + json.dumps(client_types) + text[end:]).encode("utf-8")
+
+
+async def create_upstream_session(app):
+    """Creates the pool of keep-alive connections used to proxy HTTP requests to the
+    MATLAB Embedded Connector, and the session used to relay WebSockets to it.
+    Both live as long as the app and are closed in cleanup_background_tasks().
+
+    Args:
+        app (aiohttp server): The aiohttp server.
+    """
+    # The app is started more than once when testing with the aiohttp_client fixture.
+    if app.get("upstream_session") is not None and not app["upstream_session"].closed:
+        return
+
+    # The Embedded Connector listens on the loopback interface with a self-signed certificate.
+    # Sharing a single SSL context across the pool avoids rebuilding it for every connection.
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+
+    connector = aiohttp.TCPConnector(
+        limit=app["settings"]["mwi_proxy_pool_size"],
+        limit_per_host=app["settings"]["mwi_proxy_pool_size_per_host"],
+        keepalive_timeout=constants.PROXY_POOL_KEEPALIVE_TIMEOUT_IN_SECONDS,
+        ssl=ssl_context,
+    )
+
+    # The session is shared between all browser clients, so it must never store cookies
+    # set by the Embedded Connector. Cookies of each request are forwarded as headers instead.
+    # Response bodies are streamed to the browser as is, so they must not be decompressed.
+    # Requests are only bounded by the time between two reads, as large transfers
+    # can legitimately take longer than the default total timeout.
+    app["upstream_session"] = aiohttp.ClientSession(
+        connector=connector,
+        cookie_jar=aiohttp.DummyCookieJar(),
+        auto_decompress=False,
+        timeout=aiohttp.ClientTimeout(
+            total=None,
+            sock_read=constants.PROXY_SOCK_READ_TIMEOUT_IN_SECONDS,
+        ),
+    )
+
+    # WebSockets stay open as long as the MATLAB desktop, so they are not counted against the limit of the pool
+    # above, where they would starve the HTTP requests. Once connected, they are bounded by the heartbeat and
+    # the idle timeout of the relay rather than by a read timeout.
+    app["websocket_session"] = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=0, ssl=ssl_context),
+        cookie_jar=aiohttp.DummyCookieJar(),
+        timeout=aiohttp.ClientTimeout(total=None),
+    )
+    logger.debug(
+        f'Created pool of connections to the Embedded Connector with limit:{app["settings"]["mwi_proxy_pool_size"]}'
+    )
 
 
 async def license_init(app):
@@ -617,8 +1366,20 @@ async def cleanup_background_tasks(app):
     # First stop matlab
     state = app["state"]
     state.clean_up_mwi_server_session()
+    state.stop_revalidating_entitlements()
 
     await state.stop_matlab(force_quit=True)
+    await state.stop_standby_matlab()
+    await state.stop_xvfb()
+
+    # Close the pool of connections to the licensing servers
+    await state.licensing_client.close()
+
+    # Close the connections to the Embedded Connector
+    for session_name in ("upstream_session", "websocket_session"):
+        session = app.get(session_name)
+        if session is not None and not session.closed:
+            await session.close()
 
     # Stop any running async tasks
     logger = mwi.logger.get()
@@ -683,15 +1444,19 @@ def create_app(config_name=matlab_proxy.get_default_config_name()):
     Returns:
         aiohttp server: An aiohttp server with routes, settings and env_config.
     """
-    app = web.Application()
-
     # Get application settings
-    app["settings"] = settings.get(
-        config_name, dev=mwi_env.is_development_mode_enabled()
-    )
+    app_settings = settings.get(config_name, dev=mwi_env.is_development_mode_enabled())
+
+    app = web.Application()
+    app["settings"] = app_settings
 
     # Initialise application state
     app["state"] = AppState(app["settings"])
+    app["metrics"] = make_metrics()
+    app["admission_controller"] = AdmissionController(
+        max_concurrency=app_settings["mwi_proxy_max_concurrent_requests"],
+        max_queue_size=app_settings["mwi_proxy_max_queued_requests"],
+    )
 
     # In development mode, the node development server proxies requests to this
     # development server instead of serving the static files directly
@@ -702,6 +1467,11 @@ def create_app(config_name=matlab_proxy.get_default_config_name()):
 
     base_url = app["settings"]["base_url"]
     app.router.add_route("GET", f"{base_url}/get_status", get_status)
+    app.router.add_route("GET", f"{base_url}/get_status_events", get_status_events)
+    app.router.add_route(
+        "GET", f"{base_url}/get_startup_timeline", get_startup_timeline
+    )
+    app.router.add_route("GET", f"{base_url}/metrics", get_metrics)
     app.router.add_route(
         "POST", f"{base_url}/authenticate_request", authenticate_request
     )
@@ -720,6 +1490,7 @@ def create_app(config_name=matlab_proxy.get_default_config_name()):
     app.router.add_route("*", f"{base_url}", root_redirect)
 
     app.router.add_route("*", f"{base_url}/{{proxyPath:.*}}", matlab_view)
+    app.on_startup.append(create_upstream_session)
     app.on_cleanup.append(cleanup_background_tasks)
 
     # Setup the session storage
@@ -4,12 +4,14 @@ import asyncio
 import json
 import logging
 import os
+import secrets
 import time
 from collections import deque
 from datetime import datetime, timedelta, timezone
 
 from matlab_proxy import util
 from matlab_proxy.util import mw, mwi, system, windows
+from matlab_proxy.util.file_watcher import DirectoryWatcher
 from matlab_proxy.util.mwi import environment_variables as mwi_env
 from matlab_proxy.util.mwi import token_auth
 from matlab_proxy.util.mwi.exceptions import (
@@ -22,7 +24,13 @@ from matlab_proxy.util.mwi.exceptions import (
     XvfbError,
     log_error,
 )
-from matlab_proxy.constants import CONNECTOR_SECUREPORT_FILENAME
+from matlab_proxy.constants import (
+    CONNECTOR_SECUREPORT_FILENAME,
+    CONNECTOR_WARMUP_TASKS,
+    ENTITLEMENTS_CACHE_FILE_NAME,
+    ENTITLEMENTS_CACHE_TTL_IN_SECONDS,
+    STARTUP_TIMELINE_HISTORY_SIZE,
+)
 
 logger = mwi.logger.get()
 
@@ -37,6 +45,31 @@ class AppState:
     # The maximum amount of time in seconds the Embedded Connector can take
     # for launching, before the matlab-proxy server concludes that something is wrong.
     EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS = 120
+    # The amount of time in seconds for which the state of the Embedded Connector is reused
+    # before pinging it again. Bounds the load on the Embedded Connector irrespective of
+    # the number of browser tabs polling for the status.
+    EMBEDDED_CONNECTOR_STATE_TTL_IN_SECONDS = 1
+    # The maximum amount of time in seconds to wait for the Embedded Connector to respond to a ping.
+    EMBEDDED_CONNECTOR_PING_TIMEOUT_IN_SECONDS = 5
+    # The interval in seconds at which the Embedded Connector is pinged until it is up.
+    EMBEDDED_CONNECTOR_PING_DELAY_IN_SECONDS = 1
+    # The interval in seconds at which the Embedded Connector is pinged while MATLAB is up.
+    EMBEDDED_CONNECTOR_HEALTH_CHECK_DELAY_IN_SECONDS = 10
+    # The number of consecutive pings to which the Embedded Connector must respond as "down" while MATLAB is up,
+    # before MATLAB is moved back to the "connector-pending" state.
+    EMBEDDED_CONNECTOR_MAX_HEALTH_CHECK_FAILURES = 3
+
+    # States in the lifecycle of MATLAB mapped to the status reported to the clients.
+    # down -> starting -> connector-pending -> up -> stopping -> down
+    # starting: Xvfb and the MATLAB process are being started.
+    # connector-pending: MATLAB has written the ready file, but the Embedded Connector is not serving yet.
+    MATLAB_STATUS_FOR_STATE = {
+        "down": "down",
+        "starting": "starting",
+        "connector-pending": "starting",
+        "up": "up",
+        "stopping": "stopping",
+    }
 
     def __init__(self, settings):
         """Parameterized constructor for the AppState class.
@@ -48,6 +81,27 @@ class AppState:
         self.settings = settings
         self.processes = {"matlab": None, "xvfb": None}
 
+        # State of MATLAB, one of the keys of MATLAB_STATUS_FOR_STATE.
+        # Updated by the transitions in start_matlab() and stop_matlab() and by the tasks they start.
+        self.matlab_state = "down"
+        # Time (as returned by time.monotonic()) at which MATLAB entered its current state, and the total time in
+        # seconds spent in each of the previous states. See get_matlab_state_durations()
+        self.matlab_state_changed_at = time.monotonic()
+        self.matlab_state_durations = dict.fromkeys(self.MATLAB_STATUS_FOR_STATE, 0.0)
+        # Number of times MATLAB was restarted, and the latency of the pings to the Embedded Connector.
+        self.matlab_restarts = 0
+        self.embedded_connector_ping_latency = mwi.metrics.Histogram(
+            "matlab_proxy_embedded_connector_ping_duration_seconds",
+            "Latency of the pings to the Embedded Connector of MATLAB.",
+        )
+
+        # Incremented whenever the state of MATLAB, MATLAB Licensing or the error changes.
+        # The event is created when the first client waits for a change and is replaced after every change.
+        self.status_version = 0
+        self.status_changed_event = None
+        # Distinguishes the versions of the status of this server from those of a previous run.
+        self.status_id = secrets.token_hex(8)
+
         # The port on which MATLAB(launched by this matlab-proxy process) starts on.
         self.matlab_port = None
 
@@ -68,6 +122,48 @@ class AppState:
 
         self.licensing = None
         self.tasks = {}
+
+        # Pool of connections to the MathWorks licensing servers, shared by all the licensing requests.
+        self.licensing_client = mw.LicensingClient(
+            connect_timeout=settings["mwi_licensing_connect_timeout"],
+            read_timeout=settings["mwi_licensing_read_timeout"],
+            max_retries=settings["mwi_licensing_max_retries"],
+        )
+        # Access tokens for MHLM licensing, reused across starts of MATLAB and updates of entitlements.
+        self.access_token_cache = mw.AccessTokenCache(
+            settings["mwa_api_endpoint"], licensing_client=self.licensing_client
+        )
+        # Fetches the entitlements in the background after licensing was initialized with cached ones.
+        self.entitlements_revalidation = None
+
+        # When MWI_ENABLE_MATLAB_STANDBY is set, a second MATLAB with its own Xvfb and logs folder is started
+        # once MATLAB is up, and takes over from MATLAB when it is restarted.
+        # The task which starts the standby MATLAB, and the standby MATLAB once it is started.
+        self.standby_task = None
+        self.standby = None
+
+        # Time (as returned by time.monotonic()) at which the Embedded Connector of MATLAB was last up, and the time
+        # in seconds from then until the first page of the MATLAB desktop was served.
+        # Measures the effect of MWI_ENABLE_CONNECTOR_WARMUP.
+        self.embedded_connector_up_time = None
+        self.first_jsd_page_duration = None
+
+        # Phases reached by the latest start of MATLAB, in seconds since it was started, and those of the previous starts.
+        # See __record_startup_phase()
+        self.startup_timeline = None
+        self.startup_timelines = deque(maxlen=STARTUP_TIMELINE_HISTORY_SIZE)
+        self.startup_timeline_origin = None
+
+        # Keep track of the state of the Embedded Connector.
+        # If there is some problem with launching the Embedded Connector(say an issue with licensing),
+        # the state of MATLAB process in app_state will continue to be in a 'starting' indefinitely.
+        # This variable can be either "up" or "down"
+        self.embedded_connector_state = "down"
+
+        # Time (as returned by time.monotonic()) at which embedded_connector_state was last updated
+        # and the ping to the Embedded Connector which is in flight, if any.
+        self.embedded_connector_state_updated_at = None
+        self.embedded_connector_state_request = None
         self.logs = {
             "matlab": deque(maxlen=200),
         }
@@ -77,17 +173,60 @@ class AppState:
 
         if self.error is not None:
             self.logs["matlab"].clear()
-            return
 
-        # Keep track of when the Embedded connector starts.
-        # Would be initialized appropriately by get_embedded_connector_state() task.
-        self.embedded_connector_start_time = None
+    @property
+    def error(self):
+        """The error to be displayed to the user, if any."""
+        return self._error
+
+    @error.setter
+    def error(self, error):
+        changed = error is not getattr(self, "_error", None)
+        self._error = error
+        if changed:
+            self.notify_status_changed()
+
+    @property
+    def licensing(self):
+        """The licensing information of MATLAB, if any."""
+        return self._licensing
+
+    @licensing.setter
+    def licensing(self, licensing):
+        changed = licensing is not getattr(self, "_licensing", None)
+        self._licensing = licensing
+        if changed:
+            self.notify_status_changed()
+
+    def notify_status_changed(self):
+        """Signals the clients waiting in wait_for_status_change() that the status has changed."""
+        self.status_version += 1
+
+        if self.status_changed_event is not None:
+            self.status_changed_event.set()
+            self.status_changed_event = None
+
+    async def wait_for_status_change(self, status_version, timeout):
+        """Waits until the status changes from the given version.
 
-        # Keep track of the state of the Embedded Connector.
-        # If there is some problem with launching the Embedded Connector(say an issue with licensing),
-        # the state of MATLAB process in app_state will continue to be in a 'starting' indefinitely.
-        # This variable can be either "up" or "down"
-        self.embedded_connector_state = "down"
+        Args:
+            status_version (int): Version of the status known to the caller.
+            timeout (float): Maximum time in seconds to wait for.
+
+        Returns:
+            Boolean: True if the status has changed, False if the timeout elapsed.
+        """
+        if self.status_version != status_version:
+            return True
+
+        if self.status_changed_event is None:
+            self.status_changed_event = asyncio.Event()
+
+        try:
+            await asyncio.wait_for(self.status_changed_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
 
     def __get_cached_licensing_file(self):
         """Get the cached licensing file
@@ -98,14 +237,124 @@ class AppState:
         return self.settings["matlab_config_file"]
 
     def __delete_cached_licensing_file(self):
-        """Deletes the cached licensing file"""
+        """Deletes the cached licensing file and the entitlements cached next to it"""
+        logger.info(f"Deleting any cached licensing files!")
+        for cached_file in (
+            self.__get_cached_licensing_file(),
+            self.__get_cached_entitlements_file(),
+        ):
+            try:
+                os.remove(cached_file)
+            except FileNotFoundError:
+                # The file being absent is acceptable.
+                pass
+
+    def __get_cached_entitlements_file(self):
+        """Get the file in which entitlements are cached, next to the cached licensing file
+
+        Returns:
+            Path : Path object to cached entitlements file
+        """
+        return self.__get_cached_licensing_file().with_name(
+            ENTITLEMENTS_CACHE_FILE_NAME
+        )
+
+    def __get_cached_entitlements_key(self):
+        """Get the key under which the entitlements of the current user for the installed MATLAB are cached
+
+        Returns:
+            String: Key into the cached entitlements file
+        """
+        return f"{self.licensing['user_id']}:{self.settings['matlab_version']}"
+
+    def __read_cached_entitlements_file(self):
+        """Reads the cached entitlements file
+
+        Returns:
+            Dict: Cached entitlements keyed by user and MATLAB release. Empty if the file is absent or invalid.
+        """
         try:
-            logger.info(f"Deleting any cached licensing files!")
-            os.remove(self.__get_cached_licensing_file())
-        except FileNotFoundError:
-            # The file being absent is acceptable.
+            with open(self.__get_cached_entitlements_file(), "r") as f:
+                cached_entitlements = json.loads(f.read())
+            return cached_entitlements if isinstance(cached_entitlements, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def __write_cached_entitlements_file(self, cached_entitlements):
+        """Writes the cached entitlements file
+
+        Args:
+            cached_entitlements (Dict): Cached entitlements keyed by user and MATLAB release.
+        """
+        cached_entitlements_file = self.__get_cached_entitlements_file()
+        try:
+            cached_entitlements_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cached_entitlements_file, "w") as f:
+                f.write(json.dumps(cached_entitlements))
+        except OSError as e:
+            logger.debug(
+                f"Unable to cache entitlements in {cached_entitlements_file}: {e}"
+            )
+
+    def __get_cached_entitlements(self):
+        """Get the cached entitlements of the current user for the installed MATLAB
+
+        Returns:
+            list: Cached entitlements, None if they are absent or have expired.
+        """
+        cached = self.__read_cached_entitlements_file().get(
+            self.__get_cached_entitlements_key()
+        )
+
+        try:
+            if time.time() - cached["updated_at"] < ENTITLEMENTS_CACHE_TTL_IN_SECONDS:
+                return cached["entitlements"]
+        except (KeyError, TypeError):
             pass
 
+        return None
+
+    def __cache_entitlements(self, entitlements):
+        """Caches the entitlements of the current user for the installed MATLAB
+
+        Args:
+            entitlements (list): Entitlements to cache. When None, the cached entitlements are removed.
+        """
+        cached_entitlements = self.__read_cached_entitlements_file()
+        key = self.__get_cached_entitlements_key()
+
+        if entitlements is None:
+            if cached_entitlements.pop(key, None) is None:
+                return
+        else:
+            cached_entitlements[key] = {
+                "entitlements": entitlements,
+                "updated_at": time.time(),
+            }
+
+        self.__write_cached_entitlements_file(cached_entitlements)
+
+    async def __revalidate_entitlements(self):
+        """Updates the entitlements from mhlm servers after licensing was initialized with cached ones.
+
+        When mhlm servers cannot be reached, the cached entitlements remain in use.
+        """
+        error = self.error
+
+        if await self.update_entitlements():
+            self.persist_licensing()
+        else:
+            self.error = error
+            logger.info(
+                "Unable to update entitlements, continuing with the cached entitlements"
+            )
+
+    def stop_revalidating_entitlements(self):
+        """Cancels the update of cached entitlements in the background, if any."""
+        if self.entitlements_revalidation is not None:
+            self.entitlements_revalidation.cancel()
+            self.entitlements_revalidation = None
+
     def __reset_and_delete_cached_licensing(self):
         """Reset licensing variable of the class and removes the cached licensing file."""
         logger.info(f"Resetting cached licensing information...")
@@ -200,13 +449,27 @@ class AppState:
                         ) - timedelta(hours=1)
 
                         if expiry_window > datetime.now(timezone.utc):
-                            successful_update = (
-                                await self.__update_and_persist_licensing()
-                            )
-                            if successful_update:
+                            cached_entitlements = self.__get_cached_entitlements()
+
+                            if cached_entitlements is not None:
+                                # Use the cached entitlements right away, and update them in the background.
+                                self.licensing["entitlements"] = cached_entitlements
+                                self.entitlements_revalidation = (
+                                    util.get_event_loop().create_task(
+                                        self.__revalidate_entitlements()
+                                    )
+                                )
                                 logger.debug(
-                                    "Using cached Online Licensing to launch MATLAB."
+                                    "Using cached Online Licensing and entitlements to launch MATLAB."
+                                )
+                            else:
+                                successful_update = (
+                                    await self.__update_and_persist_licensing()
                                 )
+                                if successful_update:
+                                    logger.debug(
+                                        "Using cached Online Licensing to launch MATLAB."
+                                    )
                         else:
                             self.__reset_and_delete_cached_licensing()
                     elif licensing["type"] == "existing_license":
@@ -219,89 +482,159 @@ class AppState:
                     self.__reset_and_delete_cached_licensing()
 
     async def get_matlab_state(self):
-        """Determine the state of MATLAB to be down/starting/up.
+        """Determine the state of MATLAB to be down/starting/up/stopping.
 
         Returns:
-            String: Status of MATLAB. Returns either up, down or starting.
+            String: Status of MATLAB. Returns either up, down, starting or stopping.
         """
+        return self.MATLAB_STATUS_FOR_STATE[self.matlab_state]
 
-        # MATLAB can either be "up", "starting" or "down" state depending upon Xvfb, MATLAB and the Embedded Connector
-        matlab = self.processes["matlab"]
-        xvfb = self.processes["xvfb"]
+    def __set_matlab_state(self, matlab_state):
+        """Transitions MATLAB to the given state and notifies the clients waiting for a change.
 
-        if system.is_linux():
-            if xvfb is None or xvfb.returncode is not None:
-                logger.debug(
-                    "Xvfb has not started"
-                    if xvfb is None
-                    else f"Xvfb exited with returncode:{xvfb.returncode}"
-                )
-                return "down"
+        Args:
+            matlab_state (String): One of the states in MATLAB_STATUS_FOR_STATE.
+        """
+        if matlab_state != self.matlab_state:
+            logger.debug(
+                f"MATLAB state changed from {self.matlab_state} to {matlab_state}"
+            )
+            now = time.monotonic()
+            self.matlab_state_durations[self.matlab_state] += (
+                now - self.matlab_state_changed_at
+            )
+            self.matlab_state_changed_at = now
+            self.matlab_state = matlab_state
+            self.notify_status_changed()
 
-            if matlab is None or matlab.returncode is not None:
-                logger.debug(
-                    "MATLAB has not started"
-                    if matlab is None
-                    else f"MATLAB exited with returncode:{matlab.returncode}"
-                )
-                return "down"
+    def get_matlab_state_durations(self):
+        """Returns the total time spent by MATLAB in each state, including the time spent in its current state so far.
 
-        elif system.is_mac():
-            if matlab is None or matlab.returncode is not None:
-                logger.debug(
-                    "MATLAB has not started"
-                    if matlab is None
-                    else f"MATLAB exited with returncode:{matlab.returncode}"
-                )
-                return "down"
+        Returns:
+            Dict: Time in seconds keyed by the states in MATLAB_STATUS_FOR_STATE.
+        """
+        durations = dict(self.matlab_state_durations)
+        durations[self.matlab_state] += time.monotonic() - self.matlab_state_changed_at
+        return durations
 
-        # For windows platform
-        else:
-            if matlab is None or not matlab.is_running():
-                logger.debug(
-                    "MATLAB has not started"
-                    if matlab is None
-                    else f"MATLAB exited with returncode:{matlab.wait()}"
-                )
-                return "down"
+    async def wait_for_matlab_state(self, matlab_states, timeout=None):
+        """Waits until MATLAB is in one of the given states.
 
-        if not self.matlab_session_files["matlab_ready_file"].exists():
-            return "starting"
+        Args:
+            matlab_states (List): States in MATLAB_STATUS_FOR_STATE to wait for.
+            timeout (float, optional): Maximum time in seconds to wait for. Waits indefinitely if None.
 
-        # If execution reaches here, it implies that:
-        # 1) MATLAB process has started.
-        # 2) Embedded connector has not started yet.
+        Returns:
+            Boolean: True if MATLAB is in one of the given states, False if the timeout elapsed.
+        """
 
-        embedded_connector_status = await mwi.embedded_connector.request.get_state(
-            self.settings["mwi_server_url"]
-        )
+        async def __wait():
+            while self.matlab_state not in matlab_states:
+                await self.wait_for_status_change(self.status_version, None)
+
+        try:
+            await asyncio.wait_for(__wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def __get_embedded_connector_state(self):
+        """Returns the state of the Embedded Connector.
 
-        # Embedded Connector can be in either "up" or "down" state
-        assert embedded_connector_status in [
-            "up",
-            "down",
-        ], "Invalid embedded connector state returned"
+        The state is reused for EMBEDDED_CONNECTOR_STATE_TTL_IN_SECONDS after it is fetched and
+        concurrent callers share a single ping to the Embedded Connector.
 
-        self.embedded_connector_state = embedded_connector_status
+        Returns:
+            String: Either "up" or "down"
+        """
+        if (
+            self.embedded_connector_state_updated_at is not None
+            and time.monotonic() - self.embedded_connector_state_updated_at
+            < self.EMBEDDED_CONNECTOR_STATE_TTL_IN_SECONDS
+        ):
+            return self.embedded_connector_state
 
-        if self.embedded_connector_state == "down":
-            # So, even if the embedded connector's status is 'down', we'll
-            # return matlab status as 'starting', because the MATLAB process itself has been created
-            # and matlab-proxy is waiting for the embedded connector to start serving content.
-            matlab_status = "starting"
+        if self.embedded_connector_state_request is None:
+            self.embedded_connector_state_request = asyncio.ensure_future(
+                self.__request_embedded_connector_state()
+            )
 
-            # Update time stamp when MATLAB state is "starting".
-            if not self.embedded_connector_start_time:
-                self.embedded_connector_start_time = time.time()
+        # Shield the shared ping so that a caller being cancelled (for example, when the
+        # browser closes the connection) does not cancel it for the other callers.
+        return await asyncio.shield(self.embedded_connector_state_request)
 
-        # Embedded connector is also up, so set matlab_status to "up"
-        else:
-            matlab_status = "up"
+    async def __request_embedded_connector_state(self):
+        """Pings the Embedded Connector and updates embedded_connector_state.
+
+        If the Embedded Connector does not respond within EMBEDDED_CONNECTOR_PING_TIMEOUT_IN_SECONDS,
+        the last known state is retained.
 
-        return matlab_status
+        Returns:
+            String: Either "up" or "down"
+        """
+        this_request = asyncio.current_task()
+        ping_started_at = time.monotonic()
+
+        try:
+            embedded_connector_status = await mwi.embedded_connector.request.get_state(
+                self.__get_embedded_connector_url(self.matlab_port),
+                timeout=self.EMBEDDED_CONNECTOR_PING_TIMEOUT_IN_SECONDS,
+                headers=self.__get_embedded_connector_headers(),
+            )
+            self.embedded_connector_ping_latency.observe(
+                time.monotonic() - ping_started_at
+            )
+
+            # Embedded Connector can be in either "up" or "down" state
+            assert embedded_connector_status in [
+                "up",
+                "down",
+            ], "Invalid embedded connector state returned"
+
+        except asyncio.TimeoutError:
+            embedded_connector_status = self.embedded_connector_state
+            logger.debug(
+                f"Embedded Connector did not respond in {self.EMBEDDED_CONNECTOR_PING_TIMEOUT_IN_SECONDS} seconds, using its last known state: {embedded_connector_status}"
+            )
+
+        # Discard the result if the cache was reset while the ping was in flight,
+        # as it belongs to a MATLAB process which has been stopped since.
+        if self.embedded_connector_state_request is this_request:
+            self.embedded_connector_state = embedded_connector_status
+            self.embedded_connector_state_updated_at = time.monotonic()
+            self.embedded_connector_state_request = None
+
+        return embedded_connector_status
+
+    def __get_embedded_connector_url(self, matlab_port):
+        """Returns the URL at which the Embedded Connector is reached without going through matlab-proxy, so that
+        the requests of matlab-proxy itself do not wait behind the requests of the browsers.
+
+        Args:
+            matlab_port (int): The port on which the Embedded Connector is listening.
+
+        Returns:
+            String: The URL of the Embedded Connector.
+        """
+        return f'{self.settings["matlab_protocol"]}://127.0.0.1:{matlab_port}{self.settings["base_url"]}'
+
+    def __get_embedded_connector_headers(self):
+        """Returns the headers which matlab-proxy adds to the requests it forwards to the Embedded Connector.
+
+        Returns:
+            Dict: The headers.
+        """
+        return {"mwapikey": self.settings["mwapikey"]}
+
+    def __reset_embedded_connector_state(self):
+        """Forgets the state of the Embedded Connector of a MATLAB process which has been stopped."""
+        self.embedded_connector_state = "down"
+        self.embedded_connector_state_updated_at = None
+        self.embedded_connector_state_request = None
 
     async def set_licensing_nlm(self, conn_str):
         """Set the licensing type to NLM and the connection string."""
+        self.stop_revalidating_entitlements()
 
         # TODO Validate connection string
         self.licensing = {"type": "nlm", "conn_str": conn_str}
@@ -309,6 +642,7 @@ class AppState:
 
     def set_licensing_existing_license(self):
         """Set the licensing type to NLM and the connection string."""
+        self.stop_revalidating_entitlements()
         self.licensing = {"type": "existing_license"}
         self.persist_licensing()
 
@@ -329,9 +663,15 @@ class AppState:
             entitlements (list, optional): Eligible Entitlements of the user. Defaults to [].
             entitlement_id (String, optional): ID of an entitlement. Defaults to None.
         """
+        # The entitlements of the previous licensing must not overwrite those of the new one.
+        self.stop_revalidating_entitlements()
+
         try:
             token_data = await mw.fetch_expand_token(
-                self.settings["mwa_api_endpoint"], identity_token, source_id
+                self.settings["mwa_api_endpoint"],
+                identity_token,
+                source_id,
+                licensing_client=self.licensing_client,
             )
 
             self.licensing = {
@@ -364,7 +704,9 @@ class AppState:
     def unset_licensing(self):
         """Unset the licensing."""
 
+        self.stop_revalidating_entitlements()
         self.licensing = None
+        self.access_token_cache.invalidate()
 
         # If the error was due to licensing, clear it
         if isinstance(self.error, LicensingError):
@@ -409,8 +751,7 @@ class AppState:
 
         try:
             # Fetch an access token
-            access_token_data = await mw.fetch_access_token(
-                self.settings["mwa_api_endpoint"],
+            access_token_data = await self.access_token_cache.get(
                 self.licensing["identity_token"],
                 self.licensing["source_id"],
             )
@@ -420,11 +761,14 @@ class AppState:
                 self.settings["mhlm_api_endpoint"],
                 access_token_data["token"],
                 self.settings["matlab_version"],
+                licensing_client=self.licensing_client,
             )
 
         except EntitlementError as e:
             self.error = e
             log_error(logger, e)
+            self.access_token_cache.invalidate()
+            self.__cache_entitlements(None)
             self.licensing["identity_token"] = None
             self.licensing["source_id"] = None
             self.licensing["expiry"] = None
@@ -435,6 +779,7 @@ class AppState:
             self.licensing["profile_id"] = None
             self.licensing["entitlements"] = []
             self.licensing["entitlement_id"] = None
+            self.notify_status_changed()
             # To ensure that any entitlement errors are displayed on the control panel,
             # the function returns true. The cached license file only contains the license type
             # and the user's email address. These two attributes are necessary for preventing
@@ -455,17 +800,21 @@ class AppState:
             return False
 
         self.licensing["entitlements"] = entitlements
+        self.__cache_entitlements(entitlements)
 
         # Auto-select the entitlement if only one entitlement is returned from MHLM
         if len(entitlements) == 1:
             self.licensing["entitlement_id"] = entitlements[0]["id"]
 
+        self.notify_status_changed()
+
         # Successful update
         return True
 
     # Set the entitlement information on app state as well as the cached file
     async def update_user_selected_entitlement_info(self, entitlement_id):
         self.licensing["entitlement_id"] = entitlement_id
+        self.notify_status_changed()
         logger.debug(f"Successfully set {entitlement_id} as the entitlement_id")
         self.persist_licensing()
 
@@ -551,35 +900,38 @@ class AppState:
             # Files may not exist if cleanup is called before they are created
             pass
 
-    async def __setup_env_for_matlab(self) -> dict:
-        """Configure the environment variables required for launching MATLAB by matlab-proxy.
+    async def __get_licensing_env_for_matlab(self) -> dict:
+        """Fetch the licensing details required for launching MATLAB by matlab-proxy.
+
+        For MHLM licensing, this requests an access token over the network.
 
         Returns:
             [dict]: Containing keys as the Env variable names and values are its corresponding values.
         """
-        matlab_env = os.environ.copy()
+        licensing_env = {}
 
         # Env setup related to licensing
         # No additional env setup required if licensing type is set to existing_license
         if self.licensing["type"] == "mhlm":
             try:
-                # Request an access token
-                access_token_data = await mw.fetch_access_token(
-                    self.settings["mwa_api_endpoint"],
+                # Request an access token. MATLAB keeps using it after it is started, so one which is
+                # about to expire is not used.
+                access_token_data = await self.access_token_cache.get(
                     self.licensing["identity_token"],
                     self.licensing["source_id"],
+                    fresh=True,
                 )
-                matlab_env["MLM_WEB_LICENSE"] = "true"
-                matlab_env["MLM_WEB_USER_CRED"] = access_token_data["token"]
-                matlab_env["MLM_WEB_ID"] = self.licensing["entitlement_id"]
-                matlab_env["MW_LOGIN_EMAIL_ADDRESS"] = self.licensing["email_addr"]
-                matlab_env["MW_LOGIN_FIRST_NAME"] = self.licensing["first_name"]
-                matlab_env["MW_LOGIN_LAST_NAME"] = self.licensing["last_name"]
-                matlab_env["MW_LOGIN_DISPLAY_NAME"] = self.licensing["display_name"]
-                matlab_env["MW_LOGIN_USER_ID"] = self.licensing["user_id"]
-                matlab_env["MW_LOGIN_PROFILE_ID"] = self.licensing["profile_id"]
-
-                matlab_env["MHLM_CONTEXT"] = (
+                licensing_env["MLM_WEB_LICENSE"] = "true"
+                licensing_env["MLM_WEB_USER_CRED"] = access_token_data["token"]
+                licensing_env["MLM_WEB_ID"] = self.licensing["entitlement_id"]
+                licensing_env["MW_LOGIN_EMAIL_ADDRESS"] = self.licensing["email_addr"]
+                licensing_env["MW_LOGIN_FIRST_NAME"] = self.licensing["first_name"]
+                licensing_env["MW_LOGIN_LAST_NAME"] = self.licensing["last_name"]
+                licensing_env["MW_LOGIN_DISPLAY_NAME"] = self.licensing["display_name"]
+                licensing_env["MW_LOGIN_USER_ID"] = self.licensing["user_id"]
+                licensing_env["MW_LOGIN_PROFILE_ID"] = self.licensing["profile_id"]
+
+                licensing_env["MHLM_CONTEXT"] = (
                     "MATLAB_JAVASCRIPT_DESKTOP"
                     if os.getenv(mwi_env.get_env_name_mhlm_context()) is None
                     else os.getenv(mwi_env.get_env_name_mhlm_context())
@@ -588,7 +940,23 @@ class AppState:
                 raise e
 
         elif self.licensing["type"] == "nlm":
-            matlab_env["MLM_LICENSE_FILE"] = self.licensing["conn_str"]
+            licensing_env["MLM_LICENSE_FILE"] = self.licensing["conn_str"]
+
+        return licensing_env
+
+    def __setup_env_for_matlab(self, licensing_env) -> dict:
+        """Configure the environment variables required for launching MATLAB by matlab-proxy.
+
+        Must be called after Xvfb has started and the folder for the ready file has been created.
+
+        Args:
+            licensing_env (dict): Env variables related to licensing, as returned by __get_licensing_env_for_matlab()
+
+        Returns:
+            [dict]: Containing keys as the Env variable names and values are its corresponding values.
+        """
+        matlab_env = os.environ.copy()
+        matlab_env.update(licensing_env)
 
         # Env setup related to MATLAB
         matlab_env["MW_CRASH_MODE"] = "native"
@@ -622,12 +990,43 @@ class AppState:
                 "MW_DIAGNOSTIC_SPEC"
             ] = "connector::http::server=all;connector::lifecycle=all"
 
-        # TODO Introduce a warmup flag to enable this?
-        # matlab_env["CONNECTOR_CONFIGURABLE_WARMUP_TASKS"] = "warmup_hgweb"
-        # matlab_env["CONNECTOR_WARMUP"] = "true"
+        # Let the Embedded Connector prepare for serving the MATLAB desktop before it is first requested
+        if self.settings["mwi_enable_connector_warmup"]:
+            matlab_env["CONNECTOR_CONFIGURABLE_WARMUP_TASKS"] = CONNECTOR_WARMUP_TASKS
+            matlab_env["CONNECTOR_WARMUP"] = "true"
 
         return matlab_env
 
+    async def __start_or_reuse_xvfb_process(self):
+        """Private method to start the Xvfb process, or to reuse the running one when MWI_REUSE_XVFB is set.
+
+        Returns:
+            Boolean: True if Xvfb is running, False if creation of the process failed.
+        """
+        xvfb = self.processes["xvfb"]
+        if (
+            self.settings["mwi_reuse_xvfb"]
+            and xvfb is not None
+            and xvfb.returncode is None
+        ):
+            logger.debug(
+                f'Reusing Xvfb with PID={xvfb.pid} on DISPLAY={self.settings["matlab_display"]}'
+            )
+        else:
+            xvfb = await self.__start_xvfb_process()
+
+            # xvfb variable would be None if creation of the process failed.
+            if xvfb is None:
+                return False
+
+            self.processes["xvfb"] = xvfb
+
+        self.tasks["watch_xvfb_exit"] = util.get_event_loop().create_task(
+            self.__watch_process_exit("xvfb")
+        )
+        self.__record_startup_phase("xvfb_ready")
+        return True
+
     async def __start_xvfb_process(self):
         """Private method to start the xvfb process. Will set appropriate
         errors to self.error and return None when any exceptions are raised.
@@ -641,7 +1040,9 @@ class AppState:
         xvfb_cmd, dpipe = create_xvfb_cmd()
 
         try:
-            xvfb, display_port = await mw.create_xvfb_process(xvfb_cmd, dpipe, os.environ.copy())
+            xvfb, display_port = await mw.create_xvfb_process(
+                xvfb_cmd, dpipe, os.environ.copy()
+            )
             self.settings["matlab_display"] = ":" + str(display_port)
 
             logger.debug(f"Started Xvfb with PID={xvfb.pid} on DISPLAY={display_port}")
@@ -706,51 +1107,55 @@ class AppState:
         # If something went wrong in starting matlab, return None
         return None
 
-    async def start_matlab(self, restart_matlab=False):
-        """Start MATLAB.
+    async def __launch_matlab(self):
+        """Starts Xvfb and the MATLAB process, and prepares the ready file and the environment for MATLAB.
+        Will set appropriate errors to self.error when any step fails.
 
-        Args:
-            restart_matlab (bool, optional): Whether to restart MATLAB. Defaults to False.
+        Returns:
+            Boolean: True if the MATLAB process was started, False otherwise.
         """
 
-        # Ensure that previous processes are stopped
-        await self.stop_matlab()
-
-        # Clear MATLAB errors and logging
-        self.error = None
-        self.logs["matlab"].clear()
-
-        # Start Xvfb process if in a posix system
-        if system.is_linux():
-            xvfb = await self.__start_xvfb_process()
-
-            # xvfb variable would be None if creation of the process failed.
-            # Halt MATLAB process startup by returning early.
-            if xvfb is None:
-                return
-
-            self.processes["xvfb"] = xvfb
+        # Xvfb, the folder for the ready file and the licensing environment do not depend on
+        # each other, so prepare them concurrently and join before starting the MATLAB process.
+        xvfb_ready = (
+            asyncio.ensure_future(self.__start_or_reuse_xvfb_process())
+            if system.is_linux()
+            else None
+        )
 
         try:
             # Prepare ready file for the MATLAB process.
             self.create_logs_dir_for_MATLAB()
 
-            # Configure the environment MATLAB needs to start
-            matlab_env = await self.__setup_env_for_matlab()
-
-            logger.debug(
-                "Prepared ready file and configured the environment for MATLAB startup"
-            )
+            # Fetch the licensing details which MATLAB needs to start
+            licensing_env = await self.__get_licensing_env_for_matlab()
 
         # If there's something wrong with setting up files or env setup for starting matlab, capture the error for logging
         # and to pass to the front-end. Halt MATLAB process startup by returning early
         except Exception as err:
-            self.error = err
-            log_error(logger, err)
-            # stop_matlab() does the teardown work by removing any residual files and processes created till now
-            # which is Xvfb process creation and ready file for the MATLAB process.
-            await self.stop_matlab()
-            return
+            # Errors in starting Xvfb take precedence, as they did when Xvfb was started first.
+            if xvfb_ready is None or await xvfb_ready:
+                self.error = err
+                log_error(logger, err)
+                # stop_matlab() does the teardown work by removing any residual files and processes created till now
+                # which is Xvfb process creation and ready file for the MATLAB process.
+                await self.stop_matlab()
+            else:
+                self.__set_matlab_state("down")
+            return False
+
+        # xvfb_ready would be False if creation of the process failed.
+        # Halt MATLAB process startup by returning early.
+        if xvfb_ready is not None and not await xvfb_ready:
+            self.__set_matlab_state("down")
+            return False
+
+        # Configure the environment MATLAB needs to start
+        matlab_env = self.__setup_env_for_matlab(licensing_env)
+        logger.debug(
+            "Prepared ready file and configured the environment for MATLAB startup"
+        )
+        self.__record_startup_phase("environment_ready")
 
         # Start MATLAB Process
         logger.debug("Starting MATLAB")
@@ -762,10 +1167,45 @@ class AppState:
             # call self.stop_matlab().This does the teardown work by removing any residual files and processes created till now.
             # Force quitting matlab as something went wrong in starting the matlab process itself.
             await self.stop_matlab(force_quit=True)
-            return
+            return False
 
         logger.debug(f"Started MATLAB (PID={matlab.pid})")
         self.processes["matlab"] = matlab
+        self.__record_startup_phase("matlab_process_spawned")
+
+        return True
+
+    async def start_matlab(self, restart_matlab=False):
+        """Start MATLAB.
+
+        Args:
+            restart_matlab (bool, optional): Whether to restart MATLAB. Defaults to False.
+        """
+
+        if restart_matlab:
+            self.matlab_restarts += 1
+
+        standby = await self.__take_standby_matlab() if restart_matlab else None
+
+        # Ensure that previous processes are stopped.
+        # MATLAB is about to be replaced by the standby MATLAB, so it need not be stopped gracefully.
+        await self.stop_matlab(force_quit=standby is not None)
+
+        # Clear MATLAB errors and logging
+        self.error = None
+        self.logs["matlab"].clear()
+        self.embedded_connector_up_time = None
+        self.first_jsd_page_duration = None
+        self.__start_startup_timeline()
+
+        self.__set_matlab_state("starting")
+        loop = util.get_event_loop()
+
+        # Take over from the standby MATLAB, if it is ready, instead of launching a new MATLAB.
+        if standby is not None:
+            await self.__adopt_standby_matlab(standby)
+        elif not await self.__launch_matlab():
+            return
 
         async def __track_embedded_connector_state():
             """track_embedded_connector_state is an asyncio task to track the status of MATLAB Embedded Connector.
@@ -774,75 +1214,104 @@ class AppState:
             this_task = "track_embedded_connector_state:"
             logger.debug(f"{this_task}: Starting task...")
 
-            while True:
-                if self.embedded_connector_state == "up":
-                    logger.debug(
-                        f"{this_task}: MATLAB Embedded Connector is up, not checking for any errors in MATLABs stderr pipe. Sleeping for 10 seconds..."
-                    )
-                    # Embedded connector is up, sleep for 10 seconds and recheck again
-                    await asyncio.sleep(10)
-                    continue
+            # The startup duration of the Embedded Connector is measured from the moment MATLAB writes the ready file.
+            await self.wait_for_matlab_state(["connector-pending", "up"])
+            timeout = self.EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS
+
+            while not await self.wait_for_matlab_state(["up"], timeout):
+                # Since max allowed startup time has elapsed, it means that MATLAB is in a stuck state and cannot be launched.
+                # Set the error and stop matlab.
+                user_visible_error = (
+                    "Unable to start MATLAB.\nTry again by clicking Start MATLAB."
+                )
+
+                async def __force_stop_matlab(error):
+                    """A private method to update self.error and force stop matlab"""
+                    self.error = MatlabError(error)
+                    logger.error(f"{this_task}: {error}")
+
+                    # If force_quit is not set to True, stop_matlab() would try to
+                    # send a HTTP request to the Embedded Connector (which is already "down")
+                    await self.stop_matlab(force_quit=True)
+
+                if system.is_windows():
+                    # In WINDOWS systems, errors are raised as UI windows and cannot be captured programmatically.
+                    # So, raise a generic error wherever appropriate
+                    generic_error = f"MATLAB did not start in {int(self.EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS)} seconds. Use Windows Remote Desktop to check for any errors."
+                    logger.error(f":{this_task}: {generic_error}")
+                    if len(self.logs["matlab"]) == 0:
+                        await __force_stop_matlab(user_visible_error)
+                        # Breaking out of the loop to end this task as matlab-proxy was unable to launch MATLAB successfully
+                        # even after waiting for EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS
+                        break
+                    else:
+                        # Do not stop the MATLAB process or break from the loop (the error type is unknown)
+                        self.error = MatlabError(generic_error)
+                        timeout = 5
 
-                # Embedded connector is down, so check for how long it has been down and error out if necessary
-                # embedded_connector_start_time variable is updated by get_matlab_state().
                 else:
-                    # If its not yet set, sleep for 1 second and recheck again
-                    if not self.embedded_connector_start_time:
-                        await asyncio.sleep(1)
+                    # If there are no logs after the max startup time has elapsed, it means that MATLAB is in a stuck state and cannot be launched.
+                    # Set the error and stop matlab.
+                    logger.error(
+                        f":{this_task}: MATLAB did not start in {int(self.EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS)} seconds!"
+                    )
+                    if len(self.logs["matlab"]) == 0:
+                        await __force_stop_matlab(user_visible_error)
+                        # Breaking out of the loop to end this task as matlab-proxy was unable to launch MATLAB successfully
+                        # even after waiting for EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS
+                        break
+                    timeout = None
+
+        async def __watch_embedded_connector(delay):
+            """Task which pings the Embedded Connector after MATLAB has written the ready file,
+            until the Embedded Connector is up.
+
+            While MATLAB is up, the Embedded Connector keeps being pinged every EMBEDDED_CONNECTOR_HEALTH_CHECK_DELAY_IN_SECONDS.
+            After EMBEDDED_CONNECTOR_MAX_HEALTH_CHECK_FAILURES consecutive pings to which it responds as "down",
+            MATLAB is moved back to the "connector-pending" state until the Embedded Connector is up again.
+            A ping which times out does not count as a failure, as a busy MATLAB can be slow to respond.
+
+            Args:
+                delay (int): time delay in seconds between the pings
+            """
+            await self.wait_for_matlab_state(["connector-pending"])
+            health_check_failures = 0
+
+            while self.matlab_state in ["connector-pending", "up"]:
+                if self.matlab_state == "connector-pending":
+                    if await self.__get_embedded_connector_state() != "up":
+                        await asyncio.sleep(delay)
                         continue
 
-                    else:
-                        time_diff = time.time() - self.embedded_connector_start_time
-                        if (
-                            time_diff
-                            > self.EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS
-                        ):
-                            # Since max allowed startup time has elapsed, it means that MATLAB is in a stuck state and cannot be launched.
-                            # Set the error and stop matlab.
-                            user_visible_error = "Unable to start MATLAB.\nTry again by clicking Start MATLAB."
-
-                            async def __force_stop_matlab(error):
-                                """A private method to update self.error and force stop matlab"""
-                                self.error = MatlabError(error)
-                                logger.error(f"{this_task}: {error}")
-
-                                # If force_quit is not set to True, stop_matlab() would try to
-                                # send a HTTP request to the Embedded Connector (which is already "down")
-                                await self.stop_matlab(force_quit=True)
-
-                            if system.is_windows():
-                                # In WINDOWS systems, errors are raised as UI windows and cannot be captured programmatically.
-                                # So, raise a generic error wherever appropriate
-                                generic_error = f"MATLAB did not start in {int(self.EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS)} seconds. Use Windows Remote Desktop to check for any errors."
-                                logger.error(f":{this_task}: {generic_error}")
-                                if len(self.logs["matlab"]) == 0:
-                                    await __force_stop_matlab(user_visible_error)
-                                    # Breaking out of the loop to end this task as matlab-proxy was unable to launch MATLAB successfully
-                                    # even after waiting for EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS
-                                    break
-                                else:
-                                    # Do not stop the MATLAB process or break from the loop (the error type is unknown)
-                                    self.error = MatlabError(generic_error)
-                                    await asyncio.sleep(5)
-                                    continue
+                    if self.matlab_state == "connector-pending":
+                        if self.embedded_connector_up_time is None:
+                            self.embedded_connector_up_time = time.monotonic()
+                            self.__record_startup_phase("embedded_connector_up")
+                        self.__set_matlab_state("up")
+                        self.__start_standby_matlab_in_background()
+                        health_check_failures = 0
+                    continue
 
-                            else:
-                                # If there are no logs after the max startup time has elapsed, it means that MATLAB is in a stuck state and cannot be launched.
-                                # Set the error and stop matlab.
-                                logger.error(
-                                    f":{this_task}: MATLAB did not start in {int(self.EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS)} seconds!"
-                                )
-                                if len(self.logs["matlab"]) == 0:
-                                    await __force_stop_matlab(user_visible_error)
-                                    # Breaking out of the loop to end this task as matlab-proxy was unable to launch MATLAB successfully
-                                    # even after waiting for EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS
-                                    break
+                await asyncio.sleep(
+                    self.EMBEDDED_CONNECTOR_HEALTH_CHECK_DELAY_IN_SECONDS
+                )
+                if self.matlab_state != "up":
+                    continue
 
-                        else:
-                            logger.debug(
-                                f"{this_task}: MATLAB has been in a 'starting' state for {int(time_diff)} seconds. Sleeping for 1 second..."
-                            )
-                            await asyncio.sleep(1)
+                if await self.__get_embedded_connector_state() == "up":
+                    health_check_failures = 0
+                    continue
+
+                health_check_failures += 1
+                if (
+                    health_check_failures
+                    >= self.EMBEDDED_CONNECTOR_MAX_HEALTH_CHECK_FAILURES
+                    and self.matlab_state == "up"
+                ):
+                    logger.warning(
+                        f"Embedded Connector did not respond to {health_check_failures} consecutive pings, waiting for it to be up again"
+                    )
+                    self.__set_matlab_state("connector-pending")
 
         async def __matlab_stderr_reader_posix():
             """matlab_stderr_reader_posix is an asyncio task which reads the stderr pipe of the MATLAB process, parses it
@@ -889,28 +1358,364 @@ class AppState:
                 )
 
         async def __read_matlab_ready_file(delay):
-            # reads with delays from the file where connector has written its port information
-            while not self.matlab_session_files["matlab_ready_file"].exists():
-                await asyncio.sleep(delay)
+            self.matlab_port = await self.__wait_for_matlab_port(
+                self.matlab_session_files["matlab_ready_file"], delay
+            )
+            self.__record_startup_phase("ready_file_seen")
+            logger.debug(
+                f"MATLAB Ready file successfully read, matlab_port set to: {self.matlab_port}"
+            )
 
-            with open(self.matlab_session_files["matlab_ready_file"]) as f:
-                self.matlab_port = int(f.read())
-                logger.debug(
-                    f"MATLAB Ready file successfully read, matlab_port set to: {self.matlab_port}"
-                )
+            if self.matlab_state == "starting":
+                self.__set_matlab_state("connector-pending")
 
-        loop = util.get_event_loop()
         # Start all tasks relevant to MATLAB process
+        self.tasks["watch_matlab_exit"] = loop.create_task(
+            self.__watch_process_exit("matlab")
+        )
         self.tasks["matlab_stderr_reader_posix"] = loop.create_task(
             __matlab_stderr_reader_posix()
         )
         self.tasks["track_embedded_connector_state"] = loop.create_task(
             __track_embedded_connector_state()
         )
+        self.tasks["watch_embedded_connector"] = loop.create_task(
+            __watch_embedded_connector(self.EMBEDDED_CONNECTOR_PING_DELAY_IN_SECONDS)
+        )
         self.tasks["update_matlab_port"] = loop.create_task(
             __update_matlab_port(self.MATLAB_PORT_CHECK_DELAY_IN_SECONDS)
         )
 
+    def __start_startup_timeline(self):
+        """Starts a new timeline of the phases of the startup of MATLAB, and adds it to the history."""
+        self.startup_timeline_origin = time.monotonic()
+        self.startup_timeline = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "phases": {},
+        }
+        self.startup_timelines.append(self.startup_timeline)
+
+    def __record_startup_phase(self, phase):
+        """Records the time at which the startup of MATLAB reached a phase, unless it was already reached.
+
+        The phases are, in order: "xvfb_ready" (Linux only), "environment_ready" (including the access token for
+        MHLM licensing), "matlab_process_spawned", "ready_file_seen", "embedded_connector_up" and
+        "first_jsd_page_served". When the standby MATLAB takes over, the first three phases are replaced by
+        "standby_matlab_adopted".
+
+        Args:
+            phase (String): Name of the phase.
+        """
+        if self.startup_timeline is None or phase in self.startup_timeline["phases"]:
+            return
+
+        elapsed = round(time.monotonic() - self.startup_timeline_origin, 3)
+        self.startup_timeline["phases"][phase] = elapsed
+        logger.debug(f"MATLAB startup reached phase {phase} after {elapsed:.3f}s")
+
+    def get_startup_timelines(self):
+        """Returns the timeline of the latest start of MATLAB and those of the previous starts.
+
+        Returns:
+            Dict: Containing the latest timeline as "current" and all the timelines, oldest first, as "history".
+                Phases are in seconds since MATLAB was started.
+        """
+        return {
+            "current": self.startup_timeline,
+            "history": list(self.startup_timelines),
+        }
+
+    def record_jsd_page_served(self):
+        """Records the time from the Embedded Connector being up until the first page of the MATLAB desktop was served.
+
+        Only the first page served after each start of MATLAB is recorded.
+        """
+        if (
+            self.embedded_connector_up_time is None
+            or self.first_jsd_page_duration is not None
+        ):
+            return
+
+        self.first_jsd_page_duration = (
+            time.monotonic() - self.embedded_connector_up_time
+        )
+        self.__record_startup_phase("first_jsd_page_served")
+        logger.info(
+            f"MATLAB desktop was first served {self.first_jsd_page_duration:.2f} seconds after the Embedded Connector was up "
+            f"(connector warm-up {'enabled' if self.settings['mwi_enable_connector_warmup'] else 'disabled'})"
+        )
+
+    async def __wait_for_matlab_port(self, matlab_ready_file, delay):
+        """Waits for the Embedded Connector to write its port to the ready file.
+
+        Args:
+            matlab_ready_file (Path): The ready file.
+            delay (int): Time in seconds between checks for the ready file. Only used when its
+                folder cannot be watched and has to be polled instead.
+
+        Returns:
+            int: The port on which the Embedded Connector is listening.
+        """
+        with DirectoryWatcher(matlab_ready_file.parent, delay) as watcher:
+            await watcher.wait_for_file(matlab_ready_file.name)
+
+            # The ready file can be created before the port is written to it.
+            matlab_port = matlab_ready_file.read_text().strip()
+            while not matlab_port:
+                await watcher.wait_for_write(matlab_ready_file.name)
+                matlab_port = matlab_ready_file.read_text().strip()
+
+        return int(matlab_port)
+
+    def __start_standby_matlab_in_background(self):
+        """Starts the standby MATLAB in the background, if it is enabled and not already started."""
+        if (
+            self.settings["mwi_enable_matlab_standby"]
+            and system.is_posix()
+            and self.is_licensed()
+            # MATLAB does not write a ready file in development mode
+            and self.mwi_logs_dir is not None
+            and self.standby is None
+            and (self.standby_task is None or self.standby_task.done())
+        ):
+            self.standby_task = util.get_event_loop().create_task(
+                self.__start_standby_matlab()
+            )
+
+    def __get_standby_logs_dir(self):
+        """Returns the folder for the logs of the standby MATLAB, which differs from that of the running MATLAB.
+
+        Returns:
+            Path: The folder.
+        """
+        mwi_logs_root_dir = self.settings["mwi_logs_root_dir"]
+        standby_logs_dir = mwi_logs_root_dir / f"{self.settings['app_port']}-standby"
+
+        if self.mwi_logs_dir == standby_logs_dir:
+            return mwi_logs_root_dir / str(self.settings["app_port"])
+        return standby_logs_dir
+
+    async def __start_standby_matlab(self):
+        """Task which starts the standby MATLAB with its own Xvfb and logs folder, and waits for its
+        Embedded Connector to be up. Errors are logged, they do not affect the running MATLAB.
+        """
+        mwi_logs_dir = self.__get_standby_logs_dir()
+        standby = {
+            "matlab": None,
+            "xvfb": None,
+            "matlab_display": self.settings["matlab_display"],
+            "mwi_logs_dir": mwi_logs_dir,
+            "matlab_ready_file": mwi_logs_dir / CONNECTOR_SECUREPORT_FILENAME,
+            # Set once the Embedded Connector of the standby MATLAB is up
+            "matlab_port": None,
+            "logs": deque(maxlen=200),
+            "stderr_reader": None,
+        }
+        self.standby = standby
+        logger.debug(f"Starting standby MATLAB with logs folder {mwi_logs_dir}")
+
+        try:
+            mwi_logs_dir.mkdir(parents=True, exist_ok=True)
+            standby["matlab_ready_file"].unlink(missing_ok=True)
+
+            if system.is_linux():
+                xvfb_cmd, dpipe = self.settings["create_xvfb_cmd"]()
+                standby["xvfb"], display_port = await mw.create_xvfb_process(
+                    xvfb_cmd, dpipe, os.environ.copy()
+                )
+                standby["matlab_display"] = f":{display_port}"
+
+            matlab_env = self.__setup_env_for_matlab(
+                await self.__get_licensing_env_for_matlab()
+            )
+            matlab_env["MATLAB_LOG_DIR"] = str(mwi_logs_dir)
+            if system.is_linux():
+                matlab_env["DISPLAY"] = standby["matlab_display"]
+
+            standby["matlab"] = await self.__start_matlab_process(matlab_env)
+            standby["stderr_reader"] = util.get_event_loop().create_task(
+                self.__read_standby_matlab_stderr(standby)
+            )
+            logger.debug(f"Started standby MATLAB (PID={standby['matlab'].pid})")
+
+            standby["matlab_port"] = await asyncio.wait_for(
+                self.__wait_for_standby_embedded_connector(standby),
+                self.EMBEDDED_CONNECTOR_MAX_STARTUP_DURATION_IN_SECONDS,
+            )
+            logger.info(
+                f"Standby MATLAB is ready on port {standby['matlab_port']}, it takes over when MATLAB is restarted"
+            )
+
+        except Exception as err:
+            logger.error(f"Unable to start the standby MATLAB: {err}")
+            await self.__stop_standby_processes(standby)
+            if self.standby is standby:
+                self.standby = None
+
+    async def __wait_for_standby_embedded_connector(self, standby):
+        """Waits for the Embedded Connector of the standby MATLAB to be up.
+
+        Args:
+            standby (Dict): The standby MATLAB.
+
+        Returns:
+            int: The port on which the Embedded Connector is listening.
+        """
+        matlab_port = await self.__wait_for_matlab_port(
+            standby["matlab_ready_file"], self.MATLAB_PORT_CHECK_DELAY_IN_SECONDS
+        )
+        url = self.__get_embedded_connector_url(matlab_port)
+
+        while True:
+            try:
+                if (
+                    await mwi.embedded_connector.request.get_state(
+                        url,
+                        timeout=self.EMBEDDED_CONNECTOR_PING_TIMEOUT_IN_SECONDS,
+                        headers=self.__get_embedded_connector_headers(),
+                    )
+                    == "up"
+                ):
+                    return matlab_port
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(self.EMBEDDED_CONNECTOR_PING_DELAY_IN_SECONDS)
+
+    async def __read_standby_matlab_stderr(self, standby):
+        """Task which reads the stderr pipe of the standby MATLAB into its logs, so that the pipe does not fill up.
+
+        Args:
+            standby (Dict): The standby MATLAB.
+        """
+        stderr = standby["matlab"].stderr
+        while not stderr.at_eof():
+            line = await stderr.readline()
+            if not line:
+                break
+            standby["logs"].append(line)
+
+    async def __take_standby_matlab(self):
+        """Hands over the standby MATLAB, if its Embedded Connector is up and its processes are running.
+
+        A standby MATLAB which is still starting, or whose processes have exited, is stopped, so that it
+        does not share the logs folder of the MATLAB launched instead. A new one is started once MATLAB is up.
+
+        Returns:
+            Dict: The standby MATLAB, or None if there is none ready.
+        """
+        standby = self.standby
+        if standby is None:
+            # The task may not have set up the standby MATLAB yet
+            await self.stop_standby_matlab()
+            return None
+
+        if any(
+            standby[process_name] is not None
+            and standby[process_name].returncode is not None
+            for process_name in ["matlab", "xvfb"]
+        ):
+            logger.info("The standby MATLAB has exited, launching MATLAB instead")
+            await self.stop_standby_matlab()
+            return None
+
+        if standby["matlab_port"] is None:
+            logger.info("The standby MATLAB is not ready yet, launching MATLAB instead")
+            await self.stop_standby_matlab()
+            return None
+
+        self.standby = None
+        return standby
+
+    async def __adopt_standby_matlab(self, standby):
+        """Makes the standby MATLAB the running MATLAB. Must be called after the previous MATLAB is stopped.
+
+        The Embedded Connector of the standby MATLAB is up, so the tasks started by start_matlab()
+        find the port in its ready file and move MATLAB to the "up" state right away.
+
+        Args:
+            standby (Dict): The standby MATLAB, as returned by __take_standby_matlab()
+        """
+        standby["stderr_reader"].cancel()
+        try:
+            await standby["stderr_reader"]
+        except asyncio.CancelledError:
+            pass
+
+        if standby["xvfb"] is not None:
+            # Xvfb of the previous MATLAB is still running when it is reused
+            await self.stop_xvfb()
+            self.processes["xvfb"] = standby["xvfb"]
+            self.settings["matlab_display"] = standby["matlab_display"]
+            self.tasks["watch_xvfb_exit"] = util.get_event_loop().create_task(
+                self.__watch_process_exit("xvfb")
+            )
+
+        self.processes["matlab"] = standby["matlab"]
+        self.mwi_logs_dir = standby["mwi_logs_dir"]
+        self.matlab_session_files["matlab_ready_file"] = standby["matlab_ready_file"]
+        self.logs["matlab"].extend(standby["logs"])
+
+        logger.info(
+            f"Switched to the standby MATLAB (PID={standby['matlab'].pid}) on port {standby['matlab_port']}"
+        )
+        self.__record_startup_phase("standby_matlab_adopted")
+
+    async def __stop_standby_processes(self, standby):
+        """Terminates the processes of the standby MATLAB and removes its ready file.
+
+        Args:
+            standby (Dict): The standby MATLAB.
+        """
+        if standby["stderr_reader"] is not None:
+            standby["stderr_reader"].cancel()
+
+        for process_name in ["matlab", "xvfb"]:
+            process = standby[process_name]
+            if process is not None and process.returncode is None:
+                logger.debug(f"Terminating standby {process_name} (PID={process.pid})")
+                process.terminate()
+                await process.wait()
+
+        standby["matlab_ready_file"].unlink(missing_ok=True)
+
+    async def stop_standby_matlab(self):
+        """Stops the standby MATLAB, if any. Called when it can no longer take over from MATLAB,
+        for instance when the licensing changes."""
+        standby_task = self.standby_task
+        if standby_task is not None and not standby_task.done():
+            standby_task.cancel()
+            try:
+                await standby_task
+            except asyncio.CancelledError:
+                pass
+        self.standby_task = None
+
+        standby = self.standby
+        if standby is not None:
+            self.standby = None
+            logger.info("Stopping the standby MATLAB")
+            await self.__stop_standby_processes(standby)
+
+    async def __watch_process_exit(self, process_name):
+        """Task which transitions MATLAB to the "down" state when the MATLAB or Xvfb process exits
+        without being stopped by stop_matlab().
+
+        Args:
+            process_name (String): Either "matlab" or "xvfb"
+        """
+        process = self.processes[process_name]
+
+        # In posix systems, process is an instance of asyncio.subprocess.Process()
+        # In windows systems, process is an instance of psutil.Process() whose wait() blocks
+        if system.is_windows():
+            returncode = await util.get_event_loop().run_in_executor(None, process.wait)
+        else:
+            returncode = await process.wait()
+
+        if self.matlab_state not in ["stopping", "down"]:
+            logger.info(f"{process_name} exited with returncode:{returncode}")
+            self.__set_matlab_state("down")
+
     """
     async def __send_terminate_integration_request(self):
         Private method to programmatically shutdown the matlab-proxy server.
@@ -981,11 +1786,14 @@ class AppState:
         try:
             data = mwi.embedded_connector.helpers.get_data_to_eval_mcode("exit")
             url = mwi.embedded_connector.helpers.get_mvm_endpoint(
-                self.settings["mwi_server_url"]
+                self.__get_embedded_connector_url(self.matlab_port)
             )
 
             resp_json = await mwi.embedded_connector.send_request(
-                url=url, method="POST", data=data, headers=None
+                url=url,
+                method="POST",
+                data=data,
+                headers=self.__get_embedded_connector_headers(),
             )
 
             if resp_json["messages"]["EvalResponse"][0]["isError"]:
@@ -998,6 +1806,11 @@ class AppState:
 
     async def stop_matlab(self, force_quit=False):
         """Terminate MATLAB."""
+        # The Embedded Connector is not up while MATLAB is starting, so MATLAB cannot be stopped gracefully.
+        is_matlab_starting = await self.get_matlab_state() == "starting"
+        if self.matlab_state != "down":
+            self.__set_matlab_state("stopping")
+
         # Clean up session files which determine various states of the server &/ MATLAB.
         # Do this first as stopping MATLAB/Xvfb takes longer and may fail
         try:
@@ -1021,7 +1834,7 @@ class AppState:
                 # OR
                 # When force_quit is set to True
                 # directly terminate the MATLAB process instead.
-                if await self.get_matlab_state() == "starting" or force_quit:
+                if is_matlab_starting or force_quit:
                     logger.debug("Forcing the MATLAB process to terminate...")
                     matlab.terminate()
                     waiters.append(matlab.wait())
@@ -1053,7 +1866,7 @@ class AppState:
             else:
                 # In a windows system
                 if system.is_windows() and matlab.is_running():
-                    if await self.get_matlab_state() == "starting" or force_quit:
+                    if is_matlab_starting or force_quit:
                         matlab.terminate()
                         matlab.wait()
 
@@ -1088,19 +1901,15 @@ class AppState:
 
         logger.info("Stopped (any running) MATLAB process.")
 
-        # Terminating Xvfb
-        if system.is_posix():
-            xvfb = self.processes["xvfb"]
-            if xvfb is not None and xvfb.returncode is None:
-                logger.info(f"Terminating Xvfb (PID={xvfb.pid})")
-                xvfb.terminate()
-                waiters.append(xvfb.wait())
-
         if len(waiters) > 0:
-            logger.debug("Waiting for MATLAB/Xvfb to terminate")
+            logger.debug("Waiting for MATLAB to terminate")
             for waiter in waiters:
                 await waiter
 
+        # Terminating Xvfb, unless it is reused by the next MATLAB process.
+        if not self.settings["mwi_reuse_xvfb"]:
+            await self.stop_xvfb()
+
         # Canceling all the async tasks in the list
         for name, task in list(self.tasks.items()):
             if task:
@@ -1121,8 +1930,19 @@ class AppState:
 
         # Update matlab_port information in the event of intentionally stopping MATLAB
         self.matlab_port = None
+        self.__reset_embedded_connector_state()
+        self.__set_matlab_state("down")
         logger.debug("Completed Shutdown!!!")
 
+    async def stop_xvfb(self):
+        """Terminate Xvfb."""
+        if system.is_posix():
+            xvfb = self.processes["xvfb"]
+            if xvfb is not None and xvfb.returncode is None:
+                logger.info(f"Terminating Xvfb (PID={xvfb.pid})")
+                xvfb.terminate()
+                await xvfb.wait()
+
     async def handle_matlab_output(self):
         """Parse MATLAB output from stdout and raise errors if any."""
         matlab = self.processes["matlab"]
@@ -3,3 +3,63 @@
 """This module defines project-level constants"""
 CONNECTOR_SECUREPORT_FILENAME = "connector.securePort"
 VERSION_INFO_FILE_NAME = "VersionInfo.xml"
+# Page of the MATLAB desktop (JSD) served by the Embedded Connector
+MATLAB_JSD_PAGE_NAME = "index-jsd-cr.html"
+# Entitlements are cached in this file, next to the cached licensing information
+ENTITLEMENTS_CACHE_FILE_NAME = "entitlements_cache.json"
+
+# Defaults for the pool of keep-alive connections used to proxy requests to the Embedded Connector
+DEFAULT_PROXY_POOL_SIZE = 100
+DEFAULT_PROXY_POOL_SIZE_PER_HOST = 0
+PROXY_POOL_KEEPALIVE_TIMEOUT_IN_SECONDS = 30
+
+# Request bodies larger than this limit are rejected by the proxy
+DEFAULT_PROXY_MAX_UPLOAD_SIZE_IN_MB = 1024
+# Requests beyond this number of requests in flight to the Embedded Connector wait in a queue of bounded size.
+# Once it is full, requests are rejected with HTTP status 503 and a Retry-After header. 0 implies no limit.
+DEFAULT_PROXY_MAX_CONCURRENT_REQUESTS = 0
+DEFAULT_PROXY_MAX_QUEUED_REQUESTS = 100
+PROXY_RETRY_AFTER_IN_SECONDS = 1
+# Request bodies which are buffered to be rewritten before being proxied, such as messageservice requests,
+# are rejected beyond this size
+PROXY_MAX_REWRITTEN_BODY_SIZE_IN_BYTES = 1024 * 1024
+# Size of the chunks in which request and response bodies are streamed through the proxy
+PROXY_STREAM_CHUNK_SIZE_IN_BYTES = 64 * 1024
+# Proxied requests fail if MATLAB does not send any data for this long
+PROXY_SOCK_READ_TIMEOUT_IN_SECONDS = 300
+# WebSocket messages larger than this limit close the WebSocket with the code MESSAGE_TOO_BIG
+DEFAULT_WEBSOCKET_MAX_MESSAGE_SIZE_IN_MB = 64
+# Interval at which WebSockets which did not receive any message are pinged, and the time after which
+# a relay without any text or binary message is reaped. 0 implies none.
+DEFAULT_WEBSOCKET_HEARTBEAT_INTERVAL_IN_SECONDS = 30
+DEFAULT_WEBSOCKET_IDLE_TIMEOUT_IN_SECONDS = 0
+
+# Interval at which a comment is sent on an idle status events stream to keep it from being closed by proxies.
+STATUS_EVENTS_KEEPALIVE_INTERVAL_IN_SECONDS = 15
+# Upper bound for the time a get_status request waits for the status to change.
+MAX_STATUS_WAIT_IN_SECONDS = 30
+
+# Maximum time to wait for Xvfb to write the display number it has chosen
+XVFB_DISPLAY_NUMBER_TIMEOUT_IN_SECONDS = 10
+
+# Lifetime assumed for an access token when the MWA API endpoint does not report when it expires
+ACCESS_TOKEN_LIFETIME_IN_SECONDS = 15 * 60
+# Cached access tokens are refreshed in the background when they are this close to expiring
+ACCESS_TOKEN_REFRESH_MARGIN_IN_SECONDS = 60
+
+# Cached entitlements are used to initialize licensing for this long after they were fetched
+ENTITLEMENTS_CACHE_TTL_IN_SECONDS = 24 * 60 * 60
+
+# Defaults for the requests to the MathWorks licensing servers. Requests which fail with a
+# connection error or a 5xx response are retried after a random delay of up to
+# LICENSING_RETRY_BACKOFF_IN_SECONDS * 2**attempt seconds.
+DEFAULT_LICENSING_CONNECT_TIMEOUT_IN_SECONDS = 10
+DEFAULT_LICENSING_READ_TIMEOUT_IN_SECONDS = 30
+DEFAULT_LICENSING_MAX_RETRIES = 2
+LICENSING_RETRY_BACKOFF_IN_SECONDS = 0.5
+
+# Warm-up tasks run by the Embedded Connector when MWI_ENABLE_CONNECTOR_WARMUP is set
+CONNECTOR_WARMUP_TASKS = "warmup_hgweb"
+
+# Number of MATLAB startup timelines kept by matlab-proxy, including the one for the running MATLAB
+STARTUP_TIMELINE_HISTORY_SIZE = 10
@@ -7,7 +7,7 @@ import socket
 import sys
 import time
 
-from aiohttp import web
+from aiohttp import WSMsgType, web
 
 from matlab_proxy import settings
 from matlab_proxy.util.mwi import environment_variables as mwi_env
@@ -135,8 +135,26 @@ async def delete_request_handler(request):
     return web.Response(text=await request.text())
 
 
+async def stream_request_handler(request):
+    """API Endpoint used for testing the streaming of large HTTP request and response bodies through the proxy server.
+
+    Args:
+        request (HTTPRequest): HTTPRequest object
+
+    Returns:
+        StreamResponse: StreamResponse object which streams back the received body.
+    """
+    response = web.StreamResponse()
+    await response.prepare(request)
+    async for chunk in request.content.iter_any():
+        await response.write(chunk)
+    await response.write_eof()
+    return response
+
+
 async def web_socket_handler(request):
     """API Endpoint used for testing the WebSocket Response for the proxy server.
+    Sends a greeting and then echoes the messages it receives, of any size, until the WebSocket is closed.
 
     Args:
         request (HTTPRequest): HTTPRequest object
@@ -144,10 +162,18 @@ async def web_socket_handler(request):
     Returns:
         WebSocket Response: Web Socket Response object
     """
-    ws = web.WebSocketResponse()
+    ws = web.WebSocketResponse(max_msg_size=0)
     await ws.prepare(request)
     await ws.send_str("Hello world")
 
+    async for msg in ws:
+        if msg.type == WSMsgType.TEXT:
+            await ws.send_str(msg.data)
+        elif msg.type == WSMsgType.BINARY:
+            await ws.send_bytes(msg.data)
+
+    return ws
+
 
 async def fake_matlab_started(app):
     """After the specified delay in seconds, create the ready_file unless it should error.
@@ -244,6 +270,8 @@ def matlab(args):
 
     app.router.add_route("DELETE", "/http_delete_request.html", delete_request_handler)
 
+    app.router.add_route("PUT", "/http_stream_request.html", stream_request_handler)
+
     app.router.add_route("GET", "/http_ws_request.html/", web_socket_handler)
 
     app.on_startup.append(start_background_tasks)
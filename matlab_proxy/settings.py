@@ -10,6 +10,7 @@ import uuid
 import xml.etree.ElementTree as ET
 
 import matlab_proxy
+from matlab_proxy import constants
 from matlab_proxy.constants import VERSION_INFO_FILE_NAME
 from matlab_proxy.util import mwi, system
 from matlab_proxy.util.mwi import environment_variables as mwi_env
@@ -111,6 +112,74 @@ def get_mwi_logs_root_dir(dev=False):
     return get_mwi_config_folder(dev) / "ports"
 
 
+def get_proxy_tuning_settings():
+    """Returns the tunables of the proxy, the WebSocket relay, MATLAB startup and licensing requests,
+    which are the same in development and server settings.
+
+    Returns:
+        Dict: Containing the tunables, read from their environment variables.
+    """
+    return {
+        # Sizing of the pool of keep-alive connections used to proxy requests to the Embedded Connector
+        "mwi_proxy_pool_size": mwi.validators.validate_non_negative_number(
+            os.getenv(mwi_env.get_env_name_proxy_pool_size()),
+            default=constants.DEFAULT_PROXY_POOL_SIZE,
+            env_var_name=mwi_env.get_env_name_proxy_pool_size(),
+        ),
+        "mwi_proxy_pool_size_per_host": mwi.validators.validate_non_negative_number(
+            os.getenv(mwi_env.get_env_name_proxy_pool_size_per_host()),
+            default=constants.DEFAULT_PROXY_POOL_SIZE_PER_HOST,
+            env_var_name=mwi_env.get_env_name_proxy_pool_size_per_host(),
+        ),
+        "mwi_proxy_max_upload_size": get_max_upload_size_in_bytes(),
+        "mwi_proxy_max_concurrent_requests": mwi.validators.validate_non_negative_number(
+            os.getenv(mwi_env.get_env_name_proxy_max_concurrent_requests()),
+            default=constants.DEFAULT_PROXY_MAX_CONCURRENT_REQUESTS,
+            env_var_name=mwi_env.get_env_name_proxy_max_concurrent_requests(),
+        ),
+        "mwi_proxy_max_queued_requests": mwi.validators.validate_non_negative_number(
+            os.getenv(mwi_env.get_env_name_proxy_max_queued_requests()),
+            default=constants.DEFAULT_PROXY_MAX_QUEUED_REQUESTS,
+            env_var_name=mwi_env.get_env_name_proxy_max_queued_requests(),
+        ),
+        "mwi_websocket_max_message_size": get_websocket_max_message_size_in_bytes(),
+        "mwi_websocket_heartbeat_interval": mwi.validators.validate_non_negative_number(
+            os.getenv(mwi_env.get_env_name_websocket_heartbeat_interval()),
+            default=constants.DEFAULT_WEBSOCKET_HEARTBEAT_INTERVAL_IN_SECONDS,
+            env_var_name=mwi_env.get_env_name_websocket_heartbeat_interval(),
+            number_type=float,
+        ),
+        "mwi_websocket_idle_timeout": mwi.validators.validate_non_negative_number(
+            os.getenv(mwi_env.get_env_name_websocket_idle_timeout()),
+            default=constants.DEFAULT_WEBSOCKET_IDLE_TIMEOUT_IN_SECONDS,
+            env_var_name=mwi_env.get_env_name_websocket_idle_timeout(),
+            number_type=float,
+        ),
+        "mwi_reuse_xvfb": mwi_env.is_xvfb_reuse_enabled(),
+        "mwi_enable_matlab_standby": mwi_env.is_matlab_standby_enabled(),
+        "mwi_enable_connector_warmup": mwi_env.is_connector_warmup_enabled(),
+        "mwi_enable_browser_websocket_compression": mwi_env.is_browser_websocket_compression_enabled(),
+        "mwi_enable_connector_websocket_compression": mwi_env.is_connector_websocket_compression_enabled(),
+        "mwi_licensing_connect_timeout": mwi.validators.validate_non_negative_number(
+            os.getenv(mwi_env.get_env_name_licensing_connect_timeout()),
+            default=constants.DEFAULT_LICENSING_CONNECT_TIMEOUT_IN_SECONDS,
+            env_var_name=mwi_env.get_env_name_licensing_connect_timeout(),
+            number_type=float,
+        ),
+        "mwi_licensing_read_timeout": mwi.validators.validate_non_negative_number(
+            os.getenv(mwi_env.get_env_name_licensing_read_timeout()),
+            default=constants.DEFAULT_LICENSING_READ_TIMEOUT_IN_SECONDS,
+            env_var_name=mwi_env.get_env_name_licensing_read_timeout(),
+            number_type=float,
+        ),
+        "mwi_licensing_max_retries": mwi.validators.validate_non_negative_number(
+            os.getenv(mwi_env.get_env_name_licensing_max_retries()),
+            default=constants.DEFAULT_LICENSING_MAX_RETRIES,
+            env_var_name=mwi_env.get_env_name_licensing_max_retries(),
+        ),
+    }
+
+
 def get_dev_settings(config):
     devel_file = Path(__file__).resolve().parent / "./devel.py"
     mwi_config_folder = get_mwi_config_folder(dev=True)
@@ -152,6 +221,7 @@ def get_dev_settings(config):
         "mwi_use_existing_license": mwi.validators.validate_use_existing_licensing(
             os.getenv(mwi_env.get_env_name_mwi_use_existing_license(), "")
         ),
+        **get_proxy_tuning_settings(),
     }
 
 
@@ -265,6 +335,7 @@ def get_server_settings(config_name):
         "ssl_context": get_ssl_context(
             ssl_cert_file=ssl_cert_file, ssl_key_file=ssl_key_file
         ),
+        **get_proxy_tuning_settings(),
     }
 
 
@@ -320,6 +391,36 @@ def get_matlab_settings():
     }
 
 
+def get_max_upload_size_in_bytes():
+    """Returns the maximum size of a request body which matlab-proxy forwards to MATLAB.
+
+    Returns:
+        int: Size in bytes. 0 implies no limit.
+    """
+    max_upload_size_in_mb = mwi.validators.validate_non_negative_number(
+        os.getenv(mwi_env.get_env_name_proxy_max_upload_size()),
+        default=constants.DEFAULT_PROXY_MAX_UPLOAD_SIZE_IN_MB,
+        env_var_name=mwi_env.get_env_name_proxy_max_upload_size(),
+        number_type=float,
+    )
+    return int(max_upload_size_in_mb * 1024 * 1024)
+
+
+def get_websocket_max_message_size_in_bytes():
+    """Returns the maximum size of a WebSocket message which matlab-proxy relays between the browser and MATLAB.
+
+    Returns:
+        int: Size in bytes. 0 implies no limit.
+    """
+    max_message_size_in_mb = mwi.validators.validate_non_negative_number(
+        os.getenv(mwi_env.get_env_name_websocket_max_message_size()),
+        default=constants.DEFAULT_WEBSOCKET_MAX_MESSAGE_SIZE_IN_MB,
+        env_var_name=mwi_env.get_env_name_websocket_max_message_size(),
+        number_type=float,
+    )
+    return int(max_message_size_in_mb * 1024 * 1024)
+
+
 def get_mw_context_tags(extension_name):
     """Returns a string which combines existing MW_CONTEXT_TAGS value and context tags
     specific to where matlab-proxy is being launched from.
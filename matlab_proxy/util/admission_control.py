@@ -0,0 +1,119 @@
+# Copyright 2023 The MathWorks, Inc.
+"""This file contains the admission control which bounds the number of concurrent requests to the Embedded Connector."""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from matlab_proxy.util import mwi
+from matlab_proxy.util.mwi.exceptions import AdmissionQueueFullError
+
+
+class AdmissionController:
+    """Bounds the number of requests in flight to the Embedded Connector.
+
+    Requests beyond max_concurrency wait in a queue and are admitted in the order in which they arrived, as requests
+    in flight complete. Once max_queue_size requests are waiting, further requests are rejected immediately.
+    The number of requests in flight and waiting, the time spent waiting and the rejected requests are recorded in
+    metrics which are exposed on the /metrics endpoint of the server.
+    """
+
+    def __init__(self, max_concurrency, max_queue_size):
+        """Creates an admission controller without any request in flight.
+
+        Args:
+            max_concurrency (int): Maximum number of requests in flight. 0 implies no limit.
+            max_queue_size (int): Maximum number of requests waiting to be admitted. 0 implies requests are
+                rejected as soon as max_concurrency requests are in flight.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+
+        self.in_flight = 0
+        # Futures of the waiting requests, in the order in which they arrived
+        self.__waiters = deque()
+
+        self.queue_depth = mwi.metrics.Gauge(
+            "matlab_proxy_admission_queue_depth",
+            "Number of requests waiting to be sent to the Embedded Connector.",
+        )
+        self.in_flight_requests = mwi.metrics.Gauge(
+            "matlab_proxy_admission_in_flight_requests",
+            "Number of requests in flight to the Embedded Connector.",
+        )
+        self.wait_duration = mwi.metrics.Histogram(
+            "matlab_proxy_admission_wait_duration_seconds",
+            "Time requests waited before being sent to the Embedded Connector.",
+        )
+        self.rejected_requests = mwi.metrics.Counter(
+            "matlab_proxy_admission_rejected_requests_total",
+            "Number of requests rejected because the queue of waiting requests was full.",
+        )
+
+    @asynccontextmanager
+    async def admit(self):
+        """Waits until the request can be sent to the Embedded Connector. The request is in flight until the
+        context is exited.
+
+        Raises:
+            AdmissionQueueFullError: When the limit of concurrent requests is reached and the queue is full.
+        """
+        if not self.max_concurrency:
+            yield
+            return
+
+        if self.in_flight < self.max_concurrency and not self.__waiters:
+            self.in_flight += 1
+            self.wait_duration.observe(0)
+        else:
+            await self.__wait()
+
+        self.in_flight_requests.set(self.in_flight)
+        try:
+            yield
+        finally:
+            self.__release()
+
+    async def __wait(self):
+        """Waits in the queue until a request in flight hands over its place.
+
+        Raises:
+            AdmissionQueueFullError: When the queue is full.
+        """
+        if len(self.__waiters) >= self.max_queue_size:
+            self.rejected_requests.inc()
+            raise AdmissionQueueFullError(
+                f"{self.in_flight} requests are in flight and {len(self.__waiters)} are waiting"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.__waiters.append(waiter)
+        self.queue_depth.set(len(self.__waiters))
+        started_at = time.monotonic()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The place was handed over just before the request was cancelled, so hand it over again.
+            if waiter.done() and not waiter.cancelled():
+                self.__release()
+            else:
+                self.__waiters.remove(waiter)
+            raise
+        finally:
+            self.queue_depth.set(len(self.__waiters))
+
+        self.wait_duration.observe(time.monotonic() - started_at)
+
+    def __release(self):
+        """Hands over the place of a request which completed to the oldest waiting request, if any."""
+        while self.__waiters:
+            waiter = self.__waiters.popleft()
+            if not waiter.done():
+                # The number of requests in flight is unchanged, as the waiting request takes this place.
+                waiter.set_result(None)
+                return
+
+        self.in_flight -= 1
+        self.in_flight_requests.set(self.in_flight)
@@ -0,0 +1,183 @@
+# Copyright 2023 The MathWorks, Inc.
+import asyncio
+import ctypes
+import os
+import struct
+from pathlib import Path
+
+from matlab_proxy.util import mwi, system
+
+""" This file contains a facility to wait for files to be written to a directory.
+On Linux, the directory is watched with inotify through the event loop. On other platforms,
+or when inotify is unavailable, the directory is polled instead.
+"""
+
+logger = mwi.logger.get()
+
+# Constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# struct inotify_event {int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[];}
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+INOTIFY_READ_SIZE_IN_BYTES = 64 * 1024
+
+
+def _get_libc():
+    """Returns the C library of the current process if it provides inotify, else None.
+
+    Returns:
+        ctypes.CDLL: The C library.
+    """
+    if not system.is_linux():
+        return None
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class DirectoryWatcher:
+    """Waits for files to be written to a directory.
+
+    Files which are written completely (closed after writing or moved into the directory) are
+    reported through inotify on Linux. On other platforms, or when inotify cannot be used,
+    the directory is polled every poll_interval seconds.
+
+    Must be created and used from within a running event loop. Use as a context manager
+    or call close() to release the inotify file descriptor.
+    """
+
+    def __init__(self, directory, poll_interval=1):
+        """Starts watching the directory.
+
+        Args:
+            directory (str | Path): Directory to watch. Must exist.
+            poll_interval (int, optional): Interval in seconds at which the directory is polled when
+                inotify is not available. Defaults to 1.
+        """
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+
+        self.__loop = asyncio.get_running_loop()
+        self.__fd = None
+        # Names of the files written since the watch started, and an event which is set after every batch of them.
+        self.__files_written = set()
+        self.__files_written_event = asyncio.Event()
+
+        libc = _get_libc()
+        if libc is None:
+            logger.debug(f"inotify is not available, polling {self.directory}")
+            return
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logger.debug(
+                f"inotify_init1 failed with errno:{ctypes.get_errno()}, polling {self.directory}"
+            )
+            return
+
+        if (
+            libc.inotify_add_watch(
+                fd, os.fsencode(self.directory), IN_CLOSE_WRITE | IN_MOVED_TO
+            )
+            < 0
+        ):
+            logger.debug(
+                f"inotify_add_watch failed with errno:{ctypes.get_errno()}, polling {self.directory}"
+            )
+            os.close(fd)
+            return
+
+        self.__fd = fd
+        self.__loop.add_reader(fd, self.__read_events)
+
+    @property
+    def is_polling(self):
+        """True if the directory is polled instead of being watched with inotify."""
+        return self.__fd is None
+
+    def __read_events(self):
+        """Reads the pending inotify events and wakes up the waiters."""
+        try:
+            data = os.read(self.__fd, INOTIFY_READ_SIZE_IN_BYTES)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+            offset += INOTIFY_EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            # When the kernel drops events (IN_Q_OVERFLOW), the waiters fall back to checking the directory.
+            if name and not mask & IN_Q_OVERFLOW:
+                self.__files_written.add(os.fsdecode(name))
+
+        self.__files_written_event.set()
+        self.__files_written_event = asyncio.Event()
+
+    async def wait_for_file(self, name):
+        """Waits until the file with the given name has been written to the directory.
+
+        Returns immediately if the file already exists.
+
+        Args:
+            name (str): Name of the file.
+
+        Returns:
+            Path: Path to the file.
+        """
+        path = self.directory / name
+
+        while not path.exists():
+            if self.is_polling:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            # The watch was set up before the file was checked for, so a file which is
+            # written in between is reported by the next batch of events.
+            await self.__files_written_event.wait()
+
+            if name in self.__files_written:
+                break
+
+        return path
+
+    async def wait_for_write(self, name):
+        """Waits until the file with the given name is written to again.
+
+        When the directory is polled, waits for poll_interval seconds instead.
+
+        Args:
+            name (str): Name of the file.
+        """
+        self.__files_written.discard(name)
+
+        if self.is_polling:
+            await asyncio.sleep(self.poll_interval)
+            return
+
+        while name not in self.__files_written:
+            await self.__files_written_event.wait()
+
+    def close(self):
+        """Stops watching the directory."""
+        if self.__fd is not None:
+            self.__loop.remove_reader(self.__fd)
+            os.close(self.__fd)
+            self.__fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
@@ -2,10 +2,23 @@
 
 import asyncio
 import os
-import select
+import random
+import sys
+import time
 import xml.etree.ElementTree as ET
+from contextlib import asynccontextmanager
+from datetime import datetime
 
 import aiohttp
+from matlab_proxy.constants import (
+    ACCESS_TOKEN_LIFETIME_IN_SECONDS,
+    ACCESS_TOKEN_REFRESH_MARGIN_IN_SECONDS,
+    DEFAULT_LICENSING_CONNECT_TIMEOUT_IN_SECONDS,
+    DEFAULT_LICENSING_MAX_RETRIES,
+    DEFAULT_LICENSING_READ_TIMEOUT_IN_SECONDS,
+    LICENSING_RETRY_BACKOFF_IN_SECONDS,
+    XVFB_DISPLAY_NUMBER_TIMEOUT_IN_SECONDS,
+)
 from matlab_proxy.default_configuration import config
 from matlab_proxy.util import mwi
 from matlab_proxy.util.mwi.exceptions import (
@@ -28,14 +41,170 @@ def __get_licensing_url():
     return f"{config['doc_url']}blob/main/MATLAB-Licensing-Info.md"
 
 
-async def fetch_entitlements(mhlm_api_endpoint, access_token, matlab_release):
+class LicensingClient:
+    """Sends requests to the MathWorks licensing servers over a pool of keep-alive connections.
+
+    Requests are bounded by connect and read timeouts. Requests which fail with a connection error,
+    a timeout or a 5xx response are retried after a random, exponentially increasing delay.
+    The latency and the retries of the requests are recorded per URL in the request_duration and
+    request_retries metrics, which are exposed on the /metrics endpoint of the server.
+    """
+
+    def __init__(
+        self,
+        connect_timeout=DEFAULT_LICENSING_CONNECT_TIMEOUT_IN_SECONDS,
+        read_timeout=DEFAULT_LICENSING_READ_TIMEOUT_IN_SECONDS,
+        max_retries=DEFAULT_LICENSING_MAX_RETRIES,
+        retry_backoff=LICENSING_RETRY_BACKOFF_IN_SECONDS,
+    ):
+        """Creates a client. The session is created when the first request is sent.
+
+        Args:
+            connect_timeout (float, optional): Maximum time in seconds to connect to a server. 0 implies no limit.
+                Defaults to DEFAULT_LICENSING_CONNECT_TIMEOUT_IN_SECONDS.
+            read_timeout (float, optional): Maximum time in seconds to wait for data from a server. 0 implies no limit.
+                Defaults to DEFAULT_LICENSING_READ_TIMEOUT_IN_SECONDS.
+            max_retries (int, optional): Number of times a failed request is retried. Defaults to DEFAULT_LICENSING_MAX_RETRIES.
+            retry_backoff (float, optional): Base of the delay in seconds between retries. Defaults to LICENSING_RETRY_BACKOFF_IN_SECONDS.
+        """
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout or None, sock_read=read_timeout or None
+        )
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self.__session = None
+        self.request_duration = mwi.metrics.Histogram(
+            "matlab_proxy_licensing_request_duration_seconds",
+            "Latency of the attempts to send requests to the MathWorks licensing servers.",
+            labelnames=("url", "outcome"),
+        )
+        self.request_retries = mwi.metrics.Counter(
+            "matlab_proxy_licensing_request_retries_total",
+            "Number of requests to the MathWorks licensing servers which were sent again.",
+            labelnames=("url",),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+    def __get_session(self):
+        """Returns the session, creating it if it does not exist or was closed.
+
+        Returns:
+            aiohttp.ClientSession: The session.
+        """
+        if self.__session is None or self.__session.closed:
+            self.__session = aiohttp.ClientSession(timeout=self.timeout)
+        return self.__session
+
+    async def close(self):
+        """Closes the connections to the licensing servers."""
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+        self.__session = None
+
+    def __record(self, url, latency, failed, retried):
+        """Records the outcome of an attempt to send a request.
+
+        Args:
+            url (String): URL of the request.
+            latency (float): Time in seconds the attempt took.
+            failed (bool): True if the attempt failed.
+            retried (bool): True if the request is sent again.
+        """
+        self.request_duration.observe(latency, url, "failure" if failed else "success")
+        if retried:
+            self.request_retries.inc(url)
+
+    @asynccontextmanager
+    async def post(self, url, **kwargs):
+        """Sends a POST request, retrying it when it fails with a connection error, a timeout or a 5xx response.
+
+        Args:
+            url (String): URL of the request.
+            **kwargs: Passed on to aiohttp.ClientSession.post(). Must not be a stream which can only be read once.
+
+        Raises:
+            OnlineLicensingError: When the request fails with a connection error or a timeout after all the retries.
+
+        Yields:
+            aiohttp.ClientResponse: The response. Responses with a 5xx status are yielded once there are no retries left.
+        """
+        session = self.__get_session()
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.max_retries + 1):
+            retry = attempt < self.max_retries
+            start_time = loop.time()
+            request = session.post(url, **kwargs)
+
+            try:
+                res = await request.__aenter__()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                latency = loop.time() - start_time
+                self.__record(url, latency, failed=True, retried=retry)
+                logger.debug(
+                    f"POST {url} failed after {latency:.3f}s (attempt {attempt + 1}): {e!r}"
+                )
+                if not retry:
+                    raise OnlineLicensingError(
+                        f"Communication with {url} failed: {e!r}"
+                    ) from e
+            else:
+                latency = loop.time() - start_time
+                failed = res.status >= 500
+                self.__record(url, latency, failed=failed, retried=failed and retry)
+                logger.debug(
+                    f"POST {url} responded with {res.status} in {latency:.3f}s (attempt {attempt + 1})"
+                )
+                if not (failed and retry):
+                    break
+                await request.__aexit__(None, None, None)
+
+            # Full jitter keeps the retries of concurrent clients from arriving in bursts
+            await asyncio.sleep(random.uniform(0, self.retry_backoff * 2**attempt))
+
+        try:
+            yield res
+        finally:
+            await request.__aexit__(*sys.exc_info())
+
+
+@asynccontextmanager
+async def __post(licensing_client, url, **kwargs):
+    """Sends a POST request with the given client, or with a client for just this request if it is None.
+
+    Args:
+        licensing_client (LicensingClient | None): Client with which to send the request.
+        url (String): URL of the request.
+        **kwargs: Passed on to LicensingClient.post().
+
+    Yields:
+        aiohttp.ClientResponse: The response.
+    """
+    if licensing_client is None:
+        async with LicensingClient() as licensing_client:
+            async with licensing_client.post(url, **kwargs) as res:
+                yield res
+    else:
+        async with licensing_client.post(url, **kwargs) as res:
+            yield res
+
+
+async def fetch_entitlements(
+    mhlm_api_endpoint, access_token, matlab_release, licensing_client=None
+):
     """Asynchronously fetch entitlements from MHLM endpoint. Used when licensing using MHLM.
 
     Args:
         mhlm_api_endpoint (String): URL of the API endpoint for fetching entitlements from MHLM.
         access_token (String): An access token which was requested by the fetch_acces_token() method
         matlab_release (String): MATLAB Release version installed in the system.
-        mhlm_context: Environment specific info sent to the mhlm_api_endpoint
+        licensing_client (LicensingClient, optional): Client with which to send the request. Defaults to a client for just this request.
 
     Raises:
         OnlineLicensingError: Raised when unable to receive proper response from MHLM servers.
@@ -45,52 +214,53 @@ async def fetch_entitlements(mhlm_api_endpoint, access_token, matlab_release):
         list: Representing a list of Dicts containing the id, label and license_number.
     """
     # Get entitlements for token
-    async with aiohttp.ClientSession() as client_session:
-        async with client_session.post(
-            mhlm_api_endpoint,
-            headers={"content-type": "application/x-www-form-urlencoded"},
-            data=aiohttp.FormData(
-                {
-                    "token": access_token,
-                    "release": matlab_release,
-                    "coreProduct": "ML",
-                    "context": "jupyter",
-                    "excludeExpired": "true",
-                }
-            ),
-        ) as res:
-            if not res.ok:
-                raise OnlineLicensingError(
-                    f"Communication with {mhlm_api_endpoint} failed ({res.status}). For more details, see {__get_licensing_url()}."
-                )
-
-            root = ET.fromstring(await res.text())
-            entitlement_el = root.find("entitlements")
-
-            if entitlement_el is None or len(entitlement_el) == 0:
-                raise EntitlementError(
-                    f"Your MathWorks account is not linked to a valid license for MATLAB {matlab_release}.\nSign out and login with a licensed user."
-                )
-
-            entitlements = entitlement_el.findall("entitlement")
-
-            return [
-                {
-                    "id": entitlement.find("id").text,
-                    "label": entitlement.find("label").text,
-                    "license_number": entitlement.find("license_number").text,
-                }
-                for entitlement in entitlements
-            ]
+    async with __post(
+        licensing_client,
+        mhlm_api_endpoint,
+        headers={"content-type": "application/x-www-form-urlencoded"},
+        data={
+            "token": access_token,
+            "release": matlab_release,
+            "coreProduct": "ML",
+            "context": "jupyter",
+            "excludeExpired": "true",
+        },
+    ) as res:
+        if not res.ok:
+            raise OnlineLicensingError(
+                f"Communication with {mhlm_api_endpoint} failed ({res.status}). For more details, see {__get_licensing_url()}."
+            )
+
+        root = ET.fromstring(await res.text())
+        entitlement_el = root.find("entitlements")
+
+        if entitlement_el is None or len(entitlement_el) == 0:
+            raise EntitlementError(
+                f"Your MathWorks account is not linked to a valid license for MATLAB {matlab_release}.\nSign out and login with a licensed user."
+            )
+
+        entitlements = entitlement_el.findall("entitlement")
+
+        return [
+            {
+                "id": entitlement.find("id").text,
+                "label": entitlement.find("label").text,
+                "license_number": entitlement.find("license_number").text,
+            }
+            for entitlement in entitlements
+        ]
 
 
-async def fetch_expand_token(mwa_api_endpoint, identity_token, source_id):
+async def fetch_expand_token(
+    mwa_api_endpoint, identity_token, source_id, licensing_client=None
+):
     """Asynchronously fetch tokens from MWA API endpoint.
 
     Args:
         mwa_api_endpoint (String): URL of the MWA API endpoint.
         identity_token (String): Identity token received from MHLM servers by the front end.
         source_id (String): Source ID received from MHLM servers by the front end.
+        licensing_client (LicensingClient, optional): Client with which to send the request. Defaults to a client for just this request.
 
     Raises:
         OnlineLicensingError: When unable to contact MWA API endpoint.
@@ -98,80 +268,233 @@ async def fetch_expand_token(mwa_api_endpoint, identity_token, source_id):
     Returns:
         Dict: Containing User and License expiration details.
     """
-    async with aiohttp.ClientSession() as client_session:
-        async with client_session.post(
-            f"{mwa_api_endpoint}/tokens",
-            headers={
-                "content-type": "application/x-www-form-urlencoded",
-                "accept": "application/json",
-                "X_MW_WS_callerId": "desktop-jupyter",
-            },
-            data=aiohttp.FormData(
-                {
-                    "tokenString": identity_token,
-                    "tokenPolicyName": "R2",
-                    "sourceId": source_id,
-                }
-            ),
-        ) as res:
-            if not res.ok:
-                raise OnlineLicensingError(
-                    f"Communication with {mwa_api_endpoint} failed ({res.status}). For more details, see {__get_licensing_url()}."
-                )
-
-            data = await res.json()
-
-            return {
-                "expiry": data["expirationDate"],
-                "first_name": data["referenceDetail"]["firstName"],
-                "last_name": data["referenceDetail"]["lastName"],
-                "display_name": data["referenceDetail"]["displayName"],
-                "user_id": data["referenceDetail"]["userId"],
-                "profile_id": data["referenceDetail"]["referenceId"],
-            }
-
-
-async def fetch_access_token(mwa_api_endpoint, identity_token, source_id):
+    async with __post(
+        licensing_client,
+        f"{mwa_api_endpoint}/tokens",
+        headers={
+            "content-type": "application/x-www-form-urlencoded",
+            "accept": "application/json",
+            "X_MW_WS_callerId": "desktop-jupyter",
+        },
+        data={
+            "tokenString": identity_token,
+            "tokenPolicyName": "R2",
+            "sourceId": source_id,
+        },
+    ) as res:
+        if not res.ok:
+            raise OnlineLicensingError(
+                f"Communication with {mwa_api_endpoint} failed ({res.status}). For more details, see {__get_licensing_url()}."
+            )
+
+        data = await res.json()
+
+        return {
+            "expiry": data["expirationDate"],
+            "first_name": data["referenceDetail"]["firstName"],
+            "last_name": data["referenceDetail"]["lastName"],
+            "display_name": data["referenceDetail"]["displayName"],
+            "user_id": data["referenceDetail"]["userId"],
+            "profile_id": data["referenceDetail"]["referenceId"],
+        }
+
+
+async def fetch_access_token(
+    mwa_api_endpoint, identity_token, source_id, licensing_client=None
+):
     """Asynchronously fetch access token from MWA API endpoint.
 
     Args:
         mwa_api_endpoint (String): URL of the MWA API endpoint.
         identity_token (String): String representing unique identity
         source_id (String): []
+        licensing_client (LicensingClient, optional): Client with which to send the request. Defaults to a client for just this request.
 
     Raises:
         OnlineLicensingError: When unable to contact MWA API endpoint.
 
     Returns:
-        Dict : Containing the Access token.
+        Dict : Containing the Access token and its expiry, if reported by the endpoint.
+    """
+    async with __post(
+        licensing_client,
+        f"{mwa_api_endpoint}/tokens/access",
+        headers={
+            "content-type": "application/x-www-form-urlencoded",
+            "accept": "application/json",
+            "X_MW_WS_callerId": "desktop-jupyter",
+        },
+        data={
+            "tokenString": identity_token,
+            "type": "MWAS",
+            "sourceId": source_id,
+        },
+    ) as res:
+        if not res.ok:
+            raise OnlineLicensingError(
+                f"Communication with {mwa_api_endpoint} failed ({res.status}). For more details, see {__get_licensing_url()}."
+            )
+
+        data = await res.json()
+
+        return {
+            "token": data["accessTokenString"],
+            "expiry": data.get("expirationDate"),
+        }
+
+
+class AccessTokenCache:
+    """Caches the access tokens fetched from the MWA API endpoint until shortly before they expire.
+
+    Access tokens are cached per identity token and source id. Concurrent callers share a single
+    request to the endpoint. A cached access token which is about to expire is still returned,
+    while a new one is fetched in the background, unless the caller asks for a fresh one.
     """
-    async with aiohttp.ClientSession() as client_session:
-        async with client_session.post(
-            f"{mwa_api_endpoint}/tokens/access",
-            headers={
-                "content-type": "application/x-www-form-urlencoded",
-                "accept": "application/json",
-                "X_MW_WS_callerId": "desktop-jupyter",
-            },
-            data=aiohttp.FormData(
-                {
-                    "tokenString": identity_token,
-                    "type": "MWAS",
-                    "sourceId": source_id,
-                }
-            ),
-        ) as res:
-            if not res.ok:
-                raise OnlineLicensingError(
-                    f"Communication with {mwa_api_endpoint} failed ({res.status}). For more details, see {__get_licensing_url()}."
-                )
 
-            data = await res.json()
+    def __init__(
+        self,
+        mwa_api_endpoint,
+        refresh_margin=ACCESS_TOKEN_REFRESH_MARGIN_IN_SECONDS,
+        licensing_client=None,
+    ):
+        """Creates an empty cache.
+
+        Args:
+            mwa_api_endpoint (String): URL of the MWA API endpoint.
+            refresh_margin (int, optional): Time in seconds before its expiry at which an access token is refreshed.
+                Defaults to ACCESS_TOKEN_REFRESH_MARGIN_IN_SECONDS.
+            licensing_client (LicensingClient, optional): Client with which to fetch the access tokens.
+                Defaults to a client for each request.
+        """
+        self.mwa_api_endpoint = mwa_api_endpoint
+        self.refresh_margin = refresh_margin
+        self.licensing_client = licensing_client
+
+        # Access token data and the time at which it expires, keyed by (identity_token, source_id)
+        self.__access_tokens = {}
+        # Pending requests for access tokens, keyed by (identity_token, source_id)
+        self.__requests = {}
+        # Incremented on invalidation so that requests which were pending at that time are not cached.
+        self.__generation = 0
+
+    async def get(self, identity_token, source_id, fresh=False):
+        """Returns an access token, fetching it from the MWA API endpoint when none is cached.
+
+        Args:
+            identity_token (String): Identity token received from MHLM servers by the front end.
+            source_id (String): Source ID received from MHLM servers by the front end.
+            fresh (bool, optional): If True, an access token which is about to expire is not returned.
+                Its refresh is awaited instead, so that the access token is valid for at least refresh_margin
+                seconds. Defaults to False.
+
+        Raises:
+            OnlineLicensingError: When unable to contact MWA API endpoint.
+
+        Returns:
+            Dict : Containing the Access token.
+        """
+        key = (identity_token, source_id)
+        cached = self.__access_tokens.get(key)
+        now = time.time()
+
+        if cached is not None and now < cached["expires_at"]:
+            if now < cached["expires_at"] - self.refresh_margin:
+                return cached["access_token_data"]
+
+            request = self.__request(key)
+            if not fresh:
+                return cached["access_token_data"]
+            return await asyncio.shield(request)
+
+        # Shielded, so that a caller which is cancelled does not cancel the request for the others.
+        return await asyncio.shield(self.__request(key))
+
+    def invalidate(self):
+        """Discards all the cached access tokens."""
+        self.__access_tokens.clear()
+        self.__requests.clear()
+        self.__generation += 1
+
+    def __request(self, key):
+        """Returns the pending request for an access token, starting one if there is none.
+
+        Args:
+            key (tuple): (identity_token, source_id)
+
+        Returns:
+            asyncio.Task: Resolves to the access token data.
+        """
+        request = self.__requests.get(key)
+
+        if request is None:
+            request = asyncio.ensure_future(self.__fetch(key, self.__generation))
+            request.add_done_callback(
+                lambda request: self.__on_request_done(key, request)
+            )
+            self.__requests[key] = request
+
+        return request
+
+    async def __fetch(self, key, generation):
+        """Fetches an access token from the MWA API endpoint and caches it.
+
+        Args:
+            key (tuple): (identity_token, source_id)
+            generation (int): Generation of the cache at the time the request was made.
+
+        Returns:
+            Dict : Containing the Access token.
+        """
+        identity_token, source_id = key
+        access_token_data = await fetch_access_token(
+            self.mwa_api_endpoint,
+            identity_token,
+            source_id,
+            licensing_client=self.licensing_client,
+        )
 
-            return {
-                "token": data["accessTokenString"],
+        if generation == self.__generation:
+            self.__access_tokens[key] = {
+                "access_token_data": access_token_data,
+                "expires_at": self.__get_expiry_time(access_token_data),
             }
 
+        return access_token_data
+
+    def __on_request_done(self, key, request):
+        """Removes a finished request and logs its failure.
+
+        Args:
+            key (tuple): (identity_token, source_id)
+            request (asyncio.Task): The finished request.
+        """
+        if self.__requests.get(key) is request:
+            del self.__requests[key]
+
+        # Retrieving the exception also keeps asyncio from warning about background refreshes
+        # whose failure nobody awaited. The cached access token is used until it expires.
+        if not request.cancelled() and request.exception() is not None:
+            logger.debug(
+                f"Failed to fetch an access token from {self.mwa_api_endpoint}: {request.exception()}"
+            )
+
+    @staticmethod
+    def __get_expiry_time(access_token_data):
+        """Returns the time at which an access token expires.
+
+        Args:
+            access_token_data (Dict): Access token data returned by fetch_access_token()
+
+        Returns:
+            float: Seconds since the epoch.
+        """
+        try:
+            return datetime.strptime(
+                access_token_data["expiry"], "%Y-%m-%dT%H:%M:%S.%f%z"
+            ).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return time.time() + ACCESS_TOKEN_LIFETIME_IN_SECONDS
+
 
 def range_matlab_connector_ports():
     """Generator of acceptable ports for MATLAB Connector.
@@ -257,24 +580,27 @@ def parse_other_error(logs):
     )
 
 
-async def create_xvfb_process(xvfb_cmd, pipe, env={}):
+async def create_xvfb_process(
+    xvfb_cmd, pipe, env={}, timeout=XVFB_DISPLAY_NUMBER_TIMEOUT_IN_SECONDS
+):
     """Creates the Xvfb process.
 
     The Xvfb process is run with '-displayfd' flag set. This makes Xvfb choose an available
     display number and write it into the provided write descriptor. ie: pipe[1]
 
-    We read this display number from the read descriptor.
-    For this, we have 2 things to consider:
-        1. How many bytes to read from the read descriptor. This is handled by the variable number_of_bytes.
-
-        2. For how long to read from the read descriptor. We wait for atmost 10 seconds for Xvfb to write
-           the display number using the 'select' package.
-
+    We read this display number from the read descriptor through the event loop, so that
+    the server keeps serving other requests while Xvfb initializes.
+    We wait for atmost 'timeout' seconds for Xvfb to write the display number. If Xvfb exits
+    or does not write it in time, the error it wrote to stderr is raised.
 
     Args:
         xvfb_cmd (List): A list containing the command to run the Xvfb process
         pipe (List): A list containing a pair of file descriptor.
         env (Dict): A Dict containing environment variables for the Xvfb process.
+        timeout (int, optional): Maximum time in seconds to wait for the display number.
+
+    Raises:
+        XvfbError: When Xvfb does not provide a display number.
 
     Returns:
         List: Containing the Xvfb process object, and display number on which Xvfb process has started.
@@ -287,31 +613,71 @@ async def create_xvfb_process(xvfb_cmd, pipe, env={}):
     )
 
     read_descriptor, write_descriptor = pipe
-    number_of_bytes = 200
 
     logger.debug("Waiting for XVFB process to initialize and provide Display Number")
-    # Waits upto 10 seconds for the read_descriptor to be ready.
-    ready_descriptors, _, _ = select.select([read_descriptor], [], [], 10)
+    read_display_port = asyncio.ensure_future(__read_display_port(read_descriptor))
+    wait_for_exit = asyncio.ensure_future(xvfb.wait())
+    try:
+        await asyncio.wait(
+            [read_display_port, wait_for_exit],
+            timeout=timeout,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    finally:
+        read_display_port.cancel()
+        wait_for_exit.cancel()
 
-    # If read_descriptor is in ready_descriptors, read from it.
-    if read_descriptor in ready_descriptors:
-        logger.debug("Reading display number from the read descriptor.")
-        line = os.read(read_descriptor, number_of_bytes).decode("utf-8")
-        # Xvfb process writes the display number and adds a new line character ('\n') at the end. Removing it with .strip()
-        display_port = line.strip()
+        # Close the read and write descriptors.
+        os.close(read_descriptor)
+        os.close(write_descriptor)
 
-    else:
-        # Check for errors and raise exception.
-        error = ""
-        while not xvfb.stderr.at_eof():
-            line = await xvfb.stderr.readline()
-            error += line.decode("utf-8")
+    if read_display_port.done() and not read_display_port.cancelled():
+        return xvfb, read_display_port.result()
 
+    # Check for errors and raise exception.
+    if xvfb.returncode is None:
+        logger.debug(
+            f"Xvfb did not provide a display number in {timeout} seconds, terminating it."
+        )
+        xvfb.terminate()
         await xvfb.wait()
-        raise XvfbError(f"Unable to start the Xvfb process: \n {error}")
 
-    # Close the read and write descriptors.
-    os.close(read_descriptor)
-    os.close(write_descriptor)
+    error = (await xvfb.stderr.read()).decode("utf-8")
+    raise XvfbError(f"Unable to start the Xvfb process: \n {error}")
+
 
-    return xvfb, display_port
+async def __read_display_port(read_descriptor):
+    """Reads the display number written by Xvfb from the read descriptor without blocking the event loop.
+
+    Args:
+        read_descriptor (int): Non-blocking read descriptor of the pipe passed to Xvfb with '-displayfd'.
+
+    Returns:
+        String: The display number.
+    """
+    loop = asyncio.get_running_loop()
+    line = b""
+
+    # Xvfb process writes the display number and adds a new line character ('\n') at the end.
+    while not line.endswith(b"\n"):
+        readable = loop.create_future()
+        loop.add_reader(read_descriptor, readable.set_result, None)
+        try:
+            await readable
+        finally:
+            loop.remove_reader(read_descriptor)
+
+        try:
+            data = os.read(read_descriptor, 200)
+        except BlockingIOError:
+            continue
+
+        if not data:
+            raise XvfbError(
+                "Xvfb closed the descriptor without writing a display number"
+            )
+        line += data
+
+    logger.debug("Read display number from the read descriptor.")
+    # Removing the new line character with .strip()
+    return line.decode("utf-8").strip()
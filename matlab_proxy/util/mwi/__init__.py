@@ -4,5 +4,6 @@ from matlab_proxy.util.mwi import (
     custom_http_headers,
     embedded_connector,
     logger,
+    metrics,
     validators,
 )
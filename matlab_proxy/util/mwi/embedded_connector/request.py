@@ -4,6 +4,7 @@
 This file contains the methods to communicate with the embedded connector.
 """
 
+import asyncio
 import json
 
 from matlab_proxy.util.mwi.exceptions import EmbeddedConnectorError
@@ -11,7 +12,9 @@ from matlab_proxy.util.mwi.exceptions import EmbeddedConnectorError
 from .helpers import get_data_for_ping_request, get_ping_endpoint
 
 
-async def send_request(url: str, data: dict, method: str, headers: dict = None) -> dict:
+async def send_request(
+    url: str, data: dict, method: str, headers: dict = None, timeout: float = None
+) -> dict:
     """A helper method to send various kinds of HTTP requests to the embedded connector.
     The url and method params are required.
 
@@ -20,9 +23,11 @@ async def send_request(url: str, data: dict, method: str, headers: dict = None)
         method (str): HTTP Request type.
         payload (dict): Payload for the HTTP request
         headers (dict): Headers for the HTTP request.
+        timeout (float): Maximum time in seconds to wait for the response. Waits indefinitely if None.
 
     Raises:
         EmbeddedConnectorError: When unable to get a response from the Embedded connector
+        asyncio.TimeoutError: When no response is received within the timeout
 
     Returns:
         dict: The json response from Embedded connector
@@ -38,9 +43,11 @@ async def send_request(url: str, data: dict, method: str, headers: dict = None)
         data = json.dumps(data)
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as session:
             async with session.request(
-                method=method, url=url, data=data, headers=None, ssl=False
+                method=method, url=url, data=data, headers=headers, ssl=False
             ) as resp:
                 if not resp.ok:
                     # Converting to dict and formatting for printing
@@ -55,11 +62,17 @@ async def send_request(url: str, data: dict, method: str, headers: dict = None)
         raise err
 
 
-async def get_state(mwi_server_url):
+async def get_state(mwi_server_url, timeout=None, headers=None):
     """Returns the state of MATLAB's Embedded Connector.
 
     Args:
-        port (int): The port on which the embedded connector is running at
+        mwi_server_url (str): The URL at which the embedded connector is running at
+        timeout (float): Maximum time in seconds to wait for the embedded connector to respond.
+            Waits indefinitely if None.
+        headers (dict): Headers for the HTTP request. Defaults to None.
+
+    Raises:
+        asyncio.TimeoutError: When the embedded connector does not respond within the timeout
 
     Returns:
         str: Either "up" or "down"
@@ -67,7 +80,9 @@ async def get_state(mwi_server_url):
     data = get_data_for_ping_request()
     url = get_ping_endpoint(mwi_server_url)
     try:
-        resp = await send_request(url=url, data=data, method="POST")
+        resp = await send_request(
+            url=url, data=data, method="POST", headers=headers, timeout=timeout
+        )
 
         # Additional assert statements to catch any changes in response from embedded connector
         # Tested from R2020b to R2023a
@@ -89,6 +104,10 @@ async def get_state(mwi_server_url):
 
         if not resp["messages"]["PingResponse"][0]["messageFaults"]:
             return "up"
+    except asyncio.TimeoutError:
+        # A stalled embedded connector is not the same as one which is down,
+        # let the caller decide how to treat it.
+        raise
     except Exception:
         pass
 
@@ -150,3 +150,123 @@ def get_env_name_mwi_use_existing_license():
 def get_env_name_custom_matlab_root():
     """User specified path to MATLAB root"""
     return "MWI_CUSTOM_MATLAB_ROOT"
+
+
+def get_env_name_proxy_pool_size():
+    """Maximum number of simultaneous connections matlab-proxy keeps open to the MATLAB Embedded Connector"""
+    return "MWI_PROXY_POOL_SIZE"
+
+
+def get_env_name_proxy_pool_size_per_host():
+    """Maximum number of simultaneous connections to a single Embedded Connector endpoint. 0 implies no limit."""
+    return "MWI_PROXY_POOL_SIZE_PER_HOST"
+
+
+def get_env_name_proxy_max_upload_size():
+    """Maximum size in megabytes of a request body that matlab-proxy forwards to MATLAB. 0 implies no limit."""
+    return "MWI_PROXY_MAX_UPLOAD_SIZE_IN_MB"
+
+
+def get_env_name_proxy_max_concurrent_requests():
+    """Maximum number of requests that matlab-proxy sends to MATLAB concurrently. 0 implies no limit."""
+    return "MWI_PROXY_MAX_CONCURRENT_REQUESTS"
+
+
+def get_env_name_proxy_max_queued_requests():
+    """Maximum number of requests that wait for MWI_PROXY_MAX_CONCURRENT_REQUESTS before being rejected."""
+    return "MWI_PROXY_MAX_QUEUED_REQUESTS"
+
+
+def get_env_name_websocket_max_message_size():
+    """Maximum size in megabytes of a WebSocket message that matlab-proxy relays between the browser and MATLAB. 0 implies no limit."""
+    return "MWI_WEBSOCKET_MAX_MESSAGE_SIZE_IN_MB"
+
+
+def get_env_name_websocket_heartbeat_interval():
+    """Interval in seconds at which the WebSockets relayed between the browser and MATLAB are pinged. 0 disables the heartbeat."""
+    return "MWI_WEBSOCKET_HEARTBEAT_INTERVAL"
+
+
+def get_env_name_websocket_idle_timeout():
+    """Time in seconds after which a WebSocket relayed between the browser and MATLAB without any message is closed. 0 implies no limit."""
+    return "MWI_WEBSOCKET_IDLE_TIMEOUT"
+
+
+def get_env_name_enable_connector_warmup():
+    """Set to True to run the warm-up tasks of the Embedded Connector when MATLAB starts."""
+    return "MWI_ENABLE_CONNECTOR_WARMUP"
+
+
+def is_connector_warmup_enabled():
+    """Returns true if the Embedded Connector should run its warm-up tasks when MATLAB starts."""
+    return (
+        os.environ.get(get_env_name_enable_connector_warmup(), "false").lower()
+        == "true"
+    )
+
+
+def get_env_name_enable_matlab_standby():
+    """Set to True to start a standby MATLAB which takes over when MATLAB is restarted."""
+    return "MWI_ENABLE_MATLAB_STANDBY"
+
+
+def is_matlab_standby_enabled():
+    """Returns true if a standby MATLAB should be kept ready for restarts of MATLAB."""
+    return (
+        os.environ.get(get_env_name_enable_matlab_standby(), "false").lower() == "true"
+    )
+
+
+def get_env_name_enable_browser_websocket_compression():
+    """Set to False to stop compressing the WebSocket messages sent to the browser."""
+    return "MWI_ENABLE_BROWSER_WEBSOCKET_COMPRESSION"
+
+
+def is_browser_websocket_compression_enabled():
+    """Returns true if the WebSocket messages sent to the browser should be compressed when the browser supports it."""
+    return (
+        os.environ.get(
+            get_env_name_enable_browser_websocket_compression(), "true"
+        ).lower()
+        == "true"
+    )
+
+
+def get_env_name_enable_connector_websocket_compression():
+    """Set to True to compress the WebSocket messages sent to the Embedded Connector."""
+    return "MWI_ENABLE_CONNECTOR_WEBSOCKET_COMPRESSION"
+
+
+def is_connector_websocket_compression_enabled():
+    """Returns true if the WebSocket messages sent to the Embedded Connector should be compressed."""
+    return (
+        os.environ.get(
+            get_env_name_enable_connector_websocket_compression(), "false"
+        ).lower()
+        == "true"
+    )
+
+
+def get_env_name_licensing_connect_timeout():
+    """Maximum time in seconds to wait for a connection to the MathWorks licensing servers"""
+    return "MWI_LICENSING_CONNECT_TIMEOUT"
+
+
+def get_env_name_licensing_read_timeout():
+    """Maximum time in seconds to wait for data from the MathWorks licensing servers"""
+    return "MWI_LICENSING_READ_TIMEOUT"
+
+
+def get_env_name_licensing_max_retries():
+    """Number of times a failed request to the MathWorks licensing servers is retried"""
+    return "MWI_LICENSING_MAX_RETRIES"
+
+
+def get_env_name_reuse_xvfb():
+    """Set to True to keep the Xvfb process running when MATLAB is stopped and reuse it when MATLAB is restarted."""
+    return "MWI_REUSE_XVFB"
+
+
+def is_xvfb_reuse_enabled():
+    """Returns true if the Xvfb process should be reused across restarts of MATLAB."""
+    return os.environ.get(get_env_name_reuse_xvfb(), "false").lower() == "true"
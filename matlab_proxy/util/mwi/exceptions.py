@@ -165,6 +165,19 @@ class InvalidTokenError(AppError):
     pass
 
 
+class AdmissionQueueFullError(Exception):
+    """A Class which inherits the Exception class.
+
+    This class represents requests to the Embedded Connector which are rejected because the limit of
+    concurrent requests is reached and the queue of waiting requests is full.
+
+    Args:
+        Exception : Python's inbuilt Exception Class.
+    """
+
+    pass
+
+
 def log_error(logger, err: Exception):
     """Logs any error to stdout.
 
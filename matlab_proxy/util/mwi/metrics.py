@@ -0,0 +1,274 @@
+# Copyright 2023 The MathWorks, Inc.
+"""This file contains lightweight counters, gauges and histograms which are exposed in the
+Prometheus text exposition format.
+
+Recording a value is a dictionary lookup and an addition, so metrics can be recorded on the
+hot path of the proxy. Values are only formatted when they are rendered.
+"""
+
+from bisect import bisect_left
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds of the buckets of latency histograms
+DEFAULT_LATENCY_BUCKETS_IN_SECONDS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+)
+
+
+def _format_value(value):
+    """Formats a value as expected by Prometheus.
+
+    Args:
+        value (int | float): The value.
+
+    Returns:
+        str: The formatted value.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape_label_value(value):
+    """Escapes a label value as expected by Prometheus.
+
+    Args:
+        value (str): The label value.
+
+    Returns:
+        str: The escaped label value.
+    """
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+class Metric:
+    """Base class of the metrics. A metric has a value for each combination of the values of its labels."""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        """Creates a metric without any values.
+
+        Args:
+            name (str): Name of the metric.
+            documentation (str): Description of the metric.
+            labelnames (tuple, optional): Names of the labels of the metric. Defaults to ().
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Values keyed by the tuple of the values of the labels
+        self._values = {}
+
+    def _format_labels(self, labelvalues, extra_labels=()):
+        """Formats the labels of a sample.
+
+        Args:
+            labelvalues (tuple): Values of the labels of the metric.
+            extra_labels (tuple, optional): Additional (name, value) pairs, such as the "le" label of histograms.
+
+        Returns:
+            str: The labels in braces, or an empty string if there are none.
+        """
+        labels = list(zip(self.labelnames, labelvalues)) + list(extra_labels)
+        if not labels:
+            return ""
+
+        return (
+            "{"
+            + ",".join(
+                f'{name}="{_escape_label_value(value)}"' for name, value in labels
+            )
+            + "}"
+        )
+
+    def _render_samples(self):
+        """Returns the lines of the samples of the metric.
+
+        Returns:
+            list: Lines in the Prometheus text exposition format.
+        """
+        return [
+            f"{self.name}{self._format_labels(labelvalues)} {_format_value(value)}"
+            for labelvalues, value in self._values.items()
+        ]
+
+    def render(self):
+        """Returns the metric in the Prometheus text exposition format.
+
+        Returns:
+            list: Lines in the Prometheus text exposition format.
+        """
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ] + self._render_samples()
+
+
+class Counter(Metric):
+    """A value which only increases."""
+
+    type = "counter"
+
+    def get(self, *labelvalues):
+        """Returns the value of the counter.
+
+        Args:
+            *labelvalues: Values of the labels, in the order of labelnames.
+
+        Returns:
+            int | float: The value, 0 if it was never recorded.
+        """
+        return self._values.get(labelvalues, 0)
+
+    def inc(self, *labelvalues, amount=1):
+        """Increments the counter.
+
+        Args:
+            *labelvalues: Values of the labels, in the order of labelnames.
+            amount (int | float, optional): Amount to increment by. Defaults to 1.
+        """
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Gauge(Metric):
+    """A value which can go up and down."""
+
+    type = "gauge"
+
+    def get(self, *labelvalues):
+        """Returns the value of the gauge.
+
+        Args:
+            *labelvalues: Values of the labels, in the order of labelnames.
+
+        Returns:
+            int | float: The value, 0 if it was never recorded.
+        """
+        return self._values.get(labelvalues, 0)
+
+    def set(self, value, *labelvalues):
+        """Sets the gauge.
+
+        Args:
+            value (int | float): The value.
+            *labelvalues: Values of the labels, in the order of labelnames.
+        """
+        self._values[labelvalues] = value
+
+    def inc(self, *labelvalues, amount=1):
+        """Increments the gauge.
+
+        Args:
+            *labelvalues: Values of the labels, in the order of labelnames.
+            amount (int | float, optional): Amount to increment by. Defaults to 1.
+        """
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues, amount=1):
+        """Decrements the gauge.
+
+        Args:
+            *labelvalues: Values of the labels, in the order of labelnames.
+            amount (int | float, optional): Amount to decrement by. Defaults to 1.
+        """
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(Metric):
+    """Counts observed values in buckets, and tracks their number and sum."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        buckets=DEFAULT_LATENCY_BUCKETS_IN_SECONDS,
+    ):
+        """Creates a histogram without any observations.
+
+        Args:
+            name (str): Name of the metric.
+            documentation (str): Description of the metric.
+            labelnames (tuple, optional): Names of the labels of the metric. Defaults to ().
+            buckets (tuple, optional): Sorted upper bounds of the buckets. Defaults to DEFAULT_LATENCY_BUCKETS_IN_SECONDS.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        """Records an observation.
+
+        Args:
+            value (int | float): The observed value.
+            *labelvalues: Values of the labels, in the order of labelnames.
+        """
+        values = self._values.get(labelvalues)
+        if values is None:
+            # Counts of the observations in each bucket and above the last one, and their sum
+            values = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0]
+
+        values[0][bisect_left(self.buckets, value)] += 1
+        values[1] += value
+
+    def get_count(self, *labelvalues):
+        """Returns the number of observations.
+
+        Args:
+            *labelvalues: Values of the labels, in the order of labelnames.
+
+        Returns:
+            int: The number of observations.
+        """
+        values = self._values.get(labelvalues)
+        return sum(values[0]) if values is not None else 0
+
+    def _render_samples(self):
+        lines = []
+        for labelvalues, (bucket_counts, total) in self._values.items():
+            cumulative_count = 0
+            for upper_bound, count in zip(
+                self.buckets + (float("inf"),), bucket_counts
+            ):
+                cumulative_count += count
+                labels = self._format_labels(
+                    labelvalues, [("le", _format_value(float(upper_bound)))]
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative_count}")
+
+            labels = self._format_labels(labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative_count}")
+        return lines
+
+
+def render(metrics):
+    """Renders metrics in the Prometheus text exposition format.
+
+    Args:
+        metrics (list): The metrics.
+
+    Returns:
+        str: The metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
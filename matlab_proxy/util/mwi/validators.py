@@ -285,6 +285,36 @@ def validate_use_existing_licensing(use_existing_license):
     return True if use_existing_license.casefold() == "true" else False
 
 
+def validate_non_negative_number(value, default, env_var_name, number_type=int):
+    """Validates that value, usually read from an environment variable, is a non-negative number.
+
+    Args:
+        value (str | None): Value to validate. None or an empty string implies the value was not set.
+        default (int | float): Value to return when value is not set.
+        env_var_name (str): Name of the environment variable the value was read from. Used in error messages.
+        number_type (type, optional): Either int or float. Defaults to int.
+
+    Raises:
+        FatalError: When value is not a non-negative number of type number_type.
+
+    Returns:
+        int | float: The parsed value if it is valid, else default when value is not set.
+    """
+    if value is None or str(value).strip() == "":
+        return default
+
+    try:
+        number = number_type(value)
+        if number < 0:
+            raise ValueError
+    except ValueError:
+        error_message = f"{env_var_name} must be a non-negative {number_type.__name__}, but was set to: {value}"
+        logger.error(error_message)
+        raise FatalError(error_message)
+
+    return number
+
+
 def __validate_if_paths_exist(paths: List[Path]):
     """Validates if  paths of directories or files exists on the file system.
 
@@ -0,0 +1,227 @@
+# Copyright 2023 The MathWorks, Inc.
+"""This file contains the relay which forwards WebSocket messages between the browser and MATLAB."""
+
+import asyncio
+import time
+
+from aiohttp import WSCloseCode, WSMsgType
+
+from matlab_proxy.util import mwi
+
+logger = mwi.logger.get()
+
+# Close codes which are reserved for reporting a closure locally and must not be sent in a close frame
+RESERVED_CLOSE_CODES = (1005, WSCloseCode.ABNORMAL_CLOSURE, 1015)
+
+# Directions in which messages are relayed
+TO_MATLAB = "to_matlab"
+FROM_MATLAB = "from_matlab"
+
+# Reasons for which a relay is reaped, see WebSocketRelay.reap_reason
+REAP_REASON_HEARTBEAT = "heartbeat"
+REAP_REASON_IDLE = "idle"
+
+
+class WebSocketRelay:
+    """Relays messages between the WebSocket of a browser and the WebSocket of the Embedded Connector of MATLAB.
+
+    Each direction is relayed by its own task. A message is only read once the previous one was sent, and sending
+    waits for the buffer of the connection to drain, so a slow receiver pauses the reading of its sender instead of
+    buffering messages without bounds. Pings and pongs are relayed with their payload, so both WebSockets must be
+    created with autoping=False.
+
+    When either side closes, its close code and reason are propagated to the other side and both tasks are ended.
+    The relay is reaped, closing both sides, when either side does not answer the heartbeat of its WebSocket or when
+    no message was relayed for idle_timeout seconds.
+    """
+
+    def __init__(
+        self,
+        ws_browser,
+        ws_matlab,
+        frames_counter=None,
+        bytes_counter=None,
+        idle_timeout=None,
+    ):
+        """Creates a relay between two connected WebSockets.
+
+        Args:
+            ws_browser (web.WebSocketResponse): The WebSocket of the browser.
+            ws_matlab (aiohttp.ClientWebSocketResponse): The WebSocket of the Embedded Connector.
+            frames_counter (mwi.metrics.Counter, optional): Counter, labelled by direction, to which the relayed
+                messages are added. Defaults to None.
+            bytes_counter (mwi.metrics.Counter, optional): Counter, labelled by direction, to which the size of
+                the relayed payloads is added. Defaults to None.
+            idle_timeout (float, optional): Time in seconds after which the relay is reaped if no text or binary
+                message was relayed in either direction. Pings and pongs do not count. Defaults to None, which
+                implies no limit.
+        """
+        self.ws_browser = ws_browser
+        self.ws_matlab = ws_matlab
+        self.frames_counter = frames_counter
+        self.bytes_counter = bytes_counter
+        self.idle_timeout = idle_timeout
+
+        # Number of messages and size of their payloads (in characters for text messages) relayed by this relay
+        self.frames = {TO_MATLAB: 0, FROM_MATLAB: 0}
+        self.bytes = {TO_MATLAB: 0, FROM_MATLAB: 0}
+        # Time (as returned by time.monotonic()) at which the last text or binary message was relayed
+        self.last_activity = time.monotonic()
+        # REAP_REASON_HEARTBEAT or REAP_REASON_IDLE if the relay was reaped, None otherwise.
+        self.reap_reason = None
+
+    async def run(self):
+        """Relays messages until either side closes, then closes the other side.
+
+        If the relay is reaped or cancelled, both sides are closed with WSCloseCode.GOING_AWAY.
+        """
+        # The WebSocket each task reads from, and the WebSocket it sends to.
+        legs = {
+            asyncio.ensure_future(
+                self.__forward(self.ws_browser, self.ws_matlab, TO_MATLAB)
+            ): (self.ws_browser, self.ws_matlab),
+            asyncio.ensure_future(
+                self.__forward(self.ws_matlab, self.ws_browser, FROM_MATLAB)
+            ): (self.ws_matlab, self.ws_browser),
+        }
+
+        tasks = list(legs)
+        if self.idle_timeout:
+            tasks.append(asyncio.ensure_future(self.__wait_until_idle()))
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            task = done.pop()
+
+            # Both sides of a reaped relay are closed below, as are both sides when sending failed.
+            # Otherwise, the closure of one side is propagated to the other.
+            if task not in legs:
+                self.__reap(REAP_REASON_IDLE)
+            elif task.exception() is None:
+                ws_from, ws_to = legs[task]
+                close_message = task.result()
+
+                # A side which does not answer the heartbeat is closed by aiohttp with a TimeoutError.
+                if isinstance(ws_from.exception(), asyncio.TimeoutError):
+                    self.__reap(REAP_REASON_HEARTBEAT)
+                    return
+
+                await self.__close(
+                    ws_to,
+                    self.__get_close_code(ws_from),
+                    close_message.extra
+                    if close_message.type == WSMsgType.CLOSE
+                    else None,
+                )
+        finally:
+            # Closing a side ends the task reading from it. Any task which is still running is cancelled.
+            for task in tasks:
+                task.cancel()
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.debug(f"WebSocket relay ended with error: {result!r}")
+
+            # MATLAB is closed first, so that its resources are released by the time the browser sees the closure.
+            for ws in (self.ws_matlab, self.ws_browser):
+                await self.__close(ws, WSCloseCode.GOING_AWAY, None)
+
+            logger.debug(
+                f"WebSocket relay closed after relaying {self.frames[TO_MATLAB]} messages ({self.bytes[TO_MATLAB]} bytes) to MATLAB "
+                f"and {self.frames[FROM_MATLAB]} messages ({self.bytes[FROM_MATLAB]} bytes) from MATLAB"
+            )
+
+    async def __forward(self, ws_from, ws_to, direction):
+        """Relays messages from one WebSocket to the other until the first one is closed.
+
+        Args:
+            ws_from (WebSocket): The WebSocket to read messages from.
+            ws_to (WebSocket): The WebSocket to send messages to.
+            direction (String): Either TO_MATLAB or FROM_MATLAB.
+
+        Returns:
+            aiohttp.WSMessage: The message with which ws_from was closed.
+        """
+        while True:
+            msg = await ws_from.receive()
+            mt = msg.type
+
+            if mt not in (
+                WSMsgType.TEXT,
+                WSMsgType.BINARY,
+                WSMsgType.PING,
+                WSMsgType.PONG,
+            ):
+                # CLOSE, CLOSING, CLOSED or ERROR.
+                # When a websocket is closed by the MATLAB JSD, the Embedded Connector responds with a message of type
+                # 'Error' and the close code ABNORMAL_CLOSURE, which also ends the relay.
+                return msg
+
+            if mt == WSMsgType.TEXT or mt == WSMsgType.BINARY:
+                self.last_activity = time.monotonic()
+            self.frames[direction] += 1
+            self.bytes[direction] += len(msg.data)
+            if self.frames_counter is not None:
+                self.frames_counter.inc(direction)
+            if self.bytes_counter is not None:
+                self.bytes_counter.inc(direction, amount=len(msg.data))
+
+            if mt == WSMsgType.TEXT:
+                await ws_to.send_str(msg.data)
+            elif mt == WSMsgType.BINARY:
+                await ws_to.send_bytes(msg.data)
+            elif mt == WSMsgType.PING:
+                await ws_to.ping(msg.data)
+            else:
+                await ws_to.pong(msg.data)
+
+    async def __wait_until_idle(self):
+        """Returns once no text or binary message was relayed for idle_timeout seconds."""
+        while True:
+            remaining = self.last_activity + self.idle_timeout - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    def __reap(self, reason):
+        """Records that the relay is reaped.
+
+        Args:
+            reason (String): Either REAP_REASON_HEARTBEAT or REAP_REASON_IDLE.
+        """
+        self.reap_reason = reason
+        logger.info(
+            f"Reaping WebSocket relay to MATLAB ({reason}) after relaying {sum(self.frames.values())} messages"
+        )
+
+    @staticmethod
+    def __get_close_code(ws):
+        """Returns the close code with which the other side is closed when a WebSocket was closed.
+
+        Args:
+            ws (WebSocket): The WebSocket which was closed.
+
+        Returns:
+            int: The close code of the WebSocket, or a close code which can be sent in its place.
+        """
+        close_code = ws.close_code
+        if close_code is None or close_code == 1005:
+            return WSCloseCode.OK
+        if close_code in RESERVED_CLOSE_CODES:
+            return WSCloseCode.GOING_AWAY
+        return close_code
+
+    @staticmethod
+    async def __close(ws, code, message):
+        """Closes a WebSocket unless it is already closed.
+
+        Args:
+            ws (WebSocket): The WebSocket to close.
+            code (int): The close code.
+            message (String): The reason, if any.
+        """
+        if ws.closed:
+            return
+        try:
+            await ws.close(code=code, message=message.encode() if message else b"")
+        except Exception as err:
+            logger.debug(f"Failed to close WebSocket: {err!r}")
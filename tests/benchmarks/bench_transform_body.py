@@ -0,0 +1,85 @@
+# Copyright (c) 2023 The MathWorks, Inc.
+"""Micro-benchmark for the rewriting of messageservice requests done by app.rewrite_client_type().
+
+Compares the rewriting done by matlab-proxy against parsing and re-serializing every request body,
+for bodies with and without a ClientType message.
+
+Usage:
+    python tests/benchmarks/bench_transform_body.py
+"""
+
+import json
+import timeit
+
+from matlab_proxy.app import rewrite_client_type
+
+
+def full_parse_rewrite(body):
+    """Rewrites the body by parsing and re-serializing the whole document."""
+    data = json.loads(body)
+    try:
+        replace = False
+        for client_type in data["messages"]["ClientType"]:
+            if client_type["properties"]["TYPE"] == "jsd":
+                client_type["properties"]["TYPE"] = "jsd_rmt_tmw"
+                replace = True
+
+        if replace is True:
+            body = json.dumps(data).encode("utf-8")
+    except KeyError:
+        pass
+
+    return body
+
+
+def make_body(size_in_bytes, with_client_type):
+    """Returns a messageservice request body of roughly size_in_bytes bytes."""
+    messages = {
+        "FEval": [
+            {
+                "function": "matlab.internal.editor.openDocument",
+                "arguments": ["/home/user/script.m", "x" * 64],
+                "nargout": 0,
+                "uuid": "ABCD1234",
+            }
+        ]
+    }
+    body = {"uuid": "WXYZ9876", "messages": messages}
+
+    # Pad the request with additional messages until it is of the requested size.
+    while len(json.dumps(body)) < size_in_bytes:
+        messages["FEval"].append(dict(messages["FEval"][0]))
+
+    if with_client_type:
+        messages["ClientType"] = [{"properties": {"TYPE": "jsd", "VERSION": "2"}}]
+
+    return json.dumps(body).encode("utf-8")
+
+
+def main():
+    print(
+        f"{'Body size':>10} {'ClientType':>10} {'Full parse (us)':>16} {'matlab-proxy (us)':>18}"
+    )
+    for size_in_bytes in (512, 4 * 1024, 64 * 1024, 512 * 1024):
+        for with_client_type in (False, True):
+            body = make_body(size_in_bytes, with_client_type)
+            assert json.loads(full_parse_rewrite(body)) == json.loads(
+                rewrite_client_type(body)
+            )
+
+            number = max(10, 2 * 1024 * 1024 // len(body))
+            full_parse = min(
+                timeit.repeat(lambda: full_parse_rewrite(body), number=number, repeat=5)
+            )
+            fast_path = min(
+                timeit.repeat(
+                    lambda: rewrite_client_type(body), number=number, repeat=5
+                )
+            )
+            print(
+                f"{len(body):>10} {str(with_client_type):>10} {full_parse / number * 1e6:>16.2f} {fast_path / number * 1e6:>18.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
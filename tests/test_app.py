@@ -2,6 +2,7 @@
 
 import asyncio
 import json
+import gzip
 import time
 import datetime
 
@@ -9,9 +10,10 @@ import aiohttp
 import pytest
 import random
 from http import HTTPStatus
-from matlab_proxy import app, util
+from matlab_proxy import app, constants, util
+from matlab_proxy.util.admission_control import AdmissionController
 from matlab_proxy.util.mwi import environment_variables as mwi_env
-from matlab_proxy.util.mwi.exceptions import MatlabInstallError
+from matlab_proxy.util.mwi.exceptions import MatlabError, MatlabInstallError
 from datetime import timedelta, timezone
 from matlab_proxy.util.mwi.exceptions import EntitlementError
 import test_constants
@@ -147,6 +149,77 @@ def test_marshal_error(actual_error, expected_error):
     assert app.marshal_error(actual_error) == expected_error
 
 
+@pytest.mark.parametrize(
+    "accept_encoding, available_encodings, expected",
+    [
+        ("gzip, deflate, br", ["identity", "gzip", "br"], "br"),
+        ("gzip, deflate, br", ["identity", "gzip"], "gzip"),
+        ("gzip;q=0, br;q=0", ["identity", "gzip", "br"], "identity"),
+        ("*", ["identity", "gzip"], "gzip"),
+        ("", ["identity", "gzip", "br"], "identity"),
+    ],
+    ids=[
+        "Brotli preferred",
+        "Brotli not available",
+        "Compression refused",
+        "Wildcard",
+        "No Accept-Encoding",
+    ],
+)
+def test_negotiate_content_encoding(accept_encoding, available_encodings, expected):
+    """Test to check if the encoding of static files is negotiated correctly."""
+    assert (
+        app.negotiate_content_encoding(accept_encoding, available_encodings) == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "name, content_type, expected_encodings",
+    [
+        ("main.js", "application/javascript", {"identity", "gzip"}),
+        ("main.js.map", "application/json", {"identity"}),
+        ("logo.png", "image/png", {"identity"}),
+    ],
+    ids=["Compressible file", "Source map", "Incompressible content type"],
+)
+def test_make_static_content_variants(
+    monkeypatch, name, content_type, expected_encodings
+):
+    """Test to check if only compressible static files other than source maps are compressed.
+
+    Args:
+        monkeypatch (Object): Pytest fixture to patch objects.
+        name (String): Name of the static file.
+        content_type (String): Content type of the static file.
+        expected_encodings (Set): Encodings in which the static file is expected to be available.
+    """
+    monkeypatch.setattr(app, "brotli", None)
+    body = b"console.log('matlab-proxy');\n" * 100
+
+    variants = app.make_static_content_variants(name, content_type, body)
+
+    assert set(variants.keys()) == expected_encodings
+    assert variants["identity"][0] is body
+    if "gzip" in variants:
+        assert gzip.decompress(variants["gzip"][0]) == body
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+    ],
+)
+def test_is_etag_matched(if_none_match, expected):
+    """Test to check if the If-None-Match header is compared to the ETag correctly."""
+    assert app.is_etag_matched(if_none_match, '"abc"') == expected
+
+
 class FakeServer:
     """Context Manager class which returns a web server wrapped in aiohttp_client pytest fixture
     for testing.
@@ -201,6 +274,211 @@ async def test_get_status_route(test_server):
     assert resp.status == HTTPStatus.OK
 
 
+async def test_get_status_not_modified(test_server):
+    """Test to check endpoint : "/get_status" with If-None-Match
+
+    Test which checks that a response with status 304 is returned while the version of the status is current.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp_client server for sending GET request.
+    """
+    state = test_server.app["state"]
+
+    resp = await test_server.get("/get_status")
+    assert resp.status == HTTPStatus.OK
+    etag = resp.headers["ETag"]
+    assert (await resp.json())["statusVersion"] <= state.status_version
+
+    # MATLAB may have changed its state in the meantime
+    etag = app.make_status_etag(state)
+
+    resp = await test_server.get("/get_status", headers={"If-None-Match": etag})
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert resp.headers["ETag"] == etag
+
+    state.notify_status_changed()
+    resp = await test_server.get("/get_status", headers={"If-None-Match": etag})
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["ETag"] != etag
+
+
+async def test_get_status_long_poll(test_server):
+    """Test to check endpoint : "/get_status" with the query parameter 'wait'
+
+    Test which checks that the request is held until the status changes.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp_client server for sending GET request.
+    """
+    state = test_server.app["state"]
+    etag = app.make_status_etag(state)
+
+    async def change_status():
+        await asyncio.sleep(0.1)
+        state.error = MatlabError("Long poll test error")
+
+    change = asyncio.ensure_future(change_status())
+    resp = await test_server.get(
+        "/get_status", params={"wait": "10"}, headers={"If-None-Match": etag}
+    )
+    await change
+
+    assert resp.status == HTTPStatus.OK
+    assert (await resp.json())["error"]["message"] == "Long poll test error"
+
+
+@pytest.mark.parametrize("wait", ["-1", "abc", "nan"])
+async def test_get_status_invalid_wait(test_server, wait):
+    """Test to check endpoint : "/get_status" with an invalid value for the query parameter 'wait'
+
+    Args:
+        test_server (aiohttp_client): A aiohttp_client server for sending GET request.
+        wait (String): Value of the query parameter 'wait'
+    """
+    resp = await test_server.get("/get_status", params={"wait": wait})
+    assert resp.status == HTTPStatus.BAD_REQUEST
+
+
+async def read_status_event(resp):
+    """Reads the next status event from a stream of Server-Sent Events.
+
+    Args:
+        resp (aiohttp.ClientResponse): Response of the status events stream.
+
+    Returns:
+        Dict: Status sent in the event.
+    """
+    fields = {}
+    while True:
+        line = (await resp.content.readline()).decode().rstrip("\n")
+        if line:
+            if not line.startswith(":"):
+                name, _, value = line.partition(": ")
+                fields[name] = value
+        elif fields:
+            assert fields["event"] == "status"
+            return json.loads(fields["data"])
+
+
+async def test_get_startup_timeline_route(test_server):
+    """Test to check endpoint : "/get_startup_timeline"
+
+    Test which checks that the phases of the startup of MATLAB are reported in order.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp_client server for sending GET request.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+
+    resp = await test_server.get("/get_startup_timeline")
+    assert resp.status == HTTPStatus.OK
+    timelines = await resp.json()
+
+    phases = timelines["current"]["phases"]
+    assert {
+        "environment_ready",
+        "matlab_process_spawned",
+        "ready_file_seen",
+        "embedded_connector_up",
+    } <= set(phases)
+    # Phases are listed in the order in which they were reached
+    assert list(phases.values()) == sorted(phases.values())
+    assert timelines["history"][-1] == timelines["current"]
+
+
+async def test_get_metrics_route(test_server):
+    """Test to check endpoint : "/metrics"
+
+    Test which checks that proxied requests and the time spent by MATLAB in each state are reported.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp_client server for sending GET request.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+
+    histogram = test_server.app["metrics"]["http_request_duration"]
+    count = histogram.get_count("2xx")
+    resp = await test_server.get(f"/{constants.MATLAB_JSD_PAGE_NAME}")
+    assert resp.status == HTTPStatus.OK
+    await resp.read()
+
+    # The proxied request is recorded once its handler has returned
+    for _ in range(50):
+        if histogram.get_count("2xx") > count:
+            break
+        await asyncio.sleep(0.1)
+
+    resp = await test_server.get("/metrics")
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = (await resp.text()).splitlines()
+
+    assert "# TYPE matlab_proxy_http_request_duration_seconds histogram" in lines
+    assert (
+        f'matlab_proxy_http_request_duration_seconds_count{{status_class="2xx"}} {count + 1}'
+        in lines
+    )
+    assert "matlab_proxy_matlab_restarts_total 0" in lines
+    assert any(
+        line.startswith('matlab_proxy_matlab_state_seconds{state="starting"} ')
+        for line in lines
+    )
+    assert any(
+        line.startswith("matlab_proxy_embedded_connector_ping_duration_seconds_count ")
+        for line in lines
+    )
+
+
+async def test_get_status_events_route(test_server):
+    """Test to check endpoint : "/get_status_events"
+
+    Test which subscribes to the status events and checks that an event is pushed when the status changes.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp_client server for sending GET request.
+    """
+    resp = await test_server.get("/get_status_events")
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["Content-Type"] == "text/event-stream"
+
+    status = await asyncio.wait_for(read_status_event(resp), timeout=10)
+    assert status["matlab"]["status"] in ["down", "starting", "up"]
+
+    test_server.app["state"].error = MatlabError("Status events test error")
+
+    # MATLAB may change its state in the meantime, wait for the event with the error.
+    while status["error"] is None:
+        status = await asyncio.wait_for(read_status_event(resp), timeout=10)
+    assert status["error"]["message"] == "Status events test error"
+
+    resp.close()
+
+
+async def test_upstream_session_is_shared(test_server):
+    """Test to check that HTTP requests to the Embedded Connector are proxied over a single
+    app-lifetime pool of connections.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp_client server for sending GET request.
+    """
+    upstream_session = test_server.app["upstream_session"]
+    settings = test_server.app["settings"]
+
+    assert isinstance(upstream_session, aiohttp.ClientSession)
+    assert not upstream_session.closed
+    assert upstream_session.connector.limit == settings["mwi_proxy_pool_size"]
+    assert (
+        upstream_session.connector.limit_per_host
+        == settings["mwi_proxy_pool_size_per_host"]
+    )
+
+    # Proxying a request must not replace the shared session
+    await test_server.get("/http_get_request.html")
+    assert test_server.app["upstream_session"] is upstream_session
+
+
 async def test_get_env_config(test_server):
     """Test to check endpoint : "/get_env_config"
 
@@ -355,6 +633,30 @@ async def test_matlab_proxy_http_get_request(proxy_payload, test_server):
             raise ConnectionError
 
 
+async def test_matlab_proxy_records_first_jsd_page(test_server):
+    """Test to check if the time until the MATLAB desktop is first served after MATLAB is up is recorded.
+
+    Args:
+        test_server (aiohttp_client): Test server to send HTTP requests.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+    assert state.embedded_connector_up_time is not None
+
+    # The page is recorded once it was streamed, so the body is read before checking.
+    resp = await test_server.get(f"/{constants.MATLAB_JSD_PAGE_NAME}")
+    assert resp.status == HTTPStatus.OK
+    await resp.read()
+    first_jsd_page_duration = state.first_jsd_page_duration
+    assert first_jsd_page_duration >= 0
+
+    # Only the first page served is recorded
+    resp = await test_server.get(f"/{constants.MATLAB_JSD_PAGE_NAME}")
+    assert resp.status == HTTPStatus.OK
+    await resp.read()
+    assert state.first_jsd_page_duration == first_jsd_page_duration
+
+
 async def test_matlab_proxy_http_put_request(proxy_payload, test_server):
     """Test to check if test_server proxies a HTTP request to fake matlab server and returns
     the response back
@@ -421,6 +723,125 @@ async def test_matlab_proxy_http_delete_request(proxy_payload, test_server):
             raise ConnectionError
 
 
+async def test_matlab_proxy_http_stream_request(test_server):
+    """Test to check if test_server streams request and response bodies larger than
+    aiohttp's default client_max_size (1 MB) to and from the fake matlab server.
+
+    Args:
+        test_server (aiohttp_client): Test server to send HTTP requests.
+
+    Raises:
+        ConnectionError: If fake matlab server is not reachable from the test server, raises ConnectionError
+    """
+    payload = bytes(random.getrandbits(8) for _ in range(256)) * 4 * 1024 * 3
+
+    count = 0
+    while True:
+        resp = await test_server.put("/http_stream_request.html", data=payload)
+
+        if resp.status == 404:
+            await asyncio.sleep(1)
+            count += 1
+
+        else:
+            assert resp.status == HTTPStatus.OK
+            assert await resp.read() == payload
+            break
+
+        if count > test_constants.FIVE_MAX_TRIES:
+            raise ConnectionError
+
+
+async def test_matlab_proxy_http_request_too_large(test_server):
+    """Test to check if test_server rejects request bodies larger than the configured max upload size.
+
+    Args:
+        test_server (aiohttp_client): Test server to send HTTP requests.
+    """
+    test_server.app["settings"]["mwi_proxy_max_upload_size"] = 1024
+
+    resp = await test_server.put("/http_stream_request.html", data=b"0" * 2048)
+    assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+async def chunked_body(payload, chunk_size=64 * 1024):
+    """Yields a payload in chunks, so that it is sent without a Content-Length.
+
+    Args:
+        payload (Bytes): The payload.
+        chunk_size (int, optional): Size of the chunks. Defaults to 64 KB.
+
+    Yields:
+        Bytes: The chunks of the payload.
+    """
+    for start in range(0, len(payload), chunk_size):
+        yield payload[start : start + chunk_size]
+
+
+async def test_matlab_proxy_http_stream_chunked_request(test_server):
+    """Test to check if a chunked request body larger than the limit of the bodies buffered for rewriting
+    is streamed to the fake matlab server instead of being buffered.
+
+    Args:
+        test_server (aiohttp_client): Test server to send HTTP requests.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+
+    payload = bytes(random.getrandbits(8) for _ in range(256)) * 4 * 1024 * 3
+    assert len(payload) > constants.PROXY_MAX_REWRITTEN_BODY_SIZE_IN_BYTES
+
+    resp = await test_server.put(
+        "/http_stream_request.html", data=chunked_body(payload)
+    )
+    assert resp.status == HTTPStatus.OK
+    assert await resp.read() == payload
+
+
+async def test_matlab_proxy_http_chunked_request_too_large(test_server):
+    """Test to check if test_server rejects chunked request bodies once more than the configured max
+    upload size was received.
+
+    Args:
+        test_server (aiohttp_client): Test server to send HTTP requests.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+    test_server.app["settings"]["mwi_proxy_max_upload_size"] = 1024
+
+    resp = await test_server.put(
+        "/http_put_request.html", data=chunked_body(b"0" * 4096, chunk_size=512)
+    )
+    assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+async def test_matlab_proxy_rewritten_request_too_large(test_server):
+    """Test to check if messageservice requests, which are buffered to be rewritten, are bounded by
+    their own limit rather than by the max upload size.
+
+    Args:
+        test_server (aiohttp_client): Test server to send HTTP requests.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+
+    payload = b" " * (constants.PROXY_MAX_REWRITTEN_BODY_SIZE_IN_BYTES + 1)
+    resp = await test_server.post(
+        "/messageservice/json/secure", data=chunked_body(payload)
+    )
+    assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+async def test_non_proxied_requests_bounded_by_default_client_max_size(test_server):
+    """Test to check if the max upload size of the proxy does not apply to the endpoints of matlab-proxy itself.
+
+    Args:
+        test_server (aiohttp_client): Test server to send HTTP requests.
+    """
+    resp = await test_server.post("/authenticate_request", data=b"0" * (2 * 1024**2))
+    assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
 async def test_matlab_proxy_http_post_request(proxy_payload, test_server):
     """Test to check if test_server proxies http post request to fake matlab server.
     Checks if payload is being modified before proxying.
@@ -453,6 +874,115 @@ async def test_matlab_proxy_http_post_request(proxy_payload, test_server):
             raise ConnectionError
 
 
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        (
+            {"messages": {"ClientType": [{"properties": {"TYPE": "jsd"}}]}},
+            {"messages": {"ClientType": [{"properties": {"TYPE": "jsd_rmt_tmw"}}]}},
+        ),
+        (
+            {
+                "uuid": "ABCD1234",
+                "messages": {
+                    "ClientType": [
+                        {"properties": {"TYPE": "jsd", "VERSION": "1"}},
+                        {"properties": {"TYPE": "other"}},
+                    ],
+                    "Eval": [{"mcode": "disp('jsd \u00e9')"}],
+                },
+            },
+            {
+                "uuid": "ABCD1234",
+                "messages": {
+                    "ClientType": [
+                        {"properties": {"TYPE": "jsd_rmt_tmw", "VERSION": "1"}},
+                        {"properties": {"TYPE": "other"}},
+                    ],
+                    "Eval": [{"mcode": "disp('jsd \u00e9')"}],
+                },
+            },
+        ),
+        (
+            {"messages": {"ClientType": [{"properties": {"TYPE": "other"}}]}},
+            {"messages": {"ClientType": [{"properties": {"TYPE": "other"}}]}},
+        ),
+        (
+            {
+                "messages": {
+                    "Eval": [{"ClientType": [{"properties": {"TYPE": "jsd"}}]}],
+                    "ClientType": [{"properties": {"TYPE": "jsd"}}],
+                },
+                "ClientType": [{"properties": {"TYPE": "jsd"}}],
+            },
+            {
+                "messages": {
+                    "Eval": [{"ClientType": [{"properties": {"TYPE": "jsd"}}]}],
+                    "ClientType": [{"properties": {"TYPE": "jsd_rmt_tmw"}}],
+                },
+                "ClientType": [{"properties": {"TYPE": "jsd"}}],
+            },
+        ),
+        (
+            {"messages": {"Eval": [{"ClientType": [{"properties": {"TYPE": "jsd"}}]}]}},
+            {"messages": {"Eval": [{"ClientType": [{"properties": {"TYPE": "jsd"}}]}]}},
+        ),
+    ],
+    ids=[
+        "ClientType of type jsd",
+        "ClientType among other messages",
+        "ClientType of another type",
+        "Nested ClientType next to top-level messages.ClientType",
+        "Only nested ClientType",
+    ],
+)
+@pytest.mark.parametrize(
+    "padding",
+    [0, app.PARTIAL_REWRITE_MIN_BODY_SIZE_IN_BYTES],
+    ids=["Small body", "Large body"],
+)
+def test_rewrite_client_type(body, expected, padding):
+    """Test to check if rewrite_client_type only rewrites ClientType messages of type jsd and
+    leaves the rest of the body intact, both for bodies which are parsed as a whole and for larger
+    bodies in which only messages.ClientType is decoded.
+
+    Args:
+        body (Dict): Body of the messageservice request.
+        expected (Dict): Expected body after rewriting.
+        padding (int): Size of an additional member which makes the body larger.
+    """
+    if padding:
+        body = {"padding": "x" * padding, **body}
+        expected = {"padding": "x" * padding, **expected}
+
+    rewritten_body = app.rewrite_client_type(json.dumps(body).encode("utf-8"))
+
+    assert isinstance(rewritten_body, bytes)
+    assert json.loads(rewritten_body) == expected
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"messages": {"Eval": [{"mcode": "x = 1;"}]}}',
+        b'{"messages": {"ClientType": [{"properties": {"TYPE": "other"}}]}}',
+        b"not json, but mentions jsd",
+    ],
+    ids=[
+        "No ClientType",
+        "ClientType without jsd",
+        "Invalid JSON",
+    ],
+)
+def test_rewrite_client_type_fast_path(body):
+    """Test to check that bodies which do not need rewriting are returned as is.
+
+    Args:
+        body (Bytes): Body of the messageservice request.
+    """
+    assert app.rewrite_client_type(body) is body
+
+
 # While acceessing matlab-proxy directly, the web socket request looks like
 #     {
 #         "connection": "Upgrade",
@@ -489,6 +1019,126 @@ async def test_matlab_proxy_web_socket(test_server, headers):
     assert text.type == aiohttp.WSMsgType.CLOSED
 
 
+@pytest.mark.parametrize(
+    "compression_enabled, expected_compress",
+    [(True, 15), (False, 0)],
+    ids=["compressed", "uncompressed"],
+)
+async def test_matlab_proxy_web_socket_compression(
+    test_server, compression_enabled, expected_compress
+):
+    """Test to check if compression of the WebSocket with the browser follows MWI_ENABLE_BROWSER_WEBSOCKET_COMPRESSION.
+
+    Args:
+        test_server (aiohttp_client): Test Server to send HTTP Requests.
+        compression_enabled (bool): Value of the setting.
+        expected_compress (int): Window bits negotiated with the browser, 0 if compression is not used.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+    test_server.app["settings"][
+        "mwi_enable_browser_websocket_compression"
+    ] = compression_enabled
+
+    async with test_server.ws_connect("/http_ws_request.html/", compress=15) as ws:
+        assert ws.compress == expected_compress
+        assert await ws.receive_str() == "Hello world"
+
+
+async def test_matlab_proxy_rejects_requests_when_queue_is_full(test_server):
+    """Test to check if requests beyond MWI_PROXY_MAX_CONCURRENT_REQUESTS are rejected with a Retry-After
+    once the queue of waiting requests is full.
+
+    Args:
+        test_server (aiohttp_client): Test Server to send HTTP Requests.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+
+    admission_controller = AdmissionController(max_concurrency=1, max_queue_size=0)
+    test_server.app["admission_controller"] = admission_controller
+
+    # Holds the only place in flight
+    async with admission_controller.admit():
+        resp = await test_server.get(f"/{constants.MATLAB_JSD_PAGE_NAME}")
+        assert resp.status == HTTPStatus.SERVICE_UNAVAILABLE
+        assert resp.headers["Retry-After"] == str(
+            constants.PROXY_RETRY_AFTER_IN_SECONDS
+        )
+
+    resp = await test_server.get(f"/{constants.MATLAB_JSD_PAGE_NAME}")
+    assert resp.status == HTTPStatus.OK
+    assert admission_controller.rejected_requests.get() == 1
+
+
+async def test_matlab_proxy_own_requests_bypass_admission(test_server):
+    """Test to check if the pings of the Embedded Connector and the request to stop MATLAB, which are sent by
+    matlab-proxy itself, do not wait for the requests of the browsers to be admitted.
+
+    Args:
+        test_server (aiohttp_client): Test Server to send HTTP Requests.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+
+    admission_controller = AdmissionController(max_concurrency=1, max_queue_size=0)
+    test_server.app["admission_controller"] = admission_controller
+
+    # Holds the only place in flight, so that any request to the proxy is rejected
+    async with admission_controller.admit():
+        await state.start_matlab(restart_matlab=True)
+        assert await state.wait_for_matlab_state(["up"], timeout=30)
+
+        await state.stop_matlab()
+        assert state.matlab_state == "down"
+
+    assert admission_controller.rejected_requests.get() == 0
+
+
+async def test_matlab_proxy_web_socket_large_messages(test_server):
+    """Test to check if multi-megabyte WebSocket messages are relayed to the fake MATLAB server and back.
+
+    Args:
+        test_server (aiohttp_client): Test Server to send HTTP Requests.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+
+    # Larger than the 4 MB default of aiohttp
+    message_size = 8 * 1024 * 1024
+    async with test_server.ws_connect("/http_ws_request.html/", max_msg_size=0) as ws:
+        assert await ws.receive_str() == "Hello world"
+
+        payload = bytes(random.getrandbits(8) for _ in range(256)) * (
+            message_size // 256
+        )
+        await ws.send_bytes(payload)
+        assert await ws.receive_bytes(timeout=30) == payload
+
+        text = "x" * message_size
+        await ws.send_str(text)
+        assert await ws.receive_str(timeout=30) == text
+
+
+async def test_matlab_proxy_web_socket_message_too_big(test_server):
+    """Test to check if a WebSocket message larger than MWI_WEBSOCKET_MAX_MESSAGE_SIZE_IN_MB closes the WebSocket.
+
+    Args:
+        test_server (aiohttp_client): Test Server to send HTTP Requests.
+    """
+    state = test_server.app["state"]
+    assert await state.wait_for_matlab_state(["up"], timeout=30)
+    test_server.app["settings"]["mwi_websocket_max_message_size"] = 1024 * 1024
+
+    async with test_server.ws_connect("/http_ws_request.html/") as ws:
+        assert await ws.receive_str() == "Hello world"
+
+        await ws.send_bytes(bytes(2 * 1024 * 1024))
+        msg = await ws.receive(timeout=30)
+        assert msg.type == aiohttp.WSMsgType.CLOSE
+        assert msg.data == aiohttp.WSCloseCode.MESSAGE_TOO_BIG
+
+
 async def test_set_licensing_info_put_nlm(test_server):
     """Test to check endpoint : "/set_licensing_info"
 
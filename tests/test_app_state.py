@@ -0,0 +1,652 @@
+# Copyright (c) 2023 The MathWorks, Inc.
+"""Tests for functions in matlab_proxy/app_state.py
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from matlab_proxy import settings
+from matlab_proxy.util import mwi, system
+from matlab_proxy.app_state import AppState
+from matlab_proxy.util.mwi.exceptions import OnlineLicensingError
+
+
+@pytest.fixture(name="app_state")
+def app_state_fixture():
+    """A pytest fixture which returns an instance of AppState initialized with dev settings.
+
+    Returns:
+        AppState: An instance of AppState.
+    """
+    return AppState(settings.get(dev=True))
+
+
+@pytest.fixture(name="mock_get_state")
+def mock_get_state_fixture(mocker):
+    """A pytest fixture which mocks the ping to the Embedded Connector.
+
+    Args:
+        mocker : Built in pytest fixture
+
+    Returns:
+        AsyncMock: The mocked get_state function.
+    """
+    return mocker.patch(
+        "matlab_proxy.app_state.mwi.embedded_connector.request.get_state",
+        return_value="up",
+    )
+
+
+async def test_embedded_connector_state_is_single_flight(app_state, mock_get_state):
+    """Test to check if concurrent callers share a single ping to the Embedded Connector
+    and the state is reused until it expires.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        mock_get_state (AsyncMock): Pytest fixture which mocks the ping to the Embedded Connector.
+    """
+    states = await asyncio.gather(
+        *[app_state._AppState__get_embedded_connector_state() for _ in range(10)]
+    )
+
+    assert states == ["up"] * 10
+    assert mock_get_state.call_count == 1
+
+    # Reused while it has not expired
+    assert await app_state._AppState__get_embedded_connector_state() == "up"
+    assert mock_get_state.call_count == 1
+
+    # Expire the state
+    app_state.embedded_connector_state_updated_at -= (
+        app_state.EMBEDDED_CONNECTOR_STATE_TTL_IN_SECONDS
+    )
+    await app_state._AppState__get_embedded_connector_state()
+    assert mock_get_state.call_count == 2
+
+
+async def test_embedded_connector_state_timeout(app_state, mock_get_state):
+    """Test to check if the last known state of the Embedded Connector is used when it does not respond in time.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        mock_get_state (AsyncMock): Pytest fixture which mocks the ping to the Embedded Connector.
+    """
+    app_state.embedded_connector_state = "up"
+    mock_get_state.side_effect = asyncio.TimeoutError
+
+    assert await app_state._AppState__get_embedded_connector_state() == "up"
+    assert (
+        mock_get_state.call_args.kwargs["timeout"]
+        == app_state.EMBEDDED_CONNECTOR_PING_TIMEOUT_IN_SECONDS
+    )
+
+
+async def test_wait_for_status_change(app_state):
+    """Test to check if waiting clients are woken up when the status changes.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+    """
+    status_version = app_state.status_version
+
+    # Times out when nothing changes
+    assert not await app_state.wait_for_status_change(status_version, timeout=0.01)
+
+    waiter = asyncio.ensure_future(
+        app_state.wait_for_status_change(status_version, timeout=10)
+    )
+    await asyncio.sleep(0)
+    app_state.licensing = {"type": "existing_license"}
+
+    assert await waiter
+    assert app_state.status_version > status_version
+
+    # Returns immediately when the status has changed since the version known to the caller
+    assert await app_state.wait_for_status_change(status_version, timeout=10)
+
+
+@pytest.mark.parametrize(
+    "matlab_state, matlab_status",
+    [
+        ("down", "down"),
+        ("starting", "starting"),
+        ("connector-pending", "starting"),
+        ("up", "up"),
+        ("stopping", "stopping"),
+    ],
+)
+async def test_get_matlab_state(app_state, matlab_state, matlab_status):
+    """Test to check if the states in the lifecycle of MATLAB are reported to the clients correctly.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        matlab_state (String): State in the lifecycle of MATLAB.
+        matlab_status (String): Status of MATLAB reported to the clients.
+    """
+    app_state.matlab_state = matlab_state
+    assert await app_state.get_matlab_state() == matlab_status
+
+
+async def test_wait_for_matlab_state(app_state):
+    """Test to check if clients waiting for a state of MATLAB are woken up by the transition to it.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+    """
+    assert await app_state.wait_for_matlab_state(["down"], timeout=0.01)
+    assert not await app_state.wait_for_matlab_state(["up"], timeout=0.01)
+
+    waiter = asyncio.ensure_future(app_state.wait_for_matlab_state(["up"], timeout=10))
+    app_state._AppState__set_matlab_state("starting")
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    app_state._AppState__set_matlab_state("up")
+    assert await waiter
+
+
+@pytest.mark.skipif(
+    system.is_windows(), reason="Uses an asyncio subprocess to stand in for MATLAB"
+)
+async def test_matlab_exit_transitions_to_down(app_state):
+    """Test to check if MATLAB transitions to the "down" state as soon as its process exits.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+    """
+    app_state.processes["matlab"] = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", "pass"
+    )
+    app_state.matlab_state = "up"
+
+    await asyncio.wait_for(
+        app_state._AppState__watch_process_exit("matlab"), timeout=10
+    )
+    assert app_state.matlab_state == "down"
+
+
+@pytest.mark.skipif(
+    system.is_windows(), reason="Uses an asyncio subprocess to stand in for Xvfb"
+)
+@pytest.mark.parametrize("reuse_xvfb", [True, False], ids=["Reuse Xvfb", "Stop Xvfb"])
+async def test_stop_matlab_reuse_xvfb(app_state, reuse_xvfb):
+    """Test to check if Xvfb is kept running when MATLAB is stopped only if it is reused.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        reuse_xvfb (bool): Whether Xvfb is reused across restarts of MATLAB.
+    """
+    app_state.settings["mwi_reuse_xvfb"] = reuse_xvfb
+    xvfb = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", "import time; time.sleep(60)"
+    )
+    app_state.processes["xvfb"] = xvfb
+
+    try:
+        await app_state.stop_matlab()
+        assert (xvfb.returncode is None) == reuse_xvfb
+
+        await app_state.stop_xvfb()
+        assert xvfb.returncode is not None
+    finally:
+        if xvfb.returncode is None:
+            xvfb.kill()
+            await xvfb.wait()
+
+
+@pytest.mark.skipif(not system.is_linux(), reason="Xvfb is only started on Linux")
+async def test_start_matlab_prepares_launch_concurrently(app_state, mocker):
+    """Test to check if Xvfb is started while the access token is being fetched.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        mocker : Built in pytest fixture
+    """
+    delay = 0.5
+    xvfb = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", "import time; time.sleep(60)"
+    )
+
+    async def start_xvfb_process():
+        await asyncio.sleep(delay)
+        return xvfb
+
+    async def fetch_access_token(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return {"token": "access_token"}
+
+    mocker.patch.object(
+        app_state, "_AppState__start_xvfb_process", side_effect=start_xvfb_process
+    )
+    mocker.patch(
+        "matlab_proxy.app_state.mw.fetch_access_token", side_effect=fetch_access_token
+    )
+    start_matlab_process = mocker.patch.object(
+        app_state, "_AppState__start_matlab_process", return_value=None
+    )
+    app_state.licensing = {
+        "type": "mhlm",
+        "identity_token": "identity_token",
+        "source_id": "source_id",
+        "entitlement_id": "entitlement_id",
+        "email_addr": "email_addr",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "display_name": "display_name",
+        "user_id": "user_id",
+        "profile_id": "profile_id",
+    }
+
+    try:
+        start_time = asyncio.get_running_loop().time()
+        await app_state.start_matlab()
+        duration = asyncio.get_running_loop().time() - start_time
+
+        matlab_env = start_matlab_process.call_args.args[0]
+        assert matlab_env["MLM_WEB_USER_CRED"] == "access_token"
+        assert matlab_env["DISPLAY"] == app_state.settings["matlab_display"]
+        assert duration < 2 * delay
+    finally:
+        await app_state.stop_xvfb()
+
+
+async def test_embedded_connector_health_check(app_state, mocker):
+    """Test to check if MATLAB moves back to the "connector-pending" state once the Embedded Connector responds
+    as "down" to consecutive pings while MATLAB is up, and moves to the "up" state again once it responds.
+
+    Uses the fake MATLAB started in development mode.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        mocker : Built in pytest fixture
+    """
+    app_state.EMBEDDED_CONNECTOR_HEALTH_CHECK_DELAY_IN_SECONDS = 0.05
+    app_state.EMBEDDED_CONNECTOR_STATE_TTL_IN_SECONDS = 0
+    app_state.licensing = {"type": "existing_license"}
+
+    try:
+        await app_state.start_matlab()
+        assert await app_state.wait_for_matlab_state(["up"], timeout=30)
+
+        # Fewer consecutive failures than the limit are tolerated
+        failures = ["down"] * (
+            app_state.EMBEDDED_CONNECTOR_MAX_HEALTH_CHECK_FAILURES - 1
+        )
+
+        async def get_state(*args, **kwargs):
+            return failures.pop() if failures else "up"
+
+        mock_get_state = mocker.patch(
+            "matlab_proxy.app_state.mwi.embedded_connector.request.get_state",
+            side_effect=get_state,
+        )
+        assert not await app_state.wait_for_matlab_state(
+            ["connector-pending"], timeout=0.5
+        )
+        assert not failures
+
+        mock_get_state.side_effect = None
+        mock_get_state.return_value = "down"
+        assert await app_state.wait_for_matlab_state(["connector-pending"], timeout=5)
+
+        mock_get_state.return_value = "up"
+        assert await app_state.wait_for_matlab_state(["up"], timeout=5)
+    finally:
+        await app_state.stop_matlab(force_quit=True)
+        await app_state.stop_xvfb()
+
+
+@pytest.fixture(name="cached_mhlm_licensing")
+def cached_mhlm_licensing_fixture(app_state, tmp_path):
+    """A pytest fixture which caches MHLM licensing for the app_state fixture in a temporary folder.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        tmp_path : Built in pytest fixture
+
+    Returns:
+        Dict: The cached licensing.
+    """
+    licensing = {
+        "type": "mhlm",
+        "identity_token": "identity_token",
+        "source_id": "source_id",
+        "expiry": (datetime.now(timezone.utc) + timedelta(days=1)).strftime(
+            "%Y-%m-%dT%H:%M:%S.%f%z"
+        ),
+        "email_addr": "email_addr",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "display_name": "display_name",
+        "user_id": "user_id",
+        "profile_id": "profile_id",
+        "entitlement_id": "1",
+    }
+    # Licensing set in the environment takes precedence over cached licensing
+    app_state.settings["nlm_conn_str"] = None
+    app_state.settings["matlab_config_file"] = tmp_path / "proxy_app_config.json"
+    app_state.settings["matlab_config_file"].write_text(json.dumps(licensing))
+
+    return licensing
+
+
+async def test_init_licensing_caches_entitlements(
+    app_state, cached_mhlm_licensing, mocker
+):
+    """Test to check if the entitlements fetched while initializing licensing are used by the next
+    initialization right away, and updated in the background.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        cached_mhlm_licensing (Dict): Pytest fixture which caches MHLM licensing.
+        mocker : Built in pytest fixture
+    """
+    entitlements = [{"id": "1", "label": "label", "license_number": "123"}]
+    mocker.patch(
+        "matlab_proxy.app_state.mw.fetch_access_token",
+        return_value={"token": "access_token", "expiry": None},
+    )
+    fetch_entitlements = mocker.patch(
+        "matlab_proxy.app_state.mw.fetch_entitlements", return_value=entitlements
+    )
+
+    await app_state.init_licensing()
+    assert app_state.licensing["entitlements"] == entitlements
+    assert app_state.entitlements_revalidation is None
+    assert fetch_entitlements.call_count == 1
+
+    # The next initialization does not wait for the entitlements to be fetched
+    updated_entitlements = entitlements + [
+        {"id": "2", "label": "label", "license_number": "456"}
+    ]
+    fetch_entitlements.return_value = updated_entitlements
+    restarted_app_state = AppState(app_state.settings)
+
+    await restarted_app_state.init_licensing()
+    assert restarted_app_state.licensing["entitlements"] == entitlements
+    assert restarted_app_state.is_licensed()
+
+    await restarted_app_state.entitlements_revalidation
+    assert restarted_app_state.licensing["entitlements"] == updated_entitlements
+    assert fetch_entitlements.call_count == 2
+
+
+async def test_revalidate_entitlements_failure(
+    app_state, cached_mhlm_licensing, mocker
+):
+    """Test to check if the cached entitlements remain in use when they cannot be updated.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        cached_mhlm_licensing (Dict): Pytest fixture which caches MHLM licensing.
+        mocker : Built in pytest fixture
+    """
+    entitlements = [{"id": "1", "label": "label", "license_number": "123"}]
+    app_state.settings["matlab_config_file"].with_name(
+        "entitlements_cache.json"
+    ).write_text(
+        json.dumps(
+            {
+                f"user_id:{app_state.settings['matlab_version']}": {
+                    "entitlements": entitlements,
+                    "updated_at": time.time(),
+                }
+            }
+        )
+    )
+    mocker.patch(
+        "matlab_proxy.app_state.mw.fetch_access_token",
+        side_effect=OnlineLicensingError("Unable to reach the licensing service"),
+    )
+
+    await app_state.init_licensing()
+    await app_state.entitlements_revalidation
+
+    assert app_state.licensing["entitlements"] == entitlements
+    assert app_state.error is None
+    assert app_state.settings["matlab_config_file"].exists()
+
+
+@pytest.fixture(name="revalidating_entitlements")
+async def revalidating_entitlements_fixture(app_state, cached_mhlm_licensing, mocker):
+    """A pytest fixture which initializes licensing of the app_state fixture with cached entitlements,
+    whose update in the background never completes.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        cached_mhlm_licensing (Dict): Pytest fixture which caches MHLM licensing.
+        mocker : Built in pytest fixture
+
+    Returns:
+        Path: The cached entitlements file.
+    """
+    entitlements_file = app_state.settings["matlab_config_file"].with_name(
+        "entitlements_cache.json"
+    )
+    entitlements_file.write_text(
+        json.dumps(
+            {
+                f"user_id:{app_state.settings['matlab_version']}": {
+                    "entitlements": [{"id": "1", "label": "label"}],
+                    "updated_at": time.time(),
+                }
+            }
+        )
+    )
+
+    async def fetch_entitlements(*args, **kwargs):
+        await asyncio.sleep(60)
+
+    mocker.patch(
+        "matlab_proxy.app_state.mw.fetch_access_token",
+        return_value={"token": "access_token", "expiry": None},
+    )
+    mocker.patch(
+        "matlab_proxy.app_state.mw.fetch_entitlements", side_effect=fetch_entitlements
+    )
+
+    await app_state.init_licensing()
+    assert app_state.entitlements_revalidation is not None
+
+    return entitlements_file
+
+
+async def test_unset_licensing_deletes_cached_entitlements(
+    app_state, revalidating_entitlements
+):
+    """Test to check if signing out cancels the update of the entitlements and deletes the cached entitlements.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        revalidating_entitlements (Path): Pytest fixture which initializes licensing with cached entitlements.
+    """
+    revalidation = app_state.entitlements_revalidation
+
+    app_state.unset_licensing()
+    app_state.persist_licensing()
+    await asyncio.sleep(0)
+
+    assert revalidation.cancelled()
+    assert app_state.entitlements_revalidation is None
+    assert not app_state.settings["matlab_config_file"].exists()
+    assert not revalidating_entitlements.exists()
+
+
+async def test_set_licensing_cancels_revalidation(app_state, revalidating_entitlements):
+    """Test to check if changing the licensing cancels the update of the entitlements of the previous licensing.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        revalidating_entitlements (Path): Pytest fixture which initializes licensing with cached entitlements.
+    """
+    revalidation = app_state.entitlements_revalidation
+
+    await app_state.set_licensing_nlm("123@nlm")
+    await asyncio.sleep(0)
+
+    assert revalidation.cancelled()
+    assert app_state.licensing == {"type": "nlm", "conn_str": "123@nlm"}
+
+
+@pytest.fixture(name="standby_app_state")
+async def standby_app_state_fixture(app_state):
+    """A pytest fixture which returns the app_state fixture with the standby MATLAB enabled, and stops
+    the MATLAB processes it started at the end of the test.
+
+    Uses the fake MATLAB started in development mode.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+
+    Yields:
+        AppState: The instance of AppState.
+    """
+    app_state.settings["mwi_enable_matlab_standby"] = True
+    app_state.licensing = {"type": "existing_license"}
+
+    yield app_state
+
+    await app_state.stop_standby_matlab()
+    await app_state.stop_matlab(force_quit=True)
+    await app_state.stop_xvfb()
+
+
+async def wait_for_standby(app_state):
+    """Waits for the standby MATLAB to be ready.
+
+    Args:
+        app_state (AppState): The instance of AppState starting the standby MATLAB.
+
+    Returns:
+        Dict: The standby MATLAB.
+    """
+    await asyncio.wait_for(asyncio.shield(app_state.standby_task), timeout=30)
+    assert app_state.standby is not None
+    assert app_state.standby["matlab_port"] is not None
+    return app_state.standby
+
+
+@pytest.mark.skipif(
+    not system.is_posix(), reason="The standby MATLAB is not supported on Windows"
+)
+async def test_restart_matlab_with_standby(standby_app_state):
+    """Test to check if the standby MATLAB takes over when MATLAB is restarted, and a new standby MATLAB is started.
+
+    Args:
+        standby_app_state (AppState): Pytest fixture which returns an instance of AppState with the standby MATLAB enabled.
+    """
+    app_state = standby_app_state
+
+    await app_state.start_matlab()
+    assert await app_state.wait_for_matlab_state(["up"], timeout=30)
+    standby = await wait_for_standby(app_state)
+    assert standby["mwi_logs_dir"] != app_state.mwi_logs_dir
+
+    previous_matlab = app_state.processes["matlab"]
+    await app_state.start_matlab(restart_matlab=True)
+    assert await app_state.wait_for_matlab_state(["up"], timeout=5)
+
+    assert previous_matlab.returncode is not None
+    assert app_state.processes["matlab"] is standby["matlab"]
+    assert app_state.matlab_port == standby["matlab_port"]
+    assert app_state.mwi_logs_dir == standby["mwi_logs_dir"]
+
+    # A new standby MATLAB is started in the background
+    new_standby = await wait_for_standby(app_state)
+    assert new_standby["matlab"] is not standby["matlab"]
+    assert new_standby["mwi_logs_dir"] != app_state.mwi_logs_dir
+
+
+@pytest.mark.skipif(
+    not system.is_posix(), reason="The standby MATLAB is not supported on Windows"
+)
+async def test_restart_matlab_with_dead_standby(standby_app_state):
+    """Test to check if MATLAB is launched when the standby MATLAB has exited, and a new standby MATLAB is started.
+
+    Args:
+        standby_app_state (AppState): Pytest fixture which returns an instance of AppState with the standby MATLAB enabled.
+    """
+    app_state = standby_app_state
+
+    await app_state.start_matlab()
+    assert await app_state.wait_for_matlab_state(["up"], timeout=30)
+    standby = await wait_for_standby(app_state)
+
+    standby["matlab"].kill()
+    await standby["matlab"].wait()
+
+    await app_state.start_matlab(restart_matlab=True)
+    assert await app_state.wait_for_matlab_state(["up"], timeout=30)
+
+    # A normal launch, rather than the dead standby MATLAB taking over
+    assert app_state.processes["matlab"] is not standby["matlab"]
+    assert app_state.mwi_logs_dir != standby["mwi_logs_dir"]
+    assert "standby_matlab_adopted" not in app_state.startup_timeline["phases"]
+
+    # A new standby MATLAB is started in the background
+    new_standby = await wait_for_standby(app_state)
+    assert new_standby is not standby
+    assert new_standby["matlab"].returncode is None
+
+
+@pytest.mark.skipif(
+    not system.is_posix(), reason="The standby MATLAB is not supported on Windows"
+)
+async def test_restart_matlab_with_starting_standby(standby_app_state):
+    """Test to check if a standby MATLAB which is still starting is stopped when MATLAB is restarted after
+    a takeover, so that it does not share the logs folder of the MATLAB launched instead.
+
+    Args:
+        standby_app_state (AppState): Pytest fixture which returns an instance of AppState with the standby MATLAB enabled.
+    """
+    app_state = standby_app_state
+
+    await app_state.start_matlab()
+    assert await app_state.wait_for_matlab_state(["up"], timeout=30)
+    await wait_for_standby(app_state)
+
+    # The standby MATLAB takes over, so the next launch uses the logs folder of the first MATLAB
+    await app_state.start_matlab(restart_matlab=True)
+    assert await app_state.wait_for_matlab_state(["up"], timeout=5)
+
+    # Restart while the new standby MATLAB is still starting
+    while app_state.standby is None or app_state.standby["matlab"] is None:
+        await asyncio.sleep(0.01)
+    starting_standby = app_state.standby
+    assert starting_standby["matlab_port"] is None
+
+    await app_state.start_matlab(restart_matlab=True)
+    assert await app_state.wait_for_matlab_state(["up"], timeout=30)
+
+    # A normal launch, and the standby MATLAB which was starting is stopped
+    assert "standby_matlab_adopted" not in app_state.startup_timeline["phases"]
+    assert app_state.processes["matlab"] is not starting_standby["matlab"]
+    assert starting_standby["matlab"].returncode is not None
+    assert app_state.mwi_logs_dir == starting_standby["mwi_logs_dir"]
+
+    # A new standby MATLAB is started in a different logs folder
+    new_standby = await wait_for_standby(app_state)
+    assert new_standby is not starting_standby
+    assert new_standby["mwi_logs_dir"] != app_state.mwi_logs_dir
+
+
+@pytest.mark.parametrize(
+    "connector_warmup", [True, False], ids=["Warm-up enabled", "Warm-up disabled"]
+)
+def test_setup_env_for_matlab_connector_warmup(app_state, connector_warmup):
+    """Test to check if the warm-up tasks of the Embedded Connector are enabled only when the setting is.
+
+    Args:
+        app_state (AppState): Pytest fixture which returns an instance of AppState.
+        connector_warmup (bool): Whether the connector warm-up is enabled.
+    """
+    app_state.settings["mwi_enable_connector_warmup"] = connector_warmup
+
+    matlab_env = app_state._AppState__setup_env_for_matlab({})
+
+    assert ("CONNECTOR_WARMUP" in matlab_env) == connector_warmup
+    assert ("CONNECTOR_CONFIGURABLE_WARMUP_TASKS" in matlab_env) == connector_warmup
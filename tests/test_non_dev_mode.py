@@ -1,5 +1,6 @@
 # Copyright (c) 2020-2022 The MathWorks, Inc.
 
+import gzip
 import os
 import shutil
 from pathlib import Path
@@ -77,7 +78,7 @@ def build_frontend_fixture():
             {
                 "dir": "js",
                 "file": "index.js",
-                "file_content": "import React from 'react';'",
+                "file_content": "import React from 'react';'\n" * 100,
             },
             {
                 "dir": "media",
@@ -167,3 +168,117 @@ async def test_non_dev(test_server):
     assert resp.status == 200
 
     assert test_server.app["static_route_table"] is not None
+
+
+async def test_static_file_is_served_compressed(test_server):
+    """Tests whether a compressible static file is served from the cache with gzip encoding
+    and an ETag when the browser accepts gzip.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp server to send HTTP requests to.
+    """
+    resp = await test_server.get(
+        "/static/js/index.js", headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert resp.status == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    assert resp.headers["ETag"].endswith('-gzip"')
+    # aiohttp_client decompresses the body transparently
+    assert await resp.text() == "import React from 'react';'\n" * 100
+
+
+async def test_static_file_is_served_uncompressed(test_server):
+    """Tests whether a static file is served as is when the browser does not accept any compression.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp server to send HTTP requests to.
+    """
+    resp = await test_server.get(
+        "/static/js/index.js", headers={"Accept-Encoding": "identity"}
+    )
+
+    assert resp.status == 200
+    assert "Content-Encoding" not in resp.headers
+    assert await resp.text() == "import React from 'react';'\n" * 100
+
+
+async def test_static_file_not_modified(test_server):
+    """Tests whether a response with status 304 is returned when the ETag sent by the browser matches.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp server to send HTTP requests to.
+    """
+    resp = await test_server.get("/index.html")
+    assert resp.status == 200
+    etag = resp.headers["ETag"]
+
+    resp = await test_server.get("/index.html", headers={"If-None-Match": etag})
+    assert resp.status == 304
+    assert resp.headers["ETag"] == etag
+
+    resp = await test_server.get("/index.html", headers={"If-None-Match": '"stale"'})
+    assert resp.status == 200
+
+
+@pytest.mark.parametrize(
+    "path, cache_control",
+    [
+        ("/static/js/index.js", "public, max-age=31536000, immutable"),
+        ("/static/css/index.css", "public, max-age=31536000, immutable"),
+        ("/static/media/media.txt", "public, max-age=31536000, immutable"),
+        ("/index.html", "no-cache"),
+        ("/manifest.json", "no-cache"),
+    ],
+    ids=[
+        "Hashed js bundle",
+        "Hashed css bundle",
+        "Hashed media file",
+        "index.html",
+        "manifest.json",
+    ],
+)
+async def test_static_file_cache_control(test_server, path, cache_control):
+    """Tests whether content-hashed static files are cached indefinitely while the other
+    static files are revalidated on every use.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp server to send HTTP requests to.
+        path (String): Path to the static file.
+        cache_control (String): Expected value of the Cache-Control header.
+    """
+    resp = await test_server.get(path)
+
+    assert resp.status == 200
+    assert resp.headers["Cache-Control"] == cache_control
+    assert "Last-Modified" in resp.headers
+
+
+async def test_static_file_not_modified_since(test_server):
+    """Tests whether a response with status 304 is returned when the static file has not
+    been modified since the time sent by the browser.
+
+    Args:
+        test_server (aiohttp_client): A aiohttp server to send HTTP requests to.
+    """
+    resp = await test_server.get("/index.html")
+    assert resp.status == 200
+    last_modified = resp.headers["Last-Modified"]
+
+    resp = await test_server.get(
+        "/index.html", headers={"If-Modified-Since": last_modified}
+    )
+    assert resp.status == 304
+
+    resp = await test_server.get(
+        "/index.html", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}
+    )
+    assert resp.status == 200
+
+    # If-None-Match takes precedence over If-Modified-Since
+    resp = await test_server.get(
+        "/index.html",
+        headers={"If-Modified-Since": last_modified, "If-None-Match": '"stale"'},
+    )
+    assert resp.status == 200
@@ -276,6 +276,23 @@ def test_get_dev_false(patch_env_variables, mock_shutil_which, fake_matlab_root_
     assert _settings["matlab_protocol"] == "https"
 
 
+def test_get_proxy_tuning_settings(
+    monkeypatch, patch_env_variables, mock_shutil_which, fake_matlab_root_path
+):
+    """Test to check if the tunables of the proxy are read once and included in both dev and server settings.
+
+    Args:
+        monkeypatch : Built-in pytest fixture
+        patch_env_variables : Pytest fixture which monkeypatches some env variables.
+    """
+    monkeypatch.setenv(mwi_env.get_env_name_proxy_max_concurrent_requests(), "20")
+    tuning_settings = settings.get_proxy_tuning_settings()
+    assert tuning_settings["mwi_proxy_max_concurrent_requests"] == 20
+
+    for _settings in (settings.get(dev=True), settings.get(dev=False)):
+        assert {key: _settings[key] for key in tuning_settings} == tuning_settings
+
+
 def test_get_mw_context_tags(monkeypatch):
     """Tests get_mw_context_tags() function to return appropriate MW_CONTEXT_TAGS"""
 
@@ -12,10 +12,14 @@ async def test_send_request_success(mocker):
 
     mocked = mocker.patch("aiohttp.ClientSession.request", return_value=mock_resp)
     res = await mwi.embedded_connector.send_request(
-        url="https://localhost:3000", data=json_data, method="GET"
+        url="https://localhost:3000",
+        data=json_data,
+        method="GET",
+        headers={"mwapikey": "mwapikey"},
     )
 
     assert json_data["hello"] == res["hello"]
+    assert mocked.call_args.kwargs["headers"] == {"mwapikey": "mwapikey"}
 
 
 async def test_send_request_failure(mocker):
@@ -44,3 +48,15 @@ async def test_send_request_failure(mocker):
         options[key] = ""
         with pytest.raises(EmbeddedConnectorError):
             res = await mwi.embedded_connector.send_request(**options)
+
+
+async def test_get_state_timeout(mocker):
+    """Test to check if get_state raises asyncio.TimeoutError instead of reporting the
+    Embedded Connector as down when it does not respond in time.
+    """
+    import asyncio
+
+    mocker.patch("aiohttp.ClientSession.request", side_effect=asyncio.TimeoutError)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await mwi.embedded_connector.get_state("https://localhost:3000", timeout=1)
@@ -0,0 +1,70 @@
+# Copyright 2023 The MathWorks, Inc.
+"""Tests for functions in matlab_proxy/util/mwi/metrics.py
+"""
+
+from matlab_proxy.util.mwi import metrics
+
+
+def test_counter():
+    """Test to check if a counter is rendered with a sample for each combination of the values of its labels."""
+    counter = metrics.Counter("frames_total", "Frames.", labelnames=("direction",))
+    counter.inc("in")
+    counter.inc("in", amount=2)
+    counter.inc("out")
+
+    assert counter.get("in") == 3
+    assert counter.get("other") == 0
+
+    assert counter.render() == [
+        "# HELP frames_total Frames.",
+        "# TYPE frames_total counter",
+        'frames_total{direction="in"} 3',
+        'frames_total{direction="out"} 1',
+    ]
+
+
+def test_gauge():
+    """Test to check if a gauge without labels can go up and down."""
+    gauge = metrics.Gauge("relays", "Relays.")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    assert gauge.render()[-1] == "relays 1"
+
+    gauge.set(0.5)
+    assert gauge.render()[-1] == "relays 0.5"
+
+
+def test_histogram():
+    """Test to check if the buckets of a histogram are cumulative and end with +Inf."""
+    histogram = metrics.Histogram(
+        "latency_seconds", "Latency.", labelnames=("status_class",), buckets=(0.1, 1)
+    )
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value, "2xx")
+
+    assert histogram.get_count("2xx") == 4
+    assert histogram.get_count("5xx") == 0
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{status_class="2xx",le="0.1"} 2',
+        'latency_seconds_bucket{status_class="2xx",le="1"} 3',
+        'latency_seconds_bucket{status_class="2xx",le="+Inf"} 4',
+        'latency_seconds_sum{status_class="2xx"} 2.65',
+        'latency_seconds_count{status_class="2xx"} 4',
+    ]
+
+
+def test_render():
+    """Test to check if label values are escaped and the metrics are rendered one after the other."""
+    counter = metrics.Counter("requests_total", "Requests.", labelnames=("url",))
+    counter.inc('https://example.com/"quoted"\\path')
+    gauge = metrics.Gauge("relays", "Relays.")
+
+    assert metrics.render([counter, gauge]) == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{url="https://example.com/\\"quoted\\"\\\\path"} 1\n'
+        "# HELP relays Relays.\n"
+        "# TYPE relays gauge\n"
+    )
@@ -261,3 +261,49 @@ def test_validate_mwi_ssl_key_and_cert_file(monkeypatch):
         # Or else PermissionError is raised.
         os.close(fd)
         os.remove(path)
+
+
+@pytest.mark.parametrize(
+    "value, number_type, expected",
+    [
+        (None, int, 10),
+        ("", int, 10),
+        ("0", int, 0),
+        ("25", int, 25),
+        ("2.5", float, 2.5),
+    ],
+    ids=[
+        "Value not set",
+        "Empty value",
+        "Zero",
+        "Positive integer",
+        "Positive float",
+    ],
+)
+def test_validate_non_negative_number(value, number_type, expected):
+    """Test to check if validate_non_negative_number returns the parsed value or the default"""
+    assert (
+        validators.validate_non_negative_number(
+            value, default=10, env_var_name="MWI_TEST_VAR", number_type=number_type
+        )
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "value, number_type",
+    [("-1", int), ("abc", int), ("2.5", int), ("-0.5", float)],
+    ids=[
+        "Negative integer",
+        "Not a number",
+        "Float instead of integer",
+        "Negative float",
+    ],
+)
+def test_validate_non_negative_number_invalid_value(value, number_type):
+    """Test to check if validate_non_negative_number raises FatalError for invalid values"""
+    with pytest.raises(FatalError) as e:
+        validators.validate_non_negative_number(
+            value, default=10, env_var_name="MWI_TEST_VAR", number_type=number_type
+        )
+    assert "MWI_TEST_VAR" in e.value.message
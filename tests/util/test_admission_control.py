@@ -0,0 +1,105 @@
+# Copyright 2023 The MathWorks, Inc.
+"""Tests for functions in matlab_proxy/util/admission_control.py
+"""
+
+import asyncio
+
+import pytest
+from matlab_proxy.util.admission_control import AdmissionController
+from matlab_proxy.util.mwi.exceptions import AdmissionQueueFullError
+
+
+async def hold(controller, name, admitted, release):
+    """Holds a place in flight until release is set.
+
+    Args:
+        controller (AdmissionController): The admission controller.
+        name (String): Name of the request, appended to admitted once it is admitted.
+        admitted (List): Names of the admitted requests, in the order in which they were admitted.
+        release (asyncio.Event): Event which ends the request.
+    """
+    async with controller.admit():
+        admitted.append(name)
+        await release.wait()
+
+
+async def test_admission_is_fair():
+    """Test to check if requests beyond the limit wait and are admitted in the order in which they arrived."""
+    controller = AdmissionController(max_concurrency=2, max_queue_size=10)
+    admitted = []
+    releases = {name: asyncio.Event() for name in "abcde"}
+
+    tasks = []
+    for name, release in releases.items():
+        tasks.append(asyncio.ensure_future(hold(controller, name, admitted, release)))
+        await asyncio.sleep(0)
+
+    await asyncio.sleep(0.01)
+    assert admitted == ["a", "b"]
+    assert controller.queue_depth.get() == 3
+    assert controller.in_flight_requests.get() == 2
+
+    releases["b"].set()
+    releases["a"].set()
+    await asyncio.sleep(0.01)
+    assert admitted == ["a", "b", "c", "d"]
+
+    for release in releases.values():
+        release.set()
+    await asyncio.gather(*tasks)
+
+    assert admitted == list("abcde")
+    assert controller.in_flight == 0
+    assert controller.queue_depth.get() == 0
+    assert controller.wait_duration.get_count() == 5
+
+
+async def test_admission_rejects_when_queue_is_full():
+    """Test to check if requests are rejected once the queue of waiting requests is full."""
+    controller = AdmissionController(max_concurrency=1, max_queue_size=1)
+    release = asyncio.Event()
+    tasks = [
+        asyncio.ensure_future(hold(controller, name, [], release)) for name in "ab"
+    ]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionQueueFullError):
+        async with controller.admit():
+            pass
+    assert controller.rejected_requests.get() == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert controller.in_flight == 0
+
+
+async def test_admission_cancelled_while_waiting():
+    """Test to check if a request cancelled while waiting leaves the queue without taking a place."""
+    controller = AdmissionController(max_concurrency=1, max_queue_size=10)
+    admitted = []
+    release = asyncio.Event()
+
+    first = asyncio.ensure_future(hold(controller, "a", admitted, release))
+    await asyncio.sleep(0.01)
+    cancelled = asyncio.ensure_future(hold(controller, "b", admitted, release))
+    await asyncio.sleep(0.01)
+    assert controller.queue_depth.get() == 1
+
+    cancelled.cancel()
+    await asyncio.sleep(0.01)
+    assert controller.queue_depth.get() == 0
+
+    release.set()
+    await first
+    assert admitted == ["a"]
+    assert controller.in_flight == 0
+
+
+async def test_admission_without_limit():
+    """Test to check if requests are never queued when there is no limit."""
+    controller = AdmissionController(max_concurrency=0, max_queue_size=0)
+
+    async with controller.admit(), controller.admit():
+        pass
+
+    assert controller.rejected_requests.get() == 0
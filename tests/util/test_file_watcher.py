@@ -0,0 +1,106 @@
+# Copyright 2023 The MathWorks, Inc.
+"""Tests for functions in matlab_proxy/util/file_watcher.py
+"""
+
+import asyncio
+
+import pytest
+from matlab_proxy.util import file_watcher, system
+from matlab_proxy.util.file_watcher import DirectoryWatcher
+
+
+@pytest.fixture(name="polling", params=[False, True], ids=["inotify", "polling"])
+def polling_fixture(request, monkeypatch):
+    """A pytest fixture which runs a test once with inotify and once with the polling fallback.
+
+    Args:
+        request : A built-in pytest fixture
+        monkeypatch : A built-in pytest fixture
+
+    Returns:
+        Boolean: True if the directory is expected to be polled.
+    """
+    if request.param:
+        monkeypatch.setattr(file_watcher, "_get_libc", lambda: None)
+    elif not system.is_linux():
+        pytest.skip("inotify is only available on Linux")
+
+    return request.param
+
+
+async def write_file_later(path, content, delay=0.1):
+    """Writes content to a file after a delay.
+
+    Args:
+        path (Path): Path to the file.
+        content (str): Content to write.
+        delay (float, optional): Delay in seconds. Defaults to 0.1.
+    """
+    await asyncio.sleep(delay)
+    path.write_text(content)
+
+
+async def test_wait_for_file(tmp_path, polling):
+    """Test to check if wait_for_file returns once the file is written.
+
+    Args:
+        tmp_path : A built-in pytest fixture
+        polling (bool): Pytest fixture which selects between inotify and the polling fallback.
+    """
+    with DirectoryWatcher(tmp_path, poll_interval=0.05) as watcher:
+        assert watcher.is_polling == polling
+
+        writer = asyncio.ensure_future(write_file_later(tmp_path / "ready", "31515"))
+        path = await asyncio.wait_for(watcher.wait_for_file("ready"), timeout=10)
+        await writer
+
+        assert path == tmp_path / "ready"
+        assert path.read_text() == "31515"
+
+
+async def test_wait_for_existing_file(tmp_path, polling):
+    """Test to check if wait_for_file returns immediately for a file which already exists.
+
+    Args:
+        tmp_path : A built-in pytest fixture
+        polling (bool): Pytest fixture which selects between inotify and the polling fallback.
+    """
+    (tmp_path / "ready").write_text("31515")
+
+    with DirectoryWatcher(tmp_path, poll_interval=10) as watcher:
+        await asyncio.wait_for(watcher.wait_for_file("ready"), timeout=1)
+
+
+async def test_wait_for_file_ignores_other_files(tmp_path):
+    """Test to check if files with other names do not end the wait.
+
+    Args:
+        tmp_path : A built-in pytest fixture
+    """
+    with DirectoryWatcher(tmp_path) as watcher:
+        waiter = asyncio.ensure_future(watcher.wait_for_file("ready"))
+
+        await write_file_later(tmp_path / "other", "")
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+
+        await write_file_later(tmp_path / "ready", "31515")
+        await asyncio.wait_for(waiter, timeout=10)
+
+
+async def test_wait_for_write(tmp_path, polling):
+    """Test to check if wait_for_write waits for the content of an existing file to be written.
+
+    Args:
+        tmp_path : A built-in pytest fixture
+        polling (bool): Pytest fixture which selects between inotify and the polling fallback.
+    """
+    (tmp_path / "ready").touch()
+
+    with DirectoryWatcher(tmp_path, poll_interval=0.05) as watcher:
+        await watcher.wait_for_file("ready")
+
+        writer = asyncio.ensure_future(write_file_later(tmp_path / "ready", "31515"))
+        while not (tmp_path / "ready").read_text():
+            await asyncio.wait_for(watcher.wait_for_write("ready"), timeout=10)
+        await writer
@@ -1,9 +1,12 @@
 # Copyright (c) 2020-2023 The MathWorks, Inc.
 
+import asyncio
 import datetime
+import os
 import random
 import re
 import secrets
+import sys
 from collections import namedtuple
 from datetime import timedelta, timezone
 from http import HTTPStatus
@@ -547,3 +550,283 @@ async def test_create_xvfb_process(loop):
 
     xvfb_2.terminate()
     await xvfb_2.wait()
+
+
+def fake_xvfb_cmd(script):
+    """Returns a command which runs a python script in place of Xvfb, along with the
+    pipe whose write descriptor is passed to it as its first argument.
+
+    Args:
+        script (String): Python code to run.
+
+    Returns:
+        List: Containing the command and the pipe.
+    """
+    dpipe = os.pipe2(os.O_NONBLOCK)
+    os.set_inheritable(dpipe[1], True)
+    return [sys.executable, "-c", script, str(dpipe[1])], dpipe
+
+
+@pytest.mark.skipif(
+    not system.is_linux(),
+    reason="Xvfb is only required on linux based operating systems",
+)
+async def test_create_xvfb_process_does_not_block_event_loop(loop):
+    """Test to check if the event loop keeps running while Xvfb initializes."""
+    xvfb_cmd, dpipe = fake_xvfb_cmd(
+        "import os, sys, time; time.sleep(1); os.write(int(sys.argv[1]), b'42\\n'); time.sleep(60)"
+    )
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.ensure_future(tick())
+    xvfb, display_port = await mw.create_xvfb_process(xvfb_cmd, dpipe)
+    ticker.cancel()
+
+    try:
+        assert display_port == "42"
+        # Xvfb took a second to provide the display number. The event loop must have kept running.
+        assert ticks > 10
+    finally:
+        xvfb.terminate()
+        await xvfb.wait()
+
+
+@pytest.mark.skipif(
+    not system.is_linux(),
+    reason="Xvfb is only required on linux based operating systems",
+)
+async def test_create_xvfb_process_exits(loop):
+    """Test to check if the stderr of Xvfb is raised as soon as it exits without providing a display number."""
+    xvfb_cmd, dpipe = fake_xvfb_cmd(
+        "import sys; sys.stderr.write('Fatal server error'); sys.exit(1)"
+    )
+
+    with pytest.raises(exceptions.XvfbError) as e:
+        await mw.create_xvfb_process(xvfb_cmd, dpipe, timeout=60)
+
+    assert "Fatal server error" in e.value.message
+
+
+@pytest.mark.skipif(
+    not system.is_linux(),
+    reason="Xvfb is only required on linux based operating systems",
+)
+async def test_create_xvfb_process_timeout(loop):
+    """Test to check if Xvfb is terminated when it does not provide a display number in time."""
+    xvfb_cmd, dpipe = fake_xvfb_cmd("import time; time.sleep(60)")
+
+    with pytest.raises(exceptions.XvfbError):
+        await mw.create_xvfb_process(xvfb_cmd, dpipe, timeout=0.5)
+
+
+@pytest.fixture(name="mwa_server")
+async def mwa_server_fixture(aiohttp_server):
+    """Pytest fixture which starts a local web server standing in for the MWA API endpoint.
+
+    Args:
+        aiohttp_server : Built in pytest fixture which starts an aiohttp web server.
+
+    Returns:
+        aiohttp.test_utils.TestServer: The server. Set server.app["lifetime"] to control the
+            lifetime of the access tokens and read server.app["requests"] to count the requests.
+    """
+    from aiohttp import web
+
+    async def access_token(request):
+        request.app["requests"] += 1
+        await asyncio.sleep(0.05)
+        expiration_date = datetime.datetime.now(timezone.utc) + request.app["lifetime"]
+        return web.json_response(
+            {
+                "accessTokenString": f"access_token_{request.app['requests']}",
+                "expirationDate": expiration_date.strftime("%Y-%m-%dT%H:%M:%S.%f%z"),
+            }
+        )
+
+    app = web.Application()
+    app["requests"] = 0
+    app["lifetime"] = timedelta(hours=1)
+    app.router.add_post("/tokens/access", access_token)
+
+    return await aiohttp_server(app)
+
+
+async def test_access_token_cache(mwa_server):
+    """Test to check if access tokens are fetched once per identity token and source id, and
+    fetched again after the cache is invalidated.
+
+    Args:
+        mwa_server : Pytest fixture which starts a stand-in for the MWA API endpoint.
+    """
+    cache = mw.AccessTokenCache(str(mwa_server.make_url("")))
+
+    access_tokens = await asyncio.gather(
+        *[cache.get("identity_token", "source_id") for _ in range(5)]
+    )
+    assert [data["token"] for data in access_tokens] == ["access_token_1"] * 5
+    assert mwa_server.app["requests"] == 1
+
+    # Cached per identity token and source id
+    assert (await cache.get("identity_token", "source_id"))["token"] == "access_token_1"
+    assert (await cache.get("other_identity_token", "source_id"))[
+        "token"
+    ] == "access_token_2"
+    assert mwa_server.app["requests"] == 2
+
+    cache.invalidate()
+    assert (await cache.get("identity_token", "source_id"))["token"] == "access_token_3"
+
+
+async def test_access_token_cache_refresh(mwa_server):
+    """Test to check if an access token which is about to expire is refreshed in the background,
+    and one which has expired is fetched again before it is returned.
+
+    Args:
+        mwa_server : Pytest fixture which starts a stand-in for the MWA API endpoint.
+    """
+    mwa_server.app["lifetime"] = timedelta(seconds=30)
+    cache = mw.AccessTokenCache(str(mwa_server.make_url("")), refresh_margin=60)
+
+    assert (await cache.get("identity_token", "source_id"))["token"] == "access_token_1"
+
+    # About to expire, the cached access token is returned while a new one is fetched
+    mwa_server.app["lifetime"] = timedelta(hours=1)
+    assert (await cache.get("identity_token", "source_id"))["token"] == "access_token_1"
+    await asyncio.sleep(0.2)
+    assert mwa_server.app["requests"] == 2
+    assert (await cache.get("identity_token", "source_id"))["token"] == "access_token_2"
+    assert mwa_server.app["requests"] == 2
+
+    # Expired
+    mwa_server.app["lifetime"] = timedelta(seconds=-1)
+    cache.invalidate()
+    await cache.get("identity_token", "source_id")
+    assert (await cache.get("identity_token", "source_id"))["token"] == "access_token_4"
+
+
+async def test_access_token_cache_fresh(mwa_server):
+    """Test to check if a fresh access token is awaited instead of returning one which is about to expire.
+
+    Args:
+        mwa_server : Pytest fixture which starts a stand-in for the MWA API endpoint.
+    """
+    mwa_server.app["lifetime"] = timedelta(seconds=30)
+    cache = mw.AccessTokenCache(str(mwa_server.make_url("")), refresh_margin=60)
+
+    assert (await cache.get("identity_token", "source_id"))["token"] == "access_token_1"
+
+    # About to expire, the refresh is awaited
+    mwa_server.app["lifetime"] = timedelta(hours=1)
+    access_tokens = await asyncio.gather(
+        cache.get("identity_token", "source_id", fresh=True),
+        cache.get("identity_token", "source_id", fresh=True),
+    )
+    assert [data["token"] for data in access_tokens] == ["access_token_2"] * 2
+    assert mwa_server.app["requests"] == 2
+
+    # Valid for longer than the margin, the cached access token is returned
+    assert (await cache.get("identity_token", "source_id", fresh=True))[
+        "token"
+    ] == "access_token_2"
+    assert mwa_server.app["requests"] == 2
+
+
+async def test_access_token_cache_error(mwa_server):
+    """Test to check if errors from the MWA API endpoint are raised to all the callers and not cached.
+
+    Args:
+        mwa_server : Pytest fixture which starts a stand-in for the MWA API endpoint.
+    """
+    cache = mw.AccessTokenCache(str(mwa_server.make_url("/invalid")))
+
+    results = await asyncio.gather(
+        *[cache.get("identity_token", "source_id") for _ in range(2)],
+        return_exceptions=True,
+    )
+    assert all(
+        isinstance(result, exceptions.OnlineLicensingError) for result in results
+    )
+
+    with pytest.raises(exceptions.OnlineLicensingError):
+        await cache.get("identity_token", "source_id")
+
+
+@pytest.fixture(name="flaky_server")
+async def flaky_server_fixture(aiohttp_server):
+    """Pytest fixture which starts a local web server whose responses can be made to fail or stall.
+
+    Args:
+        aiohttp_server : Built in pytest fixture which starts an aiohttp web server.
+
+    Returns:
+        aiohttp.test_utils.TestServer: The server. Append statuses to server.app["statuses"] to
+            respond with them before responding with 200, and set server.app["delay"] to stall the responses.
+    """
+    from aiohttp import web
+
+    async def handler(request):
+        request.app["requests"] += 1
+        await asyncio.sleep(request.app["delay"])
+        status = request.app["statuses"].pop(0) if request.app["statuses"] else 200
+        return web.json_response(dict(await request.post()), status=status)
+
+    app = web.Application()
+    app["requests"] = 0
+    app["statuses"] = []
+    app["delay"] = 0
+    app.router.add_post("/", handler)
+
+    return await aiohttp_server(app)
+
+
+async def test_licensing_client_retries(flaky_server):
+    """Test to check if the licensing client retries requests which fail with a 5xx response, and records their latency.
+
+    Args:
+        flaky_server : Pytest fixture which starts a server whose responses can be made to fail.
+    """
+    flaky_server.app["statuses"] = [503, 500]
+    url = str(flaky_server.make_url("/"))
+
+    async with mw.LicensingClient(max_retries=2, retry_backoff=0.01) as client:
+        async with client.post(url, data={"key": "value"}) as res:
+            assert res.status == 200
+            assert await res.json() == {"key": "value"}
+
+        assert flaky_server.app["requests"] == 3
+        assert client.request_duration.get_count(url, "failure") == 2
+        assert client.request_duration.get_count(url, "success") == 1
+        assert client.request_retries.get(url) == 2
+
+        # The last 5xx response is returned once there are no retries left
+        flaky_server.app["statuses"] = [502] * 3
+        async with client.post(url, data={}) as res:
+            assert res.status == 502
+
+
+async def test_licensing_client_timeout(flaky_server):
+    """Test to check if the licensing client raises an OnlineLicensingError when the server does not respond in time.
+
+    Args:
+        flaky_server : Pytest fixture which starts a server whose responses can be made to stall.
+    """
+    flaky_server.app["delay"] = 0.3
+
+    async with mw.LicensingClient(
+        read_timeout=0.1, max_retries=1, retry_backoff=0.01
+    ) as client:
+        with pytest.raises(exceptions.OnlineLicensingError):
+            async with client.post(str(flaky_server.make_url("/")), data={}):
+                pass
+
+    assert flaky_server.app["requests"] == 2
+
+    # Let the stalled responses complete before the server is stopped
+    await asyncio.sleep(flaky_server.app["delay"])
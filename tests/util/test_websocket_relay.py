@@ -0,0 +1,203 @@
+# Copyright 2023 The MathWorks, Inc.
+"""Tests for functions in matlab_proxy/util/websocket_relay.py
+"""
+
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from matlab_proxy.util import websocket_relay
+from matlab_proxy.util.mwi import metrics
+from matlab_proxy.util.websocket_relay import WebSocketRelay
+
+
+async def echo_handler(request):
+    """WebSocket handler standing in for the Embedded Connector, which echoes messages until it is told to close.
+
+    Args:
+        request (HTTPRequest): HTTPRequest object
+
+    Returns:
+        WebSocket Response: Web Socket Response object
+    """
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    async for msg in ws:
+        if msg.type == aiohttp.WSMsgType.TEXT and msg.data == "close":
+            await ws.close(code=4000, message=b"closed by MATLAB")
+        elif msg.type == aiohttp.WSMsgType.TEXT:
+            await ws.send_str(msg.data)
+        elif msg.type == aiohttp.WSMsgType.BINARY:
+            await ws.send_bytes(msg.data)
+
+    request.app["matlab_close_codes"].append(ws.close_code)
+    return ws
+
+
+@pytest.fixture(name="relay_client")
+async def relay_client_fixture(aiohttp_server, aiohttp_client):
+    """A pytest fixture which returns a client of a server relaying WebSockets to an echo server.
+
+    The relays and the close codes seen by the echo server are stored in the app of the client.
+    The heartbeat of the WebSocket with the browser and the idle timeout of the relays are set in the app of the client.
+
+    Args:
+        aiohttp_server : A built-in pytest fixture
+        aiohttp_client : A built-in pytest fixture
+
+    Returns:
+        aiohttp_client: Client of the relaying server.
+    """
+    matlab_app = web.Application()
+    matlab_app["matlab_close_codes"] = []
+    matlab_app.router.add_get("/ws", echo_handler)
+    matlab_server = await aiohttp_server(matlab_app)
+
+    async def relay_handler(request):
+        ws_browser = web.WebSocketResponse(
+            autoping=False, heartbeat=request.app["heartbeat"]
+        )
+        await ws_browser.prepare(request)
+
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(
+                matlab_server.make_url("/ws"), autoping=False
+            ) as ws_matlab:
+                relay = WebSocketRelay(
+                    ws_browser,
+                    ws_matlab,
+                    frames_counter=request.app["frames_counter"],
+                    idle_timeout=request.app["idle_timeout"],
+                )
+                request.app["relays"].append(relay)
+                await relay.run()
+
+        return ws_browser
+
+    app = web.Application()
+    app["relays"] = []
+    app["heartbeat"] = None
+    app["idle_timeout"] = None
+    app["frames_counter"] = metrics.Counter(
+        "frames_total", "Frames.", labelnames=("direction",)
+    )
+    app["matlab_app"] = matlab_app
+    app.router.add_get("/ws", relay_handler)
+    return await aiohttp_client(app)
+
+
+async def test_relay_messages(relay_client):
+    """Test to check if text and binary messages are relayed in both directions and counted.
+
+    Args:
+        relay_client (aiohttp_client): Pytest fixture which relays WebSockets to an echo server.
+    """
+    async with relay_client.ws_connect("/ws") as ws:
+        await ws.send_str("Hello world")
+        assert await ws.receive_str() == "Hello world"
+
+        await ws.send_bytes(b"\x00" * 1024)
+        assert await ws.receive_bytes() == b"\x00" * 1024
+
+    relay = relay_client.app["relays"][0]
+    assert relay.frames == {
+        websocket_relay.TO_MATLAB: 2,
+        websocket_relay.FROM_MATLAB: 2,
+    }
+    assert relay.bytes[websocket_relay.FROM_MATLAB] == len("Hello world") + 1024
+    assert relay_client.app["frames_counter"].get(websocket_relay.TO_MATLAB) == 2
+
+
+async def test_relay_ping_pong(relay_client):
+    """Test to check if a ping is relayed to MATLAB and its pong is relayed back with the same payload.
+
+    Args:
+        relay_client (aiohttp_client): Pytest fixture which relays WebSockets to an echo server.
+    """
+    async with relay_client.ws_connect("/ws", autoping=False) as ws:
+        await ws.ping(b"payload")
+        msg = await asyncio.wait_for(ws.receive(), timeout=5)
+
+        assert msg.type == aiohttp.WSMsgType.PONG
+        assert msg.data == b"payload"
+
+
+async def test_relay_propagates_close_from_matlab(relay_client):
+    """Test to check if the close code and reason of MATLAB are propagated to the browser and the relay ends.
+
+    Args:
+        relay_client (aiohttp_client): Pytest fixture which relays WebSockets to an echo server.
+    """
+    async with relay_client.ws_connect("/ws") as ws:
+        await ws.send_str("close")
+        msg = await asyncio.wait_for(ws.receive(), timeout=5)
+
+        assert msg.type == aiohttp.WSMsgType.CLOSE
+        assert msg.data == 4000
+        assert msg.extra == "closed by MATLAB"
+
+
+async def test_relay_propagates_close_from_browser(relay_client):
+    """Test to check if the close code of the browser is propagated to MATLAB and both tasks of the relay end.
+
+    Args:
+        relay_client (aiohttp_client): Pytest fixture which relays WebSockets to an echo server.
+    """
+    ws = await relay_client.ws_connect("/ws")
+    await ws.send_str("Hello world")
+    await ws.receive_str()
+    await ws.close(code=4001)
+
+    matlab_close_codes = relay_client.app["matlab_app"]["matlab_close_codes"]
+    for _ in range(50):
+        if matlab_close_codes:
+            break
+        await asyncio.sleep(0.1)
+
+    assert matlab_close_codes == [4001]
+    relay = relay_client.app["relays"][0]
+    assert relay.ws_browser.closed and relay.ws_matlab.closed
+
+
+async def test_relay_reaped_when_idle(relay_client):
+    """Test to check if a relay without any message for idle_timeout seconds is reaped, closing both sides.
+
+    Args:
+        relay_client (aiohttp_client): Pytest fixture which relays WebSockets to an echo server.
+    """
+    relay_client.app["idle_timeout"] = 0.3
+
+    async with relay_client.ws_connect("/ws") as ws:
+        await ws.send_str("Hello world")
+        assert await ws.receive_str() == "Hello world"
+
+        msg = await asyncio.wait_for(ws.receive(), timeout=5)
+        assert msg.type == aiohttp.WSMsgType.CLOSE
+        assert msg.data == aiohttp.WSCloseCode.GOING_AWAY
+
+    relay = relay_client.app["relays"][0]
+    assert relay.reap_reason == websocket_relay.REAP_REASON_IDLE
+    assert relay.ws_matlab.closed
+
+
+async def test_relay_reaped_by_heartbeat(relay_client):
+    """Test to check if a relay is reaped when the browser does not answer the heartbeat.
+
+    Args:
+        relay_client (aiohttp_client): Pytest fixture which relays WebSockets to an echo server.
+    """
+    relay_client.app["heartbeat"] = 0.2
+
+    # The browser does not answer pings, as it never reads from the WebSocket
+    ws = await relay_client.ws_connect("/ws", autoping=False)
+
+    relays = relay_client.app["relays"]
+    for _ in range(50):
+        if relays and relays[0].reap_reason is not None:
+            break
+        await asyncio.sleep(0.1)
+
+    assert relays[0].reap_reason == websocket_relay.REAP_REASON_HEARTBEAT
+    assert relays[0].ws_matlab.closed
+    await ws.close()